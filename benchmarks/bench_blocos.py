@@ -0,0 +1,42 @@
+"""
+Mede a vazão da compactação/descompactação em blocos para diferentes números de processos.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_blocos caminho_arquivo [--bloco N] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from src.compressor import compactar, descompactar
+from src.blocos import TAMANHO_BLOCO_PADRAO
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da compactação em blocos paralelos.")
+    parser.add_argument("arquivo", help="Arquivo de texto a ser compactado.")
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO_PADRAO, help="Caracteres por bloco.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    mb = os.path.getsize(args.arquivo) / 1_000_000
+    with tempfile.TemporaryDirectory() as diretorio:
+        compactado = os.path.join(diretorio, "saida.huff")
+        recuperado = os.path.join(diretorio, "saida.txt")
+        inicio = time.perf_counter()
+        compactar(args.arquivo, compactado)
+        print(f"{'fluxo':<10} compactar {mb / (time.perf_counter() - inicio):8.2f} MB/s")
+
+        for workers in sorted(set(args.workers)):
+            inicio = time.perf_counter()
+            compactar(args.arquivo, compactado, tamanho_bloco=args.bloco, workers=workers)
+            meio = time.perf_counter()
+            descompactar(compactado, recuperado, workers=workers)
+            fim = time.perf_counter()
+            print(f"{workers:>3} proc.  compactar {mb / (meio - inicio):8.2f} MB/s  "
+                  f"descompactar {mb / (fim - meio):8.2f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compara o modelo de contexto de ordem 1 com a tabela única (ordem 0): razão
+de compressão e vazão da compactação e da descompactação.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_contexto [--corpus zipf log ...] [--tamanho 8M] [arquivo ...]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.suite import CORPORA, gerar_corpus, interpretar_tamanho
+from src.compressor import compactar, descompactar
+
+MODOS = (('ordem 0', {'modo': 'bytes'}), ('ordem 1', {'contexto': True}))
+
+
+def medir(entrada: str, diretorio: str):
+    """Imprime a razão e as vazões de cada modo para um arquivo."""
+    mb = os.path.getsize(entrada) / 1_000_000
+    compactado = os.path.join(diretorio, "saida.huff")
+    recuperado = os.path.join(diretorio, "saida.out")
+    for nome, opcoes in MODOS:
+        inicio = time.perf_counter()
+        compactar(entrada, compactado, **opcoes)
+        meio = time.perf_counter()
+        descompactar(compactado, recuperado)
+        fim = time.perf_counter()
+        with open(entrada, 'rb') as f_a, open(recuperado, 'rb') as f_b:
+            assert f_a.read() == f_b.read(), f"Ciclo divergente no modo '{nome}'"
+        razao = os.path.getsize(compactado) / os.path.getsize(entrada)
+        print(f"  {nome:<8} razão {razao:7.4f}  compactar {mb / (meio - inicio):7.2f} MB/s  "
+              f"descompactar {mb / (fim - meio):7.2f} MB/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do modelo de contexto de ordem 1.")
+    parser.add_argument("arquivos", nargs="*", help="Arquivos próprios (além dos corpora sintéticos).")
+    parser.add_argument("--corpus", nargs="*", choices=sorted(CORPORA), default=['zipf', 'log', 'uniforme', 'bytes'])
+    parser.add_argument("--tamanho", default="8M", help="Tamanho dos corpora sintéticos (ex: 1M, 8M).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        for nome in args.corpus:
+            entrada = os.path.join(diretorio, f"{nome}.dat")
+            gerar_corpus(nome, interpretar_tamanho(args.tamanho), entrada)
+            print(f"{nome} ({args.tamanho})")
+            medir(entrada, diretorio)
+            os.remove(entrada)
+        for caminho in args.arquivos:
+            print(caminho)
+            medir(caminho, diretorio)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Compara o decodificador por tabela multi-bit com o percurso bit a bit na árvore.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_decodificacao [caminho_arquivo] [--largura N]
+"""
+import argparse
+import random
+import time
+
+from src.decodificador import decodificar_arvore, decodificar_tabela, LARGURA_PADRAO
+from src.frequencias import gerar_tabela_frequencias
+from src.huffman_tree import construir_arvore, gerar_codigos
+
+
+def _codificar(texto, codigos) -> bytes:
+    bits = "".join(codigos[c] for c in texto)
+    bits = bits.ljust((len(bits) + 7) // 8 * 8, '0')
+    return int(bits, 2).to_bytes(len(bits) // 8, 'big') if bits else b''
+
+
+def _gerar_texto(tamanho: int) -> str:
+    rnd = random.Random(42)
+    alfabeto = "etaoinshrdlucmfwypvbgkjqxz ,.\n"
+    pesos = [1 / (i + 1) for i in range(len(alfabeto))]
+    return "".join(rnd.choices(alfabeto, weights=pesos, k=tamanho))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos decodificadores de Huffman.")
+    parser.add_argument("arquivo", nargs="?", help="Arquivo de texto a ser usado (padrão: texto sintético de 2 MB).")
+    parser.add_argument("--largura", type=int, default=LARGURA_PADRAO, help="Largura da tabela em bits.")
+    args = parser.parse_args()
+
+    if args.arquivo:
+        with open(args.arquivo, 'r', encoding='utf-8') as f:
+            texto = f.read()
+    else:
+        texto = _gerar_texto(2_000_000)
+
+    raiz = construir_arvore(gerar_tabela_frequencias(texto))
+    dados = _codificar(texto, gerar_codigos(raiz))
+    mb = len(texto.encode('utf-8')) / 1_000_000
+
+    resultados = {}
+    for nome, funcao, extra in (("arvore", decodificar_arvore, ()), ("tabela", decodificar_tabela, (args.largura,))):
+        inicio = time.perf_counter()
+        saida = funcao(dados, raiz, len(texto), *extra)
+        duracao = time.perf_counter() - inicio
+        assert saida == texto, f"Saída divergente no decodificador '{nome}'"
+        resultados[nome] = duracao
+        print(f"{nome:<7} {duracao:8.3f}s  {mb / duracao:8.2f} MB/s")
+
+    print(f"Aceleração: {resultados['arvore'] / resultados['tabela']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Compara a contagem de frequências ingênua (Counter sobre o conteúdo) com a
+contagem em blocos de src.frequencias, sequencial e em paralelo.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_frequencias caminho_arquivo [--workers 1 2 4]
+    python -m benchmarks.bench_frequencias --gerar 1000   # arquivo sintético de 1000 MB
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+
+from src.frequencias import gerar_tabela_frequencias_arquivo, gerar_tabela_frequencias_bytes
+
+
+def gerar_arquivo(caminho: str, megabytes: int):
+    """Escreve um texto sintético com palavras aleatórias, em blocos de 1 MB."""
+    gerador = random.Random(0)
+    palavras = ["huffman", "árvore", "código", "bits", "frequência", "texto", "de", "a", "e", "o"]
+    with open(caminho, 'w', encoding='utf-8') as f:
+        for _ in range(megabytes):
+            f.write(" ".join(gerador.choices(palavras, k=120_000))[:1_000_000])
+
+
+def medir(nome: str, funcao, mb: float):
+    inicio = time.perf_counter()
+    funcao()
+    duracao = time.perf_counter() - inicio
+    print(f"{nome:<24} {duracao:8.3f} s  {mb / duracao:8.2f} MB/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da contagem de frequências.")
+    parser.add_argument("arquivo", nargs="?", help="Arquivo a ser contado.")
+    parser.add_argument("--gerar", type=int, metavar="MB", help="Gera um arquivo sintético com este tamanho.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+    if not args.arquivo and not args.gerar:
+        parser.error("informe um arquivo ou --gerar MB")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = args.arquivo
+        if args.gerar:
+            arquivo = os.path.join(diretorio, "corpus.txt")
+            gerar_arquivo(arquivo, args.gerar)
+        mb = os.path.getsize(arquivo) / 1_000_000
+
+        def ingenua():
+            frequencias = Counter()
+            with open(arquivo, 'rb') as f:
+                for bloco in iter(lambda: f.read(1 << 20), b''):
+                    frequencias.update(bloco)
+
+        medir("Counter (bytes)", ingenua, mb)
+        for workers in sorted(set(args.workers)):
+            medir(f"bytes, {workers} proc.", lambda: gerar_tabela_frequencias_bytes(arquivo, workers=workers), mb)
+            medir(f"texto, {workers} proc.", lambda: gerar_tabela_frequencias_arquivo(arquivo, workers=workers), mb)
+
+
+if __name__ == "__main__":
+    main()
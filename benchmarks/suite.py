@@ -0,0 +1,278 @@
+"""
+Conjunto de benchmarks do compressor: gera corpora sintéticos, mede as etapas
+principais e compara os resultados com uma linha de base salva.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.suite [--corpus uniforme zipf ...] [--tamanhos 1K 1M 100M]
+    python -m benchmarks.suite --salvar-base base.json
+    python -m benchmarks.suite --comparar base.json [--tolerancia 0.25]
+
+O resultado é impresso como JSON. Com --comparar, o código de saída é 1 se
+alguma medida piorou além da tolerância em relação à linha de base. O pico de
+memória é medido com tracemalloc numa execução extra, que pode ser bem lenta
+em alfabetos grandes; --sem-memoria dispensa essa medição.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from src.compressor import compactar, descompactar
+from src.frequencias import gerar_tabela_frequencias_modo
+from src.huffman_tree import construir_arvore, gerar_codigos
+
+SAIDA_OK = 0
+SAIDA_REGRESSAO = 1
+
+# Os corpora são gerados em pedaços deste tamanho, para que arquivos de
+# vários GB não precisem caber na memória.
+TAMANHO_PEDACO = 1 << 20
+
+# Etapas muito rápidas são repetidas até somar este tempo, para reduzir o ruído.
+TEMPO_MINIMO_MEDICAO = 0.05
+
+# Diferenças de tempo abaixo deste valor (em segundos) nunca contam como regressão.
+RUIDO_SEGUNDOS = 0.005
+
+TOLERANCIA_PADRAO = 0.25
+
+MULTIPLICADORES = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+
+def interpretar_tamanho(texto: str) -> int:
+    """Converte tamanhos como '1K', '10M' ou '1G' (potências de 1024) em bytes."""
+    texto = texto.strip().upper().rstrip('B')
+    if texto and texto[-1] in MULTIPLICADORES:
+        return int(float(texto[:-1]) * MULTIPLICADORES[texto[-1]])
+    return int(texto)
+
+
+# --- Corpora sintéticos ---
+#
+# Cada gerador recebe a quantidade de bytes do pedaço e um gerador aleatório
+# com semente fixa, e devolve exatamente essa quantidade de bytes.
+
+def _pedaco_uniforme(n: int, rnd: random.Random) -> bytes:
+    alfabeto = b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 .,\n"
+    return bytes(rnd.choices(alfabeto, k=n))
+
+
+_VOCABULARIO = None
+
+
+def _pedaco_zipf(n: int, rnd: random.Random) -> bytes:
+    # Palavras sorteadas com probabilidade proporcional a 1/posição (lei de Zipf)
+    global _VOCABULARIO
+    if _VOCABULARIO is None:
+        gerador = random.Random(1)
+        palavras = ["".join(gerador.choices("etaoinshrdlucmfwypvbgkjqxz", k=gerador.randint(1, 9)))
+                    for _ in range(2000)]
+        _VOCABULARIO = (palavras, [1 / (i + 1) for i in range(len(palavras))])
+    palavras, pesos = _VOCABULARIO
+    texto = " ".join(rnd.choices(palavras, weights=pesos, k=n // 3 + 1)).encode('ascii')
+    return texto[:n]
+
+
+def _pedaco_unico(n: int, rnd: random.Random) -> bytes:
+    return b"a" * n
+
+
+def _pedaco_unicode(n: int, rnd: random.Random) -> bytes:
+    # Caracteres de 3 bytes em UTF-8 (U+0800 a U+D7FF): alfabeto com milhares de símbolos
+    chars = "".join(map(chr, rnd.choices(range(0x0800, 0xD800), k=n // 3)))
+    return chars.encode('utf-8') + b"\n" * (n % 3)
+
+
+def _pedaco_bytes(n: int, rnd: random.Random) -> bytes:
+    return rnd.randbytes(n)
+
+
+def _pedaco_log(n: int, rnd: random.Random) -> bytes:
+    # Linhas de log de acesso: campos fixos, com o byte seguinte bem previsível pelo anterior
+    niveis = ["INFO", "INFO", "INFO", "WARN", "ERROR", "DEBUG"]
+    caminhos = ["/api/usuarios", "/api/pedidos", "/api/produtos", "/login", "/logout", "/static/app.js"]
+    linhas = []
+    tamanho = 0
+    while tamanho < n:
+        linha = (f"2024-05-{rnd.randint(1, 28):02d} {rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}:"
+                 f"{rnd.randint(0, 59):02d} {rnd.choice(niveis)} {rnd.choice(('GET', 'POST'))} "
+                 f"{rnd.choice(caminhos)} status={rnd.choice((200, 200, 200, 201, 404, 500))} "
+                 f"ms={rnd.randint(1, 999)}\n")
+        linhas.append(linha)
+        tamanho += len(linha)
+    return "".join(linhas).encode('ascii')[:n]
+
+
+CORPORA: Dict[str, Callable[[int, random.Random], bytes]] = {
+    'uniforme': _pedaco_uniforme,
+    'zipf': _pedaco_zipf,
+    'unico': _pedaco_unico,
+    'unicode': _pedaco_unicode,
+    'bytes': _pedaco_bytes,
+    'log': _pedaco_log,
+}
+
+
+def gerar_corpus(nome: str, tamanho: int, caminho: str, semente: int = 0):
+    """Escreve em 'caminho' um corpus sintético de 'tamanho' bytes."""
+    if nome not in CORPORA:
+        raise ValueError(f"Corpus desconhecido: '{nome}'. Use um de {sorted(CORPORA)}.")
+    rnd = random.Random(semente)
+    with open(caminho, 'wb') as f:
+        restante = tamanho
+        while restante > 0:
+            n = min(TAMANHO_PEDACO, restante)
+            f.write(CORPORA[nome](n, rnd))
+            restante -= n
+
+
+# --- Medições ---
+
+def _medir(funcao: Callable[[], object], repetir: bool, memoria: bool = True) -> Dict[str, float]:
+    """
+    Mede o tempo por execução e o pico de memória alocada pelo Python.
+    O tempo é medido sem o tracemalloc, que deixaria o código bem mais lento;
+    o pico vem de uma execução extra, dispensada com memoria=False.
+    """
+    execucoes = 0
+    inicio = time.perf_counter()
+    while True:
+        funcao()
+        execucoes += 1
+        decorrido = time.perf_counter() - inicio
+        if not repetir or decorrido >= TEMPO_MINIMO_MEDICAO:
+            break
+    if not memoria:
+        return {'segundos': decorrido / execucoes}
+
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'segundos': decorrido / execucoes, 'pico_memoria_bytes': pico}
+
+
+def medir_corpus(nome: str, tamanho: int, diretorio: str, memoria: bool = True) -> List[Dict]:
+    """Gera um corpus e mede compactar, descompactar, construir_arvore e gerar_codigos."""
+    entrada = os.path.join(diretorio, f"{nome}.dat")
+    compactado = entrada + ".huff"
+    recuperado = entrada + ".out"
+    gerar_corpus(nome, tamanho, entrada)
+    mb = tamanho / 1_000_000
+    base = {'corpus': nome, 'bytes': tamanho}
+
+    resultados = []
+    for etapa, funcao in (('compactar', lambda: compactar(entrada, compactado)),
+                          ('descompactar', lambda: descompactar(compactado, recuperado))):
+        medida = _medir(funcao, repetir=tamanho < TAMANHO_PEDACO, memoria=memoria)
+        medida['mb_s'] = round(mb / medida['segundos'], 3) if medida['segundos'] else None
+        resultados.append({**base, 'etapa': etapa, **medida})
+
+    with open(entrada, 'rb') as f_a, open(recuperado, 'rb') as f_b:
+        if f_a.read() != f_b.read():
+            raise AssertionError(f"Ciclo divergente no corpus '{nome}' ({tamanho} bytes)")
+    resultados[0]['razao'] = round(os.path.getsize(compactado) / tamanho, 4) if tamanho else None
+
+    _, frequencias = gerar_tabela_frequencias_modo(entrada)
+    raiz = construir_arvore(frequencias)
+    for etapa, funcao in (('construir_arvore', lambda: construir_arvore(frequencias)),
+                          ('gerar_codigos', lambda: gerar_codigos(raiz))):
+        medida = _medir(funcao, repetir=True, memoria=memoria)
+        resultados.append({**base, 'etapa': etapa, 'simbolos': len(frequencias), **medida})
+
+    for caminho in (entrada, compactado, recuperado):
+        os.remove(caminho)
+    return resultados
+
+
+def executar(corpora: List[str], tamanhos: List[int], diretorio: Optional[str] = None,
+             memoria: bool = True) -> Dict:
+    """Executa todas as combinações de corpus e tamanho e monta o relatório."""
+    with tempfile.TemporaryDirectory(dir=diretorio) as temporario:
+        resultados = [r for tamanho in tamanhos for nome in corpora
+                      for r in medir_corpus(nome, tamanho, temporario, memoria)]
+    for resultado in resultados:
+        resultado['segundos'] = round(resultado['segundos'], 6)
+    return {'python': platform.python_version(), 'plataforma': platform.platform(), 'resultados': resultados}
+
+
+# --- Comparação com a linha de base ---
+
+def _chave(resultado: Dict) -> tuple:
+    return resultado['corpus'], resultado['bytes'], resultado['etapa']
+
+
+def comparar(atual: Dict, base: Dict, tolerancia: float = TOLERANCIA_PADRAO) -> List[str]:
+    """
+    Compara um relatório com a linha de base e descreve cada regressão:
+    vazão menor, ou tempo, memória ou razão de compressão maiores que a base
+    além da tolerância relativa. Medidas ausentes na base são ignoradas.
+    """
+    referencias = {_chave(r): r for r in base.get('resultados', [])}
+    regressoes = []
+    for resultado in atual['resultados']:
+        referencia = referencias.get(_chave(resultado))
+        if referencia is None:
+            continue
+        nome = "{}/{}/{}".format(*_chave(resultado))
+
+        segundos, segundos_base = resultado.get('segundos'), referencia.get('segundos')
+        if segundos is not None and segundos_base is not None and \
+                segundos > segundos_base * (1 + tolerancia) and segundos - segundos_base > RUIDO_SEGUNDOS:
+            regressoes.append(f"{nome}: tempo {segundos:.4f}s > base {segundos_base:.4f}s")
+
+        for medida in ('pico_memoria_bytes', 'razao'):
+            valor, valor_base = resultado.get(medida), referencia.get(medida)
+            if valor is None or valor_base is None:
+                continue
+            # A razão é determinística: qualquer piora além do arredondamento é regressão
+            limite = valor_base * (1 + tolerancia) if medida == 'pico_memoria_bytes' else valor_base + 1e-4
+            if valor > limite:
+                regressoes.append(f"{nome}: {medida} {valor} > base {valor_base}")
+    return regressoes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks do compressor de Huffman.")
+    parser.add_argument("--corpus", nargs="+", choices=sorted(CORPORA), default=list(CORPORA))
+    parser.add_argument("--tamanhos", nargs="+", default=["1K", "1M"],
+                        help="Tamanhos dos corpora (ex: 1K 10M 1G).")
+    parser.add_argument("--diretorio", help="Diretório para os arquivos temporários.")
+    parser.add_argument("--sem-memoria", action="store_true",
+                        help="Não mede o pico de memória (evita a execução extra com tracemalloc).")
+    parser.add_argument("--saida", help="Grava o relatório JSON neste arquivo (além de imprimi-lo).")
+    parser.add_argument("--salvar-base", metavar="ARQUIVO", help="Grava o relatório como nova linha de base.")
+    parser.add_argument("--comparar", metavar="ARQUIVO", help="Linha de base para detectar regressões.")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO,
+                        help="Piora relativa tolerada (padrão: %(default)s).")
+    args = parser.parse_args(argv)
+
+    relatorio = executar(args.corpus, [interpretar_tamanho(t) for t in args.tamanhos], args.diretorio,
+                         memoria=not args.sem_memoria)
+    texto = json.dumps(relatorio, ensure_ascii=False, indent=2)
+    print(texto)
+    for caminho in (args.saida, args.salvar_base):
+        if caminho:
+            with open(caminho, 'w', encoding='utf-8') as f:
+                f.write(texto + "\n")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            regressoes = comparar(relatorio, json.load(f), args.tolerancia)
+        for regressao in regressoes:
+            print(f"REGRESSÃO {regressao}", file=sys.stderr)
+        if regressoes:
+            return SAIDA_REGRESSAO
+    return SAIDA_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+from bisect import bisect_right
+from typing import Iterable, Optional, Union
+
+from src.blocos import extrair_trecho_blocos
+from src.contexto import ModeloContexto, decodificar_contexto_fluxo
+from src.decodificador import decodificar_tabela_fluxo
+from src.dicionario import TabelaTreinada, buscar_tabela
+from src.formato import (VERSAO_BLOCOS, VERSAO_BYTES, VERSAO_CONTEXTO, VERSAO_SINCRONIZADA, VERSAO_TREINADA,
+                         identificar_versao, ler_cabecalho, ler_cabecalho_contexto, ler_cabecalho_treinado,
+                         ler_pontos_sincronizacao)
+
+# Leituras menores que na descompactação completa: só o trecho pedido é decodificado.
+TAMANHO_LEITURA = 1 << 16
+
+
+def extrair_trecho(caminho_entrada: str, inicio: int, fim: Optional[int] = None,
+                   tabelas: Iterable[Union[str, TabelaTreinada]] = ()) -> Union[str, bytes]:
+    """
+    Retorna os caracteres [inicio, fim) do texto original de um arquivo .huff
+    sem descompactá-lo por inteiro. Para arquivos compactados no modo binário,
+    o intervalo é em bytes e o resultado é 'bytes'.
+
+    A decodificação começa no ponto de sincronização (ou bloco) mais próximo
+    antes de 'inicio', de modo que o custo depende do tamanho do trecho e do
+    intervalo entre pontos, e não da posição do trecho no arquivo. Arquivos
+    sem pontos de sincronização são decodificados desde o começo.
+
+    Arquivos compactados com uma tabela treinada precisam dela em 'tabelas'
+    (caminhos ou tabelas carregadas), a menos que já esteja em cache. Os do
+    modelo de contexto não têm pontos de sincronização: o trecho é
+    decodificado desde o começo.
+    """
+    if inicio < 0 or (fim is not None and fim < inicio):
+        raise ValueError("Intervalo inválido: é preciso 0 <= inicio <= fim.")
+
+    with open(caminho_entrada, 'rb') as f:
+        if not f.peek(1):
+            return ""
+        versao = identificar_versao(f)
+        if versao == VERSAO_BLOCOS:
+            return extrair_trecho_blocos(f, inicio, fim)
+        if versao == VERSAO_CONTEXTO:
+            contextos, compartilhada, total_bytes = ler_cabecalho_contexto(f)
+            fim = total_bytes if fim is None else min(fim, total_bytes)
+            if inicio >= fim:
+                return b""
+            pedacos = iter(lambda: f.read(TAMANHO_LEITURA), b'')
+            return b"".join(decodificar_contexto_fluxo(pedacos, ModeloContexto(contextos, compartilhada), fim))[inicio:]
+
+        tabela = None
+        if versao == VERSAO_TREINADA:
+            identificador, total_chars = ler_cabecalho_treinado(f)
+            tabela = buscar_tabela(identificador, tabelas)
+            raiz = tabela.raiz
+        else:
+            raiz, total_chars = ler_cabecalho(f)
+        inicio_dados = f.tell()
+        fim = total_chars if fim is None else min(fim, total_chars)
+        simbolos_bytes = versao in (VERSAO_BYTES, VERSAO_TREINADA)
+        if raiz is None or inicio >= fim:
+            return b"" if simbolos_bytes else ""
+        if raiz.char is not None:
+            # Caso especial: arquivo com um único tipo de caractere repetido
+            return (bytes((raiz.char,)) if simbolos_bytes else raiz.char) * (fim - inicio)
+
+        pontos = [(0, 0)]
+        if versao in (VERSAO_SINCRONIZADA, VERSAO_BYTES):
+            pontos = ler_pontos_sincronizacao(f) or pontos
+        indice = bisect_right([char for _, char in pontos], inicio) - 1
+        bit_inicial, char_inicial = pontos[max(indice, 0)]
+
+        f.seek(inicio_dados + bit_inicial // 8)
+        pedacos = iter(lambda: f.read(TAMANHO_LEITURA), b'')
+        texto = (b"" if simbolos_bytes else "").join(
+            decodificar_tabela_fluxo(pedacos, raiz, fim - char_inicial,
+                                     tabela=tabela.tabela_decodificacao if tabela is not None else None,
+                                     bits_iniciais=bit_inicial % 8))
+        return texto[inicio - char_inicial:]
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, Optional, Tuple
+
+from src.frequencias import MODOS, gerar_tabela_frequencias_modo
+from src.huffman_tree import Node, Simbolo, calcular_comprimentos, construir_arvore, gerar_codigos_canonicos
+
+# --- Análise de arquivos com cache ---
+#
+# A tabela de frequências de um arquivo grande custa uma passada inteira
+# sobre ele; a árvore e os códigos derivam dela. AnaliseArquivo calcula cada
+# um só quando é pedido e o reaproveita enquanto o arquivo não muda
+# (caminho, tamanho e data de modificação), e compactar() a aceita no lugar
+# da sua própria contagem.
+#
+# Com um diretório de cache, a tabela de frequências também é gravada em
+# disco, num arquivo JSON por arquivo analisado:
+#
+#   {"versao": 1, "caminho": ..., "tamanho": ..., "mtime_ns": ...,
+#    "modo_pedido": "auto", "modo": "bytes", "frequencias": [[simbolo, freq], ...]}
+#
+# Assim, analisar ou compactar de novo um arquivo inalterado, mesmo em outro
+# processo, não relê o arquivo para contá-lo. Um cache ilegível ou de outro
+# arquivo é apenas ignorado.
+
+VERSAO_CACHE = 1
+EXTENSAO_CACHE = '.freq.json'
+
+# Identidade de um arquivo: caminho absoluto, tamanho e data de modificação (ns)
+Assinatura = Tuple[str, int, int]
+
+
+def _assinatura(caminho: str) -> Assinatura:
+    estado = os.stat(caminho)
+    return os.path.abspath(caminho), estado.st_size, estado.st_mtime_ns
+
+
+class AnaliseArquivo:
+    """
+    Frequências, árvore e códigos de um arquivo, construídos no primeiro uso
+    e descartados quando o arquivo muda. 'modo' é o de compactar() ('auto',
+    'texto' ou 'bytes'); com 'diretorio_cache', as frequências são lidas e
+    gravadas nesse diretório.
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existir.
+        ValueError: Se o modo for desconhecido.
+    """
+
+    def __init__(self, caminho: str, modo: str = 'auto', diretorio_cache: Optional[str] = None):
+        if modo not in MODOS:
+            raise ValueError(f"Modo desconhecido: '{modo}'. Use um de {MODOS}.")
+        self.caminho = caminho
+        self.modo = modo
+        self.diretorio_cache = diretorio_cache
+        self.assinatura = _assinatura(caminho)
+        self._descartar()
+
+    def _descartar(self):
+        self._modo_efetivo: Optional[str] = None
+        self._frequencias: Optional[Dict[Simbolo, int]] = None
+        self._raiz: Optional[Node] = None
+        self._comprimentos: Dict[Tuple[str, Optional[int]], Dict[Simbolo, int]] = {}
+        self._codigos: Dict[Tuple[str, Optional[int]], Dict[Simbolo, str]] = {}
+
+    def _conferir_arquivo(self):
+        # Um arquivo alterado invalida tudo o que foi calculado a partir dele
+        assinatura = _assinatura(self.caminho)
+        if assinatura != self.assinatura:
+            self.assinatura = assinatura
+            self._descartar()
+
+    def disponivel(self) -> bool:
+        """Indica se as frequências já estão em memória ou no cache em disco (sem contar nada)."""
+        self._conferir_arquivo()
+        if self._frequencias is None:
+            self._ler_cache()
+        return self._frequencias is not None
+
+    def _carregar(self):
+        if not self.disponivel():
+            self._modo_efetivo, self._frequencias = gerar_tabela_frequencias_modo(self.caminho, self.modo)
+            # Só grava se o arquivo não mudou durante a contagem
+            if _assinatura(self.caminho) == self.assinatura:
+                self._gravar_cache()
+
+    @property
+    def frequencias(self) -> Dict[Simbolo, int]:
+        self._carregar()
+        return self._frequencias
+
+    @property
+    def modo_efetivo(self) -> str:
+        """O modo usado na contagem: 'texto' ou 'bytes' (o 'auto' já resolvido)."""
+        self._carregar()
+        return self._modo_efetivo
+
+    @property
+    def raiz(self) -> Optional[Node]:
+        """Árvore de Huffman das frequências, para exibição."""
+        frequencias = self.frequencias
+        if self._raiz is None:
+            self._raiz = construir_arvore(frequencias)
+        return self._raiz
+
+    def comprimentos(self, construtor: str = 'duas_filas',
+                     comprimento_maximo: Optional[int] = None) -> Dict[Simbolo, int]:
+        """Comprimentos dos códigos (veja calcular_comprimentos), calculados uma vez por combinação de opções."""
+        frequencias = self.frequencias
+        chave = (construtor, comprimento_maximo)
+        if chave not in self._comprimentos:
+            self._comprimentos[chave] = calcular_comprimentos(frequencias, construtor, comprimento_maximo)
+        return self._comprimentos[chave]
+
+    def codigos(self, construtor: str = 'duas_filas', comprimento_maximo: Optional[int] = None) -> Dict[Simbolo, str]:
+        """Os códigos canônicos gravados por compactar() com as mesmas opções."""
+        comprimentos = self.comprimentos(construtor, comprimento_maximo)
+        chave = (construtor, comprimento_maximo)
+        if chave not in self._codigos:
+            self._codigos[chave] = gerar_codigos_canonicos(comprimentos)
+        return self._codigos[chave]
+
+    def _caminho_cache(self) -> str:
+        nome = hashlib.sha256(self.assinatura[0].encode('utf-8', 'surrogatepass')).hexdigest()[:32]
+        return os.path.join(self.diretorio_cache, nome + EXTENSAO_CACHE)
+
+    def _ler_cache(self):
+        if self.diretorio_cache is None:
+            return
+        try:
+            with open(self._caminho_cache(), 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            caminho, tamanho, mtime_ns = self.assinatura
+            if (dados['versao'] != VERSAO_CACHE or dados['caminho'] != caminho or dados['tamanho'] != tamanho
+                    or dados['mtime_ns'] != mtime_ns or self.modo not in (dados['modo_pedido'], dados['modo'])):
+                return
+            self._modo_efetivo = dados['modo']
+            self._frequencias = {simbolo: freq for simbolo, freq in dados['frequencias']}
+        except (OSError, ValueError, KeyError, TypeError):
+            # Cache ausente ou ilegível: as frequências são contadas de novo
+            return
+
+    def _gravar_cache(self):
+        if self.diretorio_cache is None:
+            return
+        caminho, tamanho, mtime_ns = self.assinatura
+        dados = {'versao': VERSAO_CACHE, 'caminho': caminho, 'tamanho': tamanho, 'mtime_ns': mtime_ns,
+                 'modo_pedido': self.modo, 'modo': self._modo_efetivo,
+                 'frequencias': list(self._frequencias.items())}
+        try:
+            os.makedirs(self.diretorio_cache, exist_ok=True)
+            # Grava num temporário e renomeia: processos em paralelo nunca leem um cache pela metade
+            descritor, temporario = tempfile.mkstemp(dir=self.diretorio_cache, suffix='.tmp')
+            try:
+                with os.fdopen(descritor, 'w', encoding='utf-8') as f:
+                    json.dump(dados, f, ensure_ascii=False)
+                os.replace(temporario, self._caminho_cache())
+            except BaseException:
+                os.remove(temporario)
+                raise
+        except OSError:
+            # O cache é só uma otimização: sem ele, a próxima análise conta de novo
+            return
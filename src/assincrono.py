@@ -0,0 +1,180 @@
+import asyncio
+import os
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from src.compressor import compactar, descompactar
+from src.fluxo import (TAMANHO_QUADRO_INICIAL, TAMANHO_QUADRO_MAXIMO, Descompactador, ModeloAdaptativo,
+                       codificar_quadro, decodificar_quadro, inicio_fluxo)
+
+# --- API assíncrona (asyncio) ---
+#
+# Para serviços baseados em asyncio, que não podem bloquear o event loop. O
+# trabalho de CPU roda num conjunto limitado de processos, e um semáforo
+# limita quantas tarefas ficam no executor ao mesmo tempo: os pedidos além
+# desse limite esperam no próprio loop (backpressure), sem sobrecarregar os
+# núcleos nem acumular dados na fila do executor.
+#
+# Cancelar a tarefa que aguarda uma operação cancela o trabalho ainda na
+# fila; o trabalho que já começou num processo termina em segundo plano.
+
+
+def _compactar_arquivo(entrada: str, saida: str, opcoes: dict):
+    # compactar() apenas imprime quando a entrada não existe; aqui é um erro
+    if not os.path.isfile(entrada):
+        raise FileNotFoundError(f"Arquivo '{entrada}' não encontrado.")
+    compactar(entrada, saida, **opcoes)
+
+
+def _descompactar_arquivo(entrada: str, saida: str, opcoes: dict):
+    descompactar(entrada, saida, **opcoes)
+
+
+def _codificar_quadro(contagens: List[int], dados: bytes) -> Tuple[bytes, List[int]]:
+    # O modelo viaja entre o loop e os processos apenas como as 256 contagens
+    modelo = ModeloAdaptativo(contagens)
+    return codificar_quadro(modelo, dados), modelo.contagens
+
+
+def _decodificar_quadro(contagens: List[int], n_bytes: int, codificados: bytes) -> Tuple[bytes, List[int]]:
+    modelo = ModeloAdaptativo(contagens)
+    return decodificar_quadro(modelo, n_bytes, codificados), modelo.contagens
+
+
+class ServicoCompactacao:
+    """
+    Compactação e descompactação assíncronas com um executor limitado.
+
+    Por padrão usa um ProcessPoolExecutor com 'workers' processos (o número
+    de CPUs), criado no primeiro uso; no máximo 'max_pendentes' operações
+    ocupam o executor ao mesmo tempo. Um 'executor' próprio pode ser
+    informado e, nesse caso, não é encerrado por fechar().
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pendentes: Optional[int] = None,
+                 executor: Optional[Executor] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pendentes = max_pendentes or 2 * self.workers
+        self._executor = executor
+        self._executor_proprio = executor is None
+        self._semaforo: Optional[asyncio.Semaphore] = None
+
+    async def _executar(self, funcao: Callable, *args):
+        # O semáforo é criado dentro do loop em execução (exigência do Python 3.9)
+        if self._semaforo is None:
+            self._semaforo = asyncio.Semaphore(self.max_pendentes)
+        async with self._semaforo:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.workers)
+            return await asyncio.get_running_loop().run_in_executor(self._executor, funcao, *args)
+
+    async def compactar(self, entrada: str, saida: str, **opcoes):
+        """
+        Versão assíncrona de compactar(), com as mesmas opções (exceto
+        'metricas', que não atravessa processos).
+
+        Raises:
+            FileNotFoundError: Se 'entrada' não existir.
+        """
+        await self._executar(_compactar_arquivo, entrada, saida, opcoes)
+
+    async def descompactar(self, entrada: str, saida: str, **opcoes):
+        """
+        Versão assíncrona de descompactar().
+
+        Raises:
+            FileNotFoundError: Se 'entrada' não existir.
+            ValueError: Se o arquivo estiver corrompido ou tiver versão desconhecida.
+        """
+        await self._executar(_descompactar_arquivo, entrada, saida, opcoes)
+
+    async def compactar_fluxo(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter,
+                              tamanho_quadro: int = TAMANHO_QUADRO_MAXIMO) -> int:
+        """
+        Compacta os dados de 'leitor' em 'escritor' no modo adaptativo (o mesmo
+        formato de fluxo.py), quadro a quadro. Cada quadro espera o escritor
+        esvaziar (drain) antes de ler o próximo.
+
+        Returns:
+            A quantidade de bytes lidos.
+        """
+        inicio = inicio_fluxo()
+        escritor.write(inicio)
+        crc = zlib.crc32(inicio)
+        contagens = ModeloAdaptativo().contagens
+        total = 0
+        limite = min(TAMANHO_QUADRO_INICIAL, tamanho_quadro)
+        while True:
+            dados = await leitor.read(limite)
+            if not dados:
+                break
+            quadro, contagens = await self._executar(_codificar_quadro, contagens, dados)
+            # Mesmo enquadramento do Compactador: CRC32 de cada quadro e, no fim, o do fluxo
+            quadro += zlib.crc32(quadro).to_bytes(4, 'big')
+            crc = zlib.crc32(quadro, crc)
+            escritor.write(quadro)
+            await escritor.drain()
+            total += len(dados)
+            limite = min(2 * limite, tamanho_quadro)
+        escritor.write(b'\x00' + zlib.crc32(b'\x00', crc).to_bytes(4, 'big'))
+        await escritor.drain()
+        return total
+
+    async def descompactar_fluxo(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> int:
+        """
+        Descompacta um fluxo adaptativo de 'leitor' em 'escritor', quadro a quadro.
+        Os quadros são conferidos no loop e decodificados no executor.
+
+        Returns:
+            A quantidade de bytes escritos.
+
+        Raises:
+            ValueError: Se o fluxo não for do modo adaptativo, estiver truncado ou corrompido.
+        """
+        descompactador = Descompactador()
+        contagens = ModeloAdaptativo().contagens
+        while not descompactador.terminado:
+            pedaco = await leitor.read(TAMANHO_QUADRO_MAXIMO)
+            if not pedaco:
+                break
+            for n_bytes, codificados in descompactador.separar(pedaco):
+                dados, contagens = await self._executar(_decodificar_quadro, contagens, n_bytes, codificados)
+                escritor.write(dados)
+                await escritor.drain()
+        descompactador.finalizar()
+        return descompactador.total
+
+    def fechar(self):
+        """Encerra o executor criado pelo serviço, esperando o trabalho em andamento."""
+        if self._executor_proprio and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def __aenter__(self) -> 'ServicoCompactacao':
+        return self
+
+    async def __aexit__(self, *excecao):
+        # shutdown() bloqueia até o fim do trabalho em andamento: roda fora do loop
+        await asyncio.get_running_loop().run_in_executor(None, self.fechar)
+
+
+# Serviço compartilhado pelas funções do módulo, criado no primeiro uso
+_servico_padrao: Optional[ServicoCompactacao] = None
+
+
+def _servico() -> ServicoCompactacao:
+    global _servico_padrao
+    if _servico_padrao is None:
+        _servico_padrao = ServicoCompactacao()
+    return _servico_padrao
+
+
+async def compactar_assincrono(entrada: str, saida: str, **opcoes):
+    """await compactar_assincrono(entrada, saida): compactar() sem bloquear o event loop."""
+    await _servico().compactar(entrada, saida, **opcoes)
+
+
+async def descompactar_assincrono(entrada: str, saida: str, **opcoes):
+    """await descompactar_assincrono(entrada, saida): descompactar() sem bloquear o event loop."""
+    await _servico().descompactar(entrada, saida, **opcoes)
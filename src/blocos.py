@@ -0,0 +1,260 @@
+import io
+import os
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import accumulate
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from src.codificador import CodificadorBits
+from src.decodificador import construir_tabela_decodificacao, decodificar_tabela
+from src.formato import (FLAG_INTEGRIDADE, MAGICO, VERSAO_BLOCOS, escrever_tabela_comprimentos, escrever_varint,
+                         fim_conteudo, ler_tabela_comprimentos, ler_varint, ler_versao, possui_integridade)
+from src.frequencias import MODOS, gerar_tabela_frequencias, gerar_tabela_frequencias_modo
+from src.huffman_tree import calcular_comprimentos, construir_arvore_canonica, gerar_codigos_canonicos
+from src.integridade import EscritorVerificado, VerificadorIntegridade
+
+# --- Contêiner de blocos (versão 3 do formato .huff) ---
+#
+#   MAGICO | versão (1 byte) | flags (1 byte) | [tabela de comprimentos global]
+#   bloco 0 | bloco 1 | ... | índice | posição do índice (8 bytes, big-endian)
+#
+# Cada bloco começa alinhado em byte e, sem a flag de tabela global, traz a
+# sua própria tabela de comprimentos antes dos dados. A flag de bytes indica
+# que o alfabeto são valores de byte (modo binário) em vez de caracteres. O índice guarda, para
+# cada bloco, a posição no arquivo e a quantidade de caracteres, o que
+# permite decodificar os blocos de forma independente e em paralelo.
+
+TAMANHO_BLOCO_PADRAO = 1 << 20
+FLAG_TABELA_GLOBAL = 0x01
+FLAG_BYTES = 0x02
+
+# (posição no arquivo, quantidade de caracteres, quantidade de bytes)
+EntradaIndice = Tuple[int, int, int]
+
+# Estado de cada processo trabalhador, definido uma única vez pelo inicializador
+# para não reenviar a tabela de códigos a cada bloco.
+_codigos_globais: Optional[Dict[str, str]] = None
+_comprimento_maximo: Optional[int] = None
+_raiz_global = None
+_tabela_global = None
+_simbolos_bytes = False
+
+
+def _inicializar_codificacao(comprimentos: Optional[Dict[str, int]], comprimento_maximo: Optional[int] = None):
+    global _codigos_globais, _comprimento_maximo
+    _codigos_globais = gerar_codigos_canonicos(comprimentos) if comprimentos is not None else None
+    _comprimento_maximo = comprimento_maximo
+
+
+def _codificar_bloco(texto: str) -> Tuple[int, bytes]:
+    """Codifica um bloco com a tabela global ou com uma tabela própria."""
+    saida = io.BytesIO()
+    codigos = _codigos_globais
+    if codigos is None:
+        comprimentos = calcular_comprimentos(gerar_tabela_frequencias(texto), comprimento_maximo=_comprimento_maximo)
+        escrever_tabela_comprimentos(saida, comprimentos)
+        codigos = gerar_codigos_canonicos(comprimentos)
+
+    codificador = CodificadorBits(codigos)
+    saida.write(codificador.codificar(texto))
+    saida.write(codificador.finalizar())
+    return len(texto), saida.getvalue()
+
+
+def _inicializar_decodificacao(comprimentos: Optional[Dict[str, int]], simbolos_bytes: bool):
+    global _raiz_global, _tabela_global, _simbolos_bytes
+    _simbolos_bytes = simbolos_bytes
+    _raiz_global = None
+    _tabela_global = None
+    if comprimentos is not None:
+        _raiz_global = construir_arvore_canonica(comprimentos)
+        if _raiz_global is not None and _raiz_global.char is None:
+            _tabela_global = construir_tabela_decodificacao(_raiz_global)
+
+
+def _decodificar_dados(dados: bytes, n_chars: int, raiz, tabela, simbolos_bytes: bool) -> Union[str, bytes]:
+    """Decodifica os bytes de um bloco; sem raiz global, lê a tabela própria do bloco."""
+    if raiz is None:
+        buffer = io.BytesIO(dados)
+        raiz = construir_arvore_canonica(ler_tabela_comprimentos(buffer, simbolos_bytes))
+        dados = buffer.read()
+    if raiz is None or n_chars == 0:
+        return b"" if simbolos_bytes else ""
+
+    # Caso especial: bloco com um único tipo de símbolo repetido
+    if raiz.char is not None:
+        return (bytes((raiz.char,)) if simbolos_bytes else raiz.char) * n_chars
+    return decodificar_tabela(dados, raiz, n_chars, tabela=tabela)
+
+
+def _decodificar_bloco(caminho: str, posicao: int, n_bytes: int, n_chars: int) -> Union[str, bytes]:
+    """Lê e decodifica um único bloco diretamente do arquivo."""
+    with open(caminho, 'rb') as f:
+        f.seek(posicao)
+        dados = f.read(n_bytes)
+    return _decodificar_dados(dados, n_chars, _raiz_global, _tabela_global, _simbolos_bytes)
+
+
+def _em_ordem(executor: Executor, funcao: Callable, argumentos: Iterable[tuple], max_pendentes: int) -> Iterator:
+    """
+    Submete as tarefas ao executor mantendo no máximo 'max_pendentes' em
+    andamento, e entrega os resultados na ordem de submissão.
+    """
+    pendentes = deque()
+    for args in argumentos:
+        pendentes.append(executor.submit(funcao, *args))
+        if len(pendentes) >= max_pendentes:
+            yield pendentes.popleft().result()
+    while pendentes:
+        yield pendentes.popleft().result()
+
+
+def compactar_blocos(caminho_entrada: str, caminho_saida: str, tamanho_bloco: int = TAMANHO_BLOCO_PADRAO,
+                     workers: Optional[int] = None, tabela_por_bloco: bool = False, modo: str = 'auto',
+                     comprimento_maximo: Optional[int] = None, verificacao: bool = True) -> int:
+    """
+    Compacta um arquivo de texto dividindo-o em blocos de 'tamanho_bloco'
+    caracteres, codificados em paralelo por 'workers' processos.
+
+    Args:
+        caminho_entrada: O arquivo a compactar.
+        caminho_saida: O contêiner .huff a ser gerado.
+        tamanho_bloco: Quantidade de caracteres (ou bytes, no modo binário) por bloco.
+        workers: Número de processos (padrão: número de CPUs).
+        tabela_por_bloco: Se True, cada bloco usa a sua própria tabela de códigos
+            e a passada de contagem global é dispensada.
+        modo: 'texto', 'bytes' ou 'auto' (veja gerar_tabela_frequencias_modo).
+        comprimento_maximo: Limite, em bits, para os códigos (veja calcular_comprimentos).
+        verificacao: Se True, grava o rodapé de integridade (veja integridade.py).
+
+    Returns:
+        A quantidade de símbolos compactados.
+    """
+    if tamanho_bloco <= 0:
+        raise ValueError("O tamanho do bloco deve ser positivo.")
+    workers = workers or os.cpu_count() or 1
+
+    comprimentos = None
+    if modo == 'auto' or not tabela_por_bloco:
+        # A contagem global também define o modo quando ele é automático
+        modo, frequencias = gerar_tabela_frequencias_modo(caminho_entrada, modo)
+        if not tabela_por_bloco:
+            comprimentos = calcular_comprimentos(frequencias, comprimento_maximo=comprimento_maximo)
+    elif modo not in MODOS:
+        raise ValueError(f"Modo desconhecido: '{modo}'. Use um de {MODOS}.")
+
+    flags = 0 if tabela_por_bloco else FLAG_TABELA_GLOBAL
+    if modo == 'bytes':
+        flags |= FLAG_BYTES
+        f_in, fim_arquivo = open(caminho_entrada, 'rb'), b''
+    else:
+        f_in, fim_arquivo = open(caminho_entrada, 'r', encoding='utf-8'), ''
+
+    indice: List[Tuple[int, int]] = []
+    with f_in, open(caminho_saida, 'wb') as f_out, \
+            ProcessPoolExecutor(workers, initializer=_inicializar_codificacao,
+                                initargs=(comprimentos, comprimento_maximo)) as executor:
+        f = EscritorVerificado(f_out) if verificacao else f_out
+        f.write(MAGICO)
+        f.write(bytes([VERSAO_BLOCOS | (FLAG_INTEGRIDADE if verificacao else 0), flags]))
+        if comprimentos is not None:
+            escrever_tabela_comprimentos(f, comprimentos)
+
+        blocos = ((bloco,) for bloco in iter(lambda: f_in.read(tamanho_bloco), fim_arquivo))
+        for n_chars, dados in _em_ordem(executor, _codificar_bloco, blocos, 2 * workers):
+            indice.append((f.tell(), n_chars))
+            f.write(dados)
+
+        posicao_indice = f.tell()
+        escrever_varint(f, len(indice))
+        for posicao, n_chars in indice:
+            escrever_varint(f, posicao)
+            escrever_varint(f, n_chars)
+        f.write(posicao_indice.to_bytes(8, 'big'))
+        if verificacao:
+            f.finalizar()
+    return sum(n_chars for _, n_chars in indice)
+
+
+def ler_indice(f: BinaryIO) -> Tuple[Optional[Dict[str, int]], List[EntradaIndice], bool]:
+    """
+    Lê o cabeçalho e o índice de um contêiner de blocos.
+
+    Returns:
+        A tabela de comprimentos global (None se cada bloco tem a sua), a
+        lista de entradas (posição, caracteres, bytes) de cada bloco e se o
+        alfabeto é de bytes (modo binário).
+    """
+    f.seek(0)
+    try:
+        ler_versao(f, VERSAO_BLOCOS)
+    except ValueError:
+        raise ValueError("O arquivo não é um contêiner de blocos .huff.") from None
+    flags = f.read(1)
+    if not flags:
+        raise ValueError("Cabeçalho truncado: flags ausentes.")
+    simbolos_bytes = bool(flags[0] & FLAG_BYTES)
+    comprimentos = ler_tabela_comprimentos(f, simbolos_bytes) if flags[0] & FLAG_TABELA_GLOBAL else None
+
+    f.seek(fim_conteudo(f) - 8)
+    posicao_indice = int.from_bytes(f.read(8), 'big')
+    f.seek(posicao_indice)
+    n_blocos = ler_varint(f)
+    entradas = [(ler_varint(f), ler_varint(f)) for _ in range(n_blocos)]
+
+    fins = [posicao for posicao, _ in entradas[1:]] + [posicao_indice]
+    indice = [(posicao, n_chars, fim - posicao) for (posicao, n_chars), fim in zip(entradas, fins)]
+    return comprimentos, indice, simbolos_bytes
+
+
+def descompactar_blocos(caminho_entrada: str, caminho_saida: str, workers: Optional[int] = None) -> int:
+    """
+    Descompacta um contêiner de blocos, decodificando os blocos em paralelo
+    e escrevendo o texto na ordem original. Retorna a quantidade de símbolos.
+
+    Raises:
+        ValueError: Se o contêiner estiver corrompido.
+    """
+    workers = workers or os.cpu_count() or 1
+    with open(caminho_entrada, 'rb') as f:
+        if possui_integridade(f):
+            # Os blocos são lidos pelos processos: o arquivo é conferido antes
+            VerificadorIntegridade(f).concluir(f)
+        comprimentos, indice, simbolos_bytes = ler_indice(f)
+
+    f_out = open(caminho_saida, 'wb') if simbolos_bytes else open(caminho_saida, 'w', encoding='utf-8')
+    with f_out, ProcessPoolExecutor(workers, initializer=_inicializar_decodificacao,
+                                    initargs=(comprimentos, simbolos_bytes)) as executor:
+        tarefas = ((caminho_entrada, posicao, n_bytes, n_chars) for posicao, n_chars, n_bytes in indice)
+        for texto in _em_ordem(executor, _decodificar_bloco, tarefas, 2 * workers):
+            f_out.write(texto)
+    return sum(n_chars for _, n_chars, _ in indice)
+
+
+def extrair_trecho_blocos(f: BinaryIO, inicio: int, fim: Optional[int] = None) -> Union[str, bytes]:
+    """
+    Extrai os caracteres [inicio, fim) de um contêiner de blocos, decodificando
+    apenas os blocos que se sobrepõem ao intervalo.
+    """
+    comprimentos, indice, simbolos_bytes = ler_indice(f)
+    raiz = construir_arvore_canonica(comprimentos) if comprimentos is not None else None
+    tabela = None
+    if raiz is not None and raiz.char is None:
+        tabela = construir_tabela_decodificacao(raiz)
+
+    # Posição, em caracteres, do início de cada bloco
+    inicios_blocos = list(accumulate((n_chars for _, n_chars, _ in indice), initial=0))
+    if fim is None:
+        fim = inicios_blocos[-1]
+    primeiro = max(bisect_right(inicios_blocos, inicio) - 1, 0)
+
+    partes = []
+    for i in range(primeiro, len(indice)):
+        if inicios_blocos[i] >= fim:
+            break
+        posicao, n_chars, n_bytes = indice[i]
+        f.seek(posicao)
+        texto = _decodificar_dados(f.read(n_bytes), n_chars, raiz, tabela, simbolos_bytes)
+        partes.append(texto[max(inicio - inicios_blocos[i], 0):fim - inicios_blocos[i]])
+    return (b"" if simbolos_bytes else "").join(partes)
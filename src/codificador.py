@@ -0,0 +1,67 @@
+from typing import Dict, Union
+
+# Quantidade de caracteres traduzidos por lote. Lotes grandes amortizam o custo
+# das chamadas de Python; 64K caracteres mantêm a string de bits temporária
+# abaixo de alguns MB mesmo para códigos longos.
+TAMANHO_LOTE = 1 << 16
+
+
+class CodificadorBits:
+    """
+    Empacota os códigos de Huffman de um texto em bytes.
+
+    Cada lote do texto é traduzido para sua sequência de bits com um único
+    'join' sobre a tabela de códigos (o laço roda em C) e os bits são
+    convertidos para inteiro de uma só vez. No modo binário os códigos ficam
+    num vetor de 256 posições indexado diretamente pelo valor do byte.
+    Os bits que não completam um byte ficam guardados no acumulador inteiro
+    até o próximo lote, de modo que a saída é idêntica à da codificação
+    caractere a caractere.
+    """
+
+    def __init__(self, codigos: Dict[Union[str, int], str]):
+        if codigos and isinstance(next(iter(codigos)), int):
+            vetor = [''] * 256
+            for byte, codigo in codigos.items():
+                vetor[byte] = codigo
+            self._codigo_de = vetor.__getitem__
+        else:
+            self._codigo_de = codigos.__getitem__
+        self._resto = 0
+        self._bits_resto = 0
+        self._bits_emitidos = 0
+
+    @property
+    def bits_emitidos(self) -> int:
+        """Total de bits de dados produzidos até agora (sem o padding final)."""
+        return self._bits_emitidos
+
+    def codificar(self, texto: Union[str, bytes]) -> bytes:
+        """Codifica um trecho de texto e retorna apenas os bytes completos."""
+        saida = bytearray()
+        for inicio in range(0, len(texto), TAMANHO_LOTE):
+            bits = self._traduzir(texto[inicio:inicio + TAMANHO_LOTE])
+            if not bits:
+                continue
+            self._bits_emitidos += len(bits)
+            total_bits = self._bits_resto + len(bits)
+            acumulador = (self._resto << len(bits)) | int(bits, 2)
+
+            self._bits_resto = total_bits % 8
+            n_bytes = total_bits // 8
+            saida += (acumulador >> self._bits_resto).to_bytes(n_bytes, 'big')
+            self._resto = acumulador & ((1 << self._bits_resto) - 1)
+        return bytes(saida)
+
+    def _traduzir(self, lote: Union[str, bytes]) -> str:
+        """Sequência de bits de um lote; subclasses podem mudar o modelo (veja contexto.py)."""
+        return "".join(map(self._codigo_de, lote))
+
+    def finalizar(self) -> bytes:
+        """Retorna o último byte parcial, completado com zeros à direita."""
+        if not self._bits_resto:
+            return b''
+        byte = self._resto << (8 - self._bits_resto)
+        self._resto = 0
+        self._bits_resto = 0
+        return byte.to_bytes(1, 'big')
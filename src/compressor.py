@@ -1,118 +1,661 @@
-import json
-from typing import Dict
+import contextlib
+import errno
+import functools
+import io
+import mmap
+import os
+import sys
+import traceback
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from src.frequencias import gerar_tabela_frequencias
-from src.huffman_tree import construir_arvore, gerar_codigos
+from src.analise import AnaliseArquivo
+from src.blocos import compactar_blocos, descompactar_blocos
+from src.codificador import CodificadorBits
+from src.contexto import CodificadorContexto, ModeloContexto, construir_modelo, contar_pares, decodificar_contexto_fluxo
+from src.decodificador import DECODIFICADORES
+from src.dicionario import TabelaTreinada, buscar_tabela, obter_tabela
+from src.fluxo import Descompactador, compactar_fluxo, descompactar_fluxo
+from src.formato import (FLAG_INTEGRIDADE, VERSAO_BLOCOS, VERSAO_BYTES, VERSAO_CONTEXTO, VERSAO_FLUXO,
+                         VERSAO_FORMATO, VERSAO_SINCRONIZADA, VERSAO_TREINADA,
+                         escrever_cabecalho, escrever_cabecalho_contexto, escrever_cabecalho_treinado,
+                         escrever_pontos_sincronizacao, identificar_versao, ler_cabecalho, ler_cabecalho_contexto,
+                         ler_cabecalho_treinado, possui_integridade)
+from src.frequencias import gerar_tabela_frequencias, gerar_tabela_frequencias_modo
+from src.huffman_tree import Simbolo, calcular_comprimentos, gerar_codigos_canonicos
+from src.integridade import EscritorVerificado, VerificadorIntegridade
+from src.metricas import Metricas
 
+# Tamanho dos blocos lidos do disco: caracteres (ou bytes, no modo binário) na
+# compactação, bytes na descompactação.
+# Com blocos de 1M o pico de memória fica em poucos MB, independente do tamanho do arquivo.
+TAMANHO_BLOCO_LEITURA = 1 << 20
 
-def compactar(caminho_entrada: str, caminho_saida: str):
+# A cada quantos caracteres um ponto de sincronização é registrado. Custa poucos
+# bytes por ponto e limita o trabalho de extrair um trecho (veja acesso.py).
+INTERVALO_SINCRONIZACAO_PADRAO = 1 << 16
+
+# Caminho que representa a entrada ou a saída padrão (stdin/stdout)
+FLUXO_PADRAO = '-'
+
+# Formatos cujo alfabeto são os bytes: a descompactação produz bytes, e não texto
+VERSOES_BYTES = (VERSAO_BYTES, VERSAO_TREINADA, VERSAO_CONTEXTO)
+
+
+def compactar(caminho_entrada: str, caminho_saida: str, tamanho_bloco: Optional[int] = None,
+              workers: Optional[int] = None, tabela_por_bloco: bool = False,
+              intervalo_sincronizacao: int = INTERVALO_SINCRONIZACAO_PADRAO, modo: str = 'auto',
+              metricas: Optional[Metricas] = None, construtor: str = 'duas_filas',
+              comprimento_maximo: Optional[int] = None,
+              tabela: Optional[Union[str, TabelaTreinada]] = None, adaptativo: bool = False,
+              contexto: bool = False, verificacao: Optional[bool] = None,
+              analise: Optional[AnaliseArquivo] = None, cache: Optional[str] = None):
     """
     Lê um arquivo de texto, compacta seu conteúdo usando o algoritmo de Huffman
     e salva o resultado em um arquivo binário .huff.
-    Versão otimizada que não cria uma string de bits gigante em memória.
+
+    O 'modo' define o alfabeto: 'texto' (caracteres de um arquivo UTF-8),
+    'bytes' (os 256 valores de byte, para qualquer arquivo) ou 'auto', que
+    usa bytes para arquivos ASCII ou que não são UTF-8 válido.
+
+    O arquivo é processado em duas passadas por blocos: a primeira conta as
+    frequências e a segunda codifica, de modo que o texto nunca fica inteiro
+    na memória.
+
+    A cada 'intervalo_sincronizacao' caracteres é registrado um ponto de
+    sincronização para acesso aleatório (0 desativa e gera o formato sem tabela).
+
+    Se 'tamanho_bloco' for informado, gera o contêiner de blocos independentes,
+    codificados em paralelo por 'workers' processos (veja blocos.py); cada
+    bloco já funciona como ponto de sincronização.
+
+    'construtor' escolhe o algoritmo de construção da árvore ('duas_filas' ou
+    'heap', que produzem a mesma árvore) e 'comprimento_maximo' limita o
+    tamanho dos códigos, em bits (veja calcular_comprimentos).
+
+    Se 'metricas' for informado, recebe o tempo de cada etapa, os bytes lidos
+    e gravados e o progresso, que é repassado aos seus observadores.
+
+    Com uma 'tabela' treinada (caminho do arquivo ou TabelaTreinada, veja
+    dicionario.py), o arquivo é lido em uma única passada, sem contagem nem
+    tabela no cabeçalho; as demais opções de formato são ignoradas.
+
+    Com 'adaptativo', ou quando a entrada é '-' (stdin), o arquivo é lido uma
+    única vez e codificado em quadros pelo modo adaptativo (veja fluxo.py);
+    '-' como saída grava em stdout.
+
+    Com 'contexto', os bytes da entrada são codificados pelo modelo de
+    contexto de ordem 1 (veja contexto.py): o código de cada byte depende do
+    byte anterior, o que compacta melhor textos e logs. Valem
+    'comprimento_maximo' e 'verificacao'; as demais opções de formato são
+    ignoradas.
+
+    Com 'verificacao', o arquivo leva o CRC32 de cada pedaço do conteúdo (ou
+    de cada quadro, no modo adaptativo), conferido na descompactação e pelo
+    comando verify (veja integridade.py). Por padrão fica ligada, exceto com
+    tabela treinada: feita para arquivos pequenos, nela os bytes do rodapé
+    pesariam mais que o ganho da compactação.
+
+    Uma 'analise' do mesmo arquivo (veja analise.py) fornece as frequências
+    e os códigos já calculados, e o modo dela substitui 'modo'; com 'cache',
+    um diretório, as frequências são lidas e gravadas nele. Nos dois casos a
+    passada de contagem é pulada quando o arquivo não mudou. Valem para o
+    formato comum (sem blocos, tabela treinada, contexto ou modo adaptativo).
     """
+    metricas = metricas if metricas is not None else Metricas()
+    if verificacao is None:
+        verificacao = tabela is None or adaptativo or caminho_entrada == FLUXO_PADRAO
+    if adaptativo or caminho_entrada == FLUXO_PADRAO:
+        try:
+            f_in = _abrir(caminho_entrada, 'rb')
+        except FileNotFoundError:
+            print(f"Erro: Arquivo de entrada '{caminho_entrada}' não encontrado.")
+            return
+        with f_in as entrada, _abrir(caminho_saida, 'wb') as saida:
+            compactar_fluxo(entrada, saida, metricas, verificacao=verificacao)
+        return
+    if tabela is not None:
+        _compactar_treinado(caminho_entrada, caminho_saida, obter_tabela(tabela), metricas, verificacao)
+        return
+    if contexto:
+        _compactar_contexto(caminho_entrada, caminho_saida, metricas, comprimento_maximo, verificacao)
+        return
+    if tamanho_bloco is not None:
+        try:
+            tamanho = os.path.getsize(caminho_entrada)
+            metricas.iniciar('compactar', tamanho)
+            with metricas.etapa('blocos'):
+                metricas.simbolos = compactar_blocos(caminho_entrada, caminho_saida, tamanho_bloco, workers,
+                                                     tabela_por_bloco, modo, comprimento_maximo, verificacao)
+        except FileNotFoundError:
+            print(f"Erro: Arquivo de entrada '{caminho_entrada}' não encontrado.")
+            return
+        metricas.bytes_entrada = tamanho
+        metricas.bytes_saida = os.path.getsize(caminho_saida)
+        metricas.finalizar()
+        return
+
     try:
-        with open(caminho_entrada, 'r', encoding='utf-8') as f:
-            texto = f.read()
+        tamanho = os.path.getsize(caminho_entrada)
+        if analise is None and cache is not None:
+            analise = AnaliseArquivo(caminho_entrada, modo, cache)
+        if analise is not None and os.path.abspath(analise.caminho) != os.path.abspath(caminho_entrada):
+            raise ValueError(f"A análise é de '{analise.caminho}', e não de '{caminho_entrada}'.")
+        # Duas passadas sobre a entrada (contagem e codificação), ou só a
+        # codificação quando a análise já tem as frequências
+        contar = analise is None or not analise.disponivel()
+        metricas.iniciar('compactar', 2 * tamanho if contar else tamanho)
+        with metricas.etapa('frequencias'):
+            if analise is not None:
+                modo, frequencias = analise.modo_efetivo, analise.frequencias
+            else:
+                modo, frequencias = gerar_tabela_frequencias_modo(caminho_entrada, modo, TAMANHO_BLOCO_LEITURA)
     except FileNotFoundError:
         print(f"Erro: Arquivo de entrada '{caminho_entrada}' não encontrado.")
         return
+    if contar:
+        metricas.avancar(tamanho)
 
-    if not texto:
+    if not frequencias:
         with open(caminho_saida, 'wb') as f:
             f.write(b'')
+        metricas.finalizar()
         return
 
-    frequencias = gerar_tabela_frequencias(texto)
-    raiz = construir_arvore(frequencias)
-    codigos = gerar_codigos(raiz)
-
-    # O cabeçalho precisa conter as frequências E o número de caracteres
-    # para que a descompactação saiba exatamente quando parar.
-    header_data = {
-        'frequencias': frequencias,
-        'total_chars': len(texto)
-    }
-    cabecalho_json = json.dumps(header_data)
-    cabecalho_bytes = cabecalho_json.encode('utf-8')
-
-    with open(caminho_saida, 'wb') as f:
-        # Escreve o tamanho do cabeçalho e o cabeçalho
-        f.write(len(cabecalho_bytes).to_bytes(4, 'big'))
-        f.write(cabecalho_bytes)
-
-        # Escreve os dados compactados de forma eficiente
-        bit_buffer = ""
-        for char in texto:
-            bit_buffer += codigos[char]
-            while len(bit_buffer) >= 8:
-                byte = int(bit_buffer[:8], 2)
-                f.write(byte.to_bytes(1, 'big'))
-                bit_buffer = bit_buffer[8:]
-        
-        # Escreve o último byte, se houver bits restantes (com padding)
-        if bit_buffer:
-            byte = int(bit_buffer.ljust(8, '0'), 2)
-            f.write(byte.to_bytes(1, 'big'))
-
-
-def descompactar(caminho_entrada: str, caminho_saida: str):
+    # Apenas os comprimentos dos códigos vão para o cabeçalho; os códigos
+    # canônicos são reconstruídos a partir deles na descompactação.
+    with metricas.etapa('arvore'):
+        comprimentos = (analise.comprimentos(construtor, comprimento_maximo) if analise is not None
+                        else calcular_comprimentos(frequencias, construtor, comprimento_maximo))
+    with metricas.etapa('codigos'):
+        codigos = (analise.codigos(construtor, comprimento_maximo) if analise is not None
+                   else gerar_codigos_canonicos(comprimentos))
+
+    mapa = None
+    if modo == 'bytes':
+        # O formato binário sempre traz a tabela de sincronização (possivelmente vazia)
+        versao = VERSAO_BYTES
+        f_in = open(caminho_entrada, 'rb')
+        # Lê direto do arquivo mapeado em memória, em fatias sem cópia
+        mapa = _mapear(f_in)
+        blocos = _pedacos_mapeados(mapa, 0) if mapa is not None else iter(lambda: f_in.read(TAMANHO_BLOCO_LEITURA), b'')
+        posicao_entrada = None
+    else:
+        versao = VERSAO_SINCRONIZADA if intervalo_sincronizacao else VERSAO_FORMATO
+        f_in = open(caminho_entrada, 'r', encoding='utf-8')
+        blocos = iter(lambda: f_in.read(TAMANHO_BLOCO_LEITURA), '')
+        # Posição em bytes do arquivo, para o progresso
+        posicao_entrada = f_in.buffer.tell
+
+    try:
+        with f_in, open(caminho_saida, 'wb') as f, metricas.etapa('codificacao'):
+            # Segunda passada: codifica e escreve bloco a bloco
+            _escrever_compactado(f, blocos, comprimentos, codigos, sum(frequencias.values()), versao,
+                                 intervalo_sincronizacao, metricas, posicao_entrada, verificacao)
+    finally:
+        if mapa is not None:
+            mapa.close()
+
+    metricas.bytes_entrada = tamanho
+    metricas.bytes_saida = os.path.getsize(caminho_saida)
+    metricas.simbolos = sum(frequencias.values())
+    metricas.finalizar()
+
+
+def compactar_bytes(dados: Union[bytes, str], intervalo_sincronizacao: int = INTERVALO_SINCRONIZACAO_PADRAO,
+                    construtor: str = 'duas_filas', comprimento_maximo: Optional[int] = None,
+                    contexto: bool = False, verificacao: bool = True) -> bytes:
     """
-    Lê um arquivo .huff, descompacta seu conteúdo e salva o texto original.
-    Versão ajustada para ler o novo formato de cabeçalho.
+    Compacta dados já em memória e retorna o conteúdo do .huff, sem tocar o
+    disco. 'bytes' usa o alfabeto de bytes e 'str' o de caracteres; o
+    resultado é o mesmo que compactar() gravaria para um arquivo com esse
+    conteúdo (que, no modo texto, é lido com as quebras de linha
+    normalizadas), e as opções funcionam como lá. Com 'contexto', uma 'str'
+    é codificada em UTF-8 e volta como bytes na descompactação.
     """
+    if contexto:
+        dados = dados.encode('utf-8') if isinstance(dados, str) else dados
+        pares = contar_pares((dados,))
+        if not pares:
+            return b''
+        saida = io.BytesIO()
+        _escrever_compactado_contexto(saida, (dados,), construir_modelo(pares, comprimento_maximo), len(dados),
+                                      Metricas(), verificacao)
+        return saida.getvalue()
+    frequencias = gerar_tabela_frequencias(dados)
+    if not frequencias:
+        return b''
+    comprimentos = calcular_comprimentos(frequencias, construtor, comprimento_maximo)
+    if isinstance(dados, str):
+        versao = VERSAO_SINCRONIZADA if intervalo_sincronizacao else VERSAO_FORMATO
+        blocos = (dados[inicio:inicio + TAMANHO_BLOCO_LEITURA] for inicio in range(0, len(dados), TAMANHO_BLOCO_LEITURA))
+    else:
+        versao = VERSAO_BYTES
+        visao = memoryview(dados)
+        blocos = (visao[inicio:inicio + TAMANHO_BLOCO_LEITURA] for inicio in range(0, len(visao), TAMANHO_BLOCO_LEITURA))
+    saida = io.BytesIO()
+    _escrever_compactado(saida, blocos, comprimentos, gerar_codigos_canonicos(comprimentos), len(dados), versao,
+                         intervalo_sincronizacao, Metricas(), None, verificacao)
+    return saida.getvalue()
+
+
+def descompactar_bytes(dados: bytes, decodificador: str = 'tabela',
+                       tabelas: Iterable[Union[str, TabelaTreinada]] = ()) -> Union[bytes, str]:
+    """
+    Descompacta o conteúdo de um .huff já em memória: retorna 'str' para os
+    formatos de texto e 'bytes' para o modo binário, o adaptativo, o de
+    tabela treinada e o de contexto. As opções funcionam como em descompactar().
+
+    Raises:
+        ValueError: Se os dados estiverem corrompidos, forem um contêiner de
+            blocos (que só é lido de arquivos) ou tiverem versão desconhecida.
+    """
+    if decodificador not in DECODIFICADORES:
+        raise ValueError(f"Decodificador desconhecido: '{decodificador}'.")
+    if not dados:
+        return b''
+    # BufferedReader oferece o peek usado para identificar a versão
+    f = io.BufferedReader(io.BytesIO(dados))
+    versao = identificar_versao(f)
+    if versao != VERSAO_FLUXO and possui_integridade(f):
+        VerificadorIntegridade(f).concluir(f)
+        f.seek(0)
+    if versao == VERSAO_FLUXO:
+        descompactador = Descompactador()
+        return descompactador.alimentar(dados) + descompactador.finalizar()
+    if versao == VERSAO_BLOCOS:
+        raise ValueError("Contêineres de blocos só podem ser descompactados a partir de arquivos.")
+
+    total_chars, repetido, decodificar = _ler_cabecalho_versao(f, versao, decodificador, tabelas)
+    vazio = b'' if versao in VERSOES_BYTES else ''
+    if repetido is not None:
+        return repetido * total_chars
+    if decodificar is None:
+        return vazio
+    return vazio.join(decodificar((memoryview(dados)[f.tell():],)))
+
+
+def _escrever_compactado(f: BinaryIO, blocos: Iterator[Union[str, bytes, memoryview]], comprimentos: Dict,
+                         codigos: Dict, total_simbolos: int, versao: int, intervalo_sincronizacao: int,
+                         metricas: Metricas, posicao_entrada: Optional[Callable[[], int]], verificacao: bool):
+    """
+    Grava o cabeçalho, os dados codificados e, se o formato pedir, os pontos
+    de sincronização; com 'verificacao', também o rodapé de integridade.
+    """
+    if verificacao:
+        f = EscritorVerificado(f)
+    escrever_cabecalho(f, comprimentos, total_simbolos, versao | (FLAG_INTEGRIDADE if verificacao else 0))
+    codificador = CodificadorBits(codigos)
+    pontos = _codificar_blocos(blocos, f, codificador, intervalo_sincronizacao, metricas, posicao_entrada)
+
+    # Escreve o último byte, se houver bits restantes (com padding)
+    f.write(codificador.finalizar())
+
+    if versao != VERSAO_FORMATO:
+        escrever_pontos_sincronizacao(f, pontos)
+    if verificacao:
+        f.finalizar()
+
+
+def _escrever_compactado_contexto(f: BinaryIO, blocos: Iterable[Union[bytes, memoryview]], modelo: ModeloContexto,
+                                  total_bytes: int, metricas: Metricas, verificacao: bool):
+    """Grava o cabeçalho e os dados do formato de contexto (versão 8) e, se pedido, o rodapé de integridade."""
+    if verificacao:
+        f = EscritorVerificado(f)
+    escrever_cabecalho_contexto(f, modelo.contextos, modelo.compartilhada, total_bytes,
+                                FLAG_INTEGRIDADE if verificacao else 0)
+    codificador = CodificadorContexto(modelo.codigos)
+    _codificar_blocos(iter(blocos), f, codificador, 0, metricas, None)
+    f.write(codificador.finalizar())
+    if verificacao:
+        f.finalizar()
+
+
+def _ler_cabecalho_versao(f: BinaryIO, versao: int, decodificador: str,
+                          tabelas: Iterable[Union[str, TabelaTreinada]]
+                          ) -> Tuple[int, Optional[Union[Simbolo, bytes]], Optional[Callable[[Iterable], Iterator]]]:
+    """
+    Lê o cabeçalho de um arquivo de fluxo único e retorna o total de
+    símbolos, o símbolo repetido (quando o texto tem um único símbolo, já
+    como 'bytes' nos formatos binários) e a função que decodifica os pedaços
+    lidos após o cabeçalho (None quando não há nada a decodificar).
+    """
+    if versao == VERSAO_CONTEXTO:
+        contextos, compartilhada, total_bytes = ler_cabecalho_contexto(f)
+        if not total_bytes:
+            return 0, None, None
+        modelo = ModeloContexto(contextos, compartilhada)
+        return total_bytes, None, functools.partial(decodificar_contexto_fluxo, modelo=modelo, total_bytes=total_bytes)
+
+    opcoes_decodificador = {}
+    if versao == VERSAO_TREINADA:
+        identificador, total_chars = ler_cabecalho_treinado(f)
+        tabela = buscar_tabela(identificador, tabelas)
+        raiz = tabela.raiz
+        # A tabela de decodificação já construída é reaproveitada entre arquivos
+        if decodificador == 'tabela':
+            opcoes_decodificador['tabela'] = tabela.tabela_decodificacao
+    else:
+        raiz, total_chars = ler_cabecalho(f)
+    if not raiz:
+        return total_chars, None, None
+    if raiz.char is not None:
+        return total_chars, bytes((raiz.char,)) if versao in VERSOES_BYTES else raiz.char, None
+    return total_chars, None, functools.partial(DECODIFICADORES[decodificador], raiz=raiz, total_chars=total_chars,
+                                                **opcoes_decodificador)
+
+
+def _abrir(caminho: str, modo: str):
+    """Abre um arquivo binário; '-' representa stdin ou stdout, que não são fechados."""
+    if caminho == FLUXO_PADRAO:
+        return contextlib.nullcontext(sys.stdin.buffer if 'r' in modo else sys.stdout.buffer)
+    return open(caminho, modo)
+
+
+def _compactar_treinado(caminho_entrada: str, caminho_saida: str, tabela: TabelaTreinada, metricas: Metricas,
+                        verificacao: bool = False):
+    """Codifica os bytes da entrada com uma tabela treinada (formato versão 6)."""
     try:
-        with open(caminho_entrada, 'rb') as f:
-            tamanho_cabecalho_bytes = f.read(4)
-            if not tamanho_cabecalho_bytes:
-                with open(caminho_saida, 'w', encoding='utf-8') as f_out:
-                    f_out.write("")
+        f_in = open(caminho_entrada, 'rb')
+    except FileNotFoundError:
+        print(f"Erro: Arquivo de entrada '{caminho_entrada}' não encontrado.")
+        return
+
+    with f_in:
+        tamanho = os.fstat(f_in.fileno()).st_size
+        metricas.iniciar('compactar', tamanho)
+        mapa = _mapear(f_in)
+        blocos = _pedacos_mapeados(mapa, 0) if mapa is not None else iter(lambda: f_in.read(TAMANHO_BLOCO_LEITURA), b'')
+        try:
+            with open(caminho_saida, 'wb') as f_out, metricas.etapa('codificacao'):
+                f = EscritorVerificado(f_out) if verificacao else f_out
+                escrever_cabecalho_treinado(f, tabela.identificador, tamanho,
+                                            FLAG_INTEGRIDADE if verificacao else 0)
+                codificador = CodificadorBits(tabela.codigos)
+                _codificar_blocos(blocos, f, codificador, 0, metricas, None)
+                f.write(codificador.finalizar())
+                if verificacao:
+                    f.finalizar()
+        finally:
+            if mapa is not None:
+                mapa.close()
+
+    metricas.bytes_entrada = tamanho
+    metricas.bytes_saida = os.path.getsize(caminho_saida)
+    metricas.simbolos = tamanho
+    metricas.finalizar()
+
+
+def _compactar_contexto(caminho_entrada: str, caminho_saida: str, metricas: Metricas,
+                        comprimento_maximo: Optional[int], verificacao: bool):
+    """Codifica os bytes da entrada com o modelo de contexto de ordem 1 (formato versão 8)."""
+    try:
+        f_in = open(caminho_entrada, 'rb')
+    except FileNotFoundError:
+        print(f"Erro: Arquivo de entrada '{caminho_entrada}' não encontrado.")
+        return
+
+    with f_in:
+        tamanho = os.fstat(f_in.fileno()).st_size
+        # Duas passadas sobre a entrada: contagem dos pares e codificação
+        metricas.iniciar('compactar', 2 * tamanho)
+        mapa = _mapear(f_in)
+        try:
+            with metricas.etapa('frequencias'):
+                blocos = _pedacos_mapeados(mapa, 0) if mapa is not None else iter(lambda: f_in.read(TAMANHO_BLOCO_LEITURA), b'')
+                pares = contar_pares(blocos)
+            metricas.avancar(tamanho)
+            if not pares:
+                with open(caminho_saida, 'wb'):
+                    pass
+                metricas.finalizar()
                 return
+            with metricas.etapa('arvore'):
+                modelo = construir_modelo(pares, comprimento_maximo)
+
+            f_in.seek(0)
+            blocos = _pedacos_mapeados(mapa, 0) if mapa is not None else iter(lambda: f_in.read(TAMANHO_BLOCO_LEITURA), b'')
+            with open(caminho_saida, 'wb') as f, metricas.etapa('codificacao'):
+                _escrever_compactado_contexto(f, blocos, modelo, tamanho, metricas, verificacao)
+        finally:
+            if mapa is not None:
+                mapa.close()
+
+    metricas.bytes_entrada = tamanho
+    metricas.bytes_saida = os.path.getsize(caminho_saida)
+    metricas.simbolos = tamanho
+    metricas.finalizar()
+
+
+def _codificar_blocos(blocos: Iterator[Union[str, bytes, memoryview]], f: BinaryIO, codificador: CodificadorBits,
+                      intervalo_sincronizacao: int, metricas: Metricas,
+                      posicao_entrada: Optional[Callable[[], int]]) -> List[Tuple[int, int]]:
+    """
+    Codifica os blocos da entrada e grava os bytes em 'f', registrando um
+    ponto de sincronização (bit, caractere) a cada 'intervalo_sincronizacao'
+    caracteres. 'posicao_entrada' dá a posição em bytes na entrada, para o
+    progresso; sem ela, cada bloco conta o seu tamanho (modo binário).
+
+    Fica numa função à parte para que as fatias do arquivo mapeado sejam
+    liberadas ao retornar, antes de o mapeamento ser fechado.
+    """
+    pontos = []
+    total_chars = 0
+    lidos = 0
+    while True:
+        with metricas.etapa('leitura'):
+            bloco = next(blocos, None)
+        if bloco is None:
+            break
+        if not intervalo_sincronizacao:
+            saida = [codificador.codificar(bloco)]
+        else:
+            # Divide o bloco nas fronteiras múltiplas do intervalo, registrando
+            # a posição em bits onde cada intervalo começa
+            saida = []
+            inicio = 0
+            while inicio < len(bloco):
+                if total_chars % intervalo_sincronizacao == 0:
+                    pontos.append((codificador.bits_emitidos, total_chars))
+                trecho = bloco[inicio:inicio + intervalo_sincronizacao - total_chars % intervalo_sincronizacao]
+                saida.append(codificador.codificar(trecho))
+                inicio += len(trecho)
+                total_chars += len(trecho)
+        with metricas.etapa('escrita'):
+            f.write(b''.join(saida))
+        if posicao_entrada is None:
+            metricas.avancar(len(bloco))
+        else:
+            metricas.avancar(posicao_entrada() - lidos)
+            lidos = posicao_entrada()
+    return pontos
+
+
+def _mapear(f: BinaryIO) -> Optional[mmap.mmap]:
+    """Mapeia o arquivo em memória, só para leitura; None se não for possível (arquivo vazio, pipe...)."""
+    try:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
 
-            tamanho_cabecalho = int.from_bytes(tamanho_cabecalho_bytes, 'big')
-            cabecalho_bytes = f.read(tamanho_cabecalho)
-            header_data = json.loads(cabecalho_bytes.decode('utf-8'))
-            frequencias = header_data['frequencias']
-            total_chars = header_data['total_chars']
-            
-            dados_bytes = f.read()
-
-    except (FileNotFoundError, json.JSONDecodeError, IndexError, KeyError) as e:
-        # Imprime o erro para feedback imediato, mas também o relança
-        # para que a função que chamou saiba que a operação falhou.
+def _pedacos_mapeados(mapa: mmap.mmap, inicio: int, metricas: Optional[Metricas] = None) -> Iterator[memoryview]:
+    """
+    Entrega o arquivo mapeado a partir de 'inicio' em fatias de memoryview:
+    os dados vêm direto do cache de páginas do sistema, sem cópias.
+    """
+    visao = memoryview(mapa)
+    for posicao in range(inicio, len(visao), TAMANHO_BLOCO_LEITURA):
+        pedaco = visao[posicao:posicao + TAMANHO_BLOCO_LEITURA]
+        if metricas is not None:
+            metricas.avancar(len(pedaco))
+        yield pedaco
+
+
+def _preallocar(f_out, n_bytes: int):
+    """
+    Reserva de uma vez o espaço da saída no disco, quando o sistema permite,
+    de modo que falta de espaço é detectada antes de decodificar.
+    """
+    if n_bytes <= 0 or not hasattr(os, 'posix_fallocate'):
+        return
+    try:
+        os.posix_fallocate(f_out.fileno(), 0, n_bytes)
+    except OSError as e:
+        # Sistemas de arquivos sem suporte: segue sem reservar
+        if e.errno not in (errno.EOPNOTSUPP, errno.EINVAL, errno.ENOSYS, errno.ENODEV):
+            raise
+
+
+def _ler_pedacos(f: BinaryIO, metricas: Metricas) -> Iterator[bytes]:
+    """Lê o arquivo compactado em pedaços, contabilizando leitura e progresso."""
+    while True:
+        with metricas.etapa('leitura'):
+            dados = f.read(TAMANHO_BLOCO_LEITURA)
+        if not dados:
+            return
+        metricas.avancar(len(dados))
+        yield dados
+
+
+def descompactar(caminho_entrada: str, caminho_saida: str, decodificador: str = 'tabela',
+                 workers: Optional[int] = None, metricas: Optional[Metricas] = None,
+                 tabelas: Iterable[Union[str, TabelaTreinada]] = ()):
+    """
+    Lê um arquivo .huff, descompacta seu conteúdo e salva o texto original.
+    Aceita tanto o cabeçalho binário atual quanto o cabeçalho JSON antigo.
+
+    O parâmetro 'decodificador' escolhe o motor de decodificação:
+    'tabela' (consulta multi-bit, padrão) ou 'arvore' (percurso bit a bit).
+    Contêineres de blocos são detectados pela versão e decodificados em
+    paralelo por 'workers' processos. 'metricas' funciona como em compactar().
+
+    Arquivos compactados com uma tabela treinada são decodificados com a
+    tabela de mesmo identificador, procurada no cache do processo e em
+    'tabelas' (caminhos ou tabelas carregadas).
+
+    O modo adaptativo é decodificado quadro a quadro e também pode ser lido
+    de stdin e gravado em stdout, com '-' como caminho.
+
+    Arquivos com verificação de integridade são conferidos durante a
+    decodificação, pedaço a pedaço (no modo adaptativo, quadro a quadro); um
+    defeito gera ValueError indicando o trecho corrompido.
+    """
+    if decodificador not in DECODIFICADORES:
+        raise ValueError(f"Decodificador desconhecido: '{decodificador}'.")
+    metricas = metricas if metricas is not None else Metricas()
+
+    try:
+        f_in = _abrir(caminho_entrada, 'rb')
+    except FileNotFoundError as e:
         print(f"Erro ao ler o arquivo compactado: {e}")
         raise
 
-    raiz = construir_arvore(frequencias)
-    if not raiz:
-        if total_chars > 0:
-             print("Erro: Árvore de Huffman vazia mas o arquivo não deveria estar vazio.")
-        return
+    with f_in as f:
+        tamanho = os.fstat(f.fileno()).st_size
+        metricas.iniciar('descompactar', tamanho)
+        metricas.bytes_entrada = tamanho
+        try:
+            if not f.peek(1):
+                with _abrir(caminho_saida, 'wb'):
+                    pass
+                metricas.finalizar()
+                return
 
-    texto_decodificado = []
-    char_count = 0
-    
-    # Caso especial: arquivo com um único tipo de caractere repetido
-    if not raiz.left and not raiz.right:
-        texto_decodificado.append(raiz.char * total_chars)
-    else:
-        no_atual = raiz
-        for byte in dados_bytes:
-            bits = f'{byte:08b}'
-            for bit in bits:
-                if char_count >= total_chars:
-                    break
-                
-                no_atual = no_atual.left if bit == '0' else no_atual.right
-                if no_atual.char is not None:
-                    texto_decodificado.append(no_atual.char)
-                    char_count += 1
-                    no_atual = raiz
-            if char_count >= total_chars:
-                break
-
-    with open(caminho_saida, 'w', encoding='utf-8') as f:
-        f.write("".join(texto_decodificado))
+            versao = identificar_versao(f)
+            if versao == VERSAO_FLUXO:
+                with _abrir(caminho_saida, 'wb') as f_out:
+                    descompactar_fluxo(f, f_out, metricas)
+                return
+            if FLUXO_PADRAO in (caminho_entrada, caminho_saida):
+                raise ValueError("Apenas o modo adaptativo pode ser lido de stdin ou gravado em stdout.")
+            if versao == VERSAO_BLOCOS:
+                f.close()
+                with metricas.etapa('blocos'):
+                    metricas.simbolos = descompactar_blocos(caminho_entrada, caminho_saida, workers)
+                metricas.bytes_saida = os.path.getsize(caminho_saida)
+                metricas.finalizar()
+                return
+
+            verificador = None
+            if possui_integridade(f):
+                # O cabeçalho é conferido antes de ser usado; os dados, à
+                # medida que são decodificados
+                with metricas.etapa('verificacao'):
+                    verificador = VerificadorIntegridade(f)
+                    verificador.conferir_ate(f, 1)
+                f.seek(0)
+
+            with metricas.etapa('cabecalho'):
+                total_chars, repetido, decodificar = _ler_cabecalho_versao(f, versao, decodificador, tabelas)
+            inicio_dados = f.tell()
+            metricas.avancar(inicio_dados)
+            if verificador is not None:
+                with metricas.etapa('verificacao'):
+                    verificador.conferir_ate(f, inicio_dados)
+                    if decodificar is None:
+                        # Nada a decodificar: o restante é conferido de uma vez
+                        verificador.concluir(f)
+                f.seek(inicio_dados)
+
+        except (ValueError, IndexError, KeyError) as e:
+            # Imprime o erro para feedback imediato, mas também o relança
+            # para que a função que chamou saiba que a operação falhou.
+            # (json.JSONDecodeError, do formato antigo, é subclasse de ValueError.)
+            print(f"Erro ao ler o arquivo compactado: {e}")
+            raise
+
+        if decodificar is None and repetido is None:
+            if total_chars > 0:
+                 print("Erro: Árvore de Huffman vazia mas o arquivo não deveria estar vazio.")
+            return
+
+        # No modo binário o resultado são bytes e o arquivo é gravado sem codificação
+        if versao in VERSOES_BYTES:
+            f_out = open(caminho_saida, 'wb')
+        else:
+            f_out = open(caminho_saida, 'w', encoding='utf-8')
+
+        with f_out:
+            # O texto tem exatamente total_chars bytes no modo binário e pelo
+            # menos isso em UTF-8; a escrita sequencial preenche o espaço reservado
+            _preallocar(f_out, total_chars)
+            if repetido is not None:
+                # Caso especial: arquivo com um único tipo de caractere repetido
+                with metricas.etapa('escrita'):
+                    for inicio in range(0, total_chars, TAMANHO_BLOCO_LEITURA):
+                        f_out.write(repetido * min(TAMANHO_BLOCO_LEITURA, total_chars - inicio))
+            else:
+                # Decodifica incrementalmente a partir do arquivo mapeado em memória
+                # (ou lido em pedaços, se não for possível mapear), escrevendo
+                # cada trecho assim que fica pronto
+                mapa = _mapear(f)
+                lidos = _pedacos_mapeados(mapa, inicio_dados, metricas) if mapa is not None else _ler_pedacos(f, metricas)
+                pedacos = verificador.filtrar(lidos, inicio_dados) if verificador is not None else lidos
+                decodificados = decodificar(pedacos)
+                try:
+                    with metricas.etapa('decodificacao'):
+                        for trecho in decodificados:
+                            with metricas.etapa('escrita'):
+                                f_out.write(trecho)
+                except ValueError as e:
+                    # Os quadros do traceback ainda guardam fatias do mapeamento
+                    traceback.clear_frames(e.__traceback__)
+                    raise
+                finally:
+                    # As fatias do mapeamento precisam ser liberadas antes de fechá-lo
+                    decodificados.close()
+                    pedacos.close()
+                    lidos.close()
+                    if mapa is not None:
+                        mapa.close()
+                if verificador is not None:
+                    # O que sobrou após os dados (a tabela de sincronização) e o CRC32 do conteúdo
+                    with metricas.etapa('verificacao'):
+                        verificador.concluir(f)
+
+    metricas.bytes_saida = os.path.getsize(caminho_saida)
+    metricas.simbolos = total_chars
+    metricas.finalizar()
 
 # --- Funções auxiliares antigas removidas para dar lugar a uma lógica integrada ---
 # As funções _texto_para_bits, _empacotar_bits_em_bytes, e _desempacotar_bytes_em_bits
@@ -0,0 +1,320 @@
+import operator
+import sys
+from collections import Counter
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from src.codificador import CodificadorBits
+from src.decodificador import PARTES_POR_SAIDA
+from src.frequencias import np
+from src.huffman_tree import Node, calcular_comprimentos, construir_arvore_canonica, gerar_codigos_canonicos
+
+# --- Modelo de contexto de ordem 1 (versão 8 do formato .huff) ---
+#
+# O código de cada byte depende do byte anterior, o seu contexto (o primeiro
+# byte usa o contexto 0). Em texto e logs o byte seguinte é bem mais
+# previsível quando se conhece o anterior ('q' quase sempre vem antes de
+# 'u'), então os códigos ficam mais curtos que os de uma tabela única.
+#
+# Cada contexto frequente tem a sua tabela; os raros, em que a tabela própria
+# custaria mais no cabeçalho do que economiza nos dados, compartilham uma
+# tabela comum. Um contexto com um único sucessor usa código de comprimento
+# 0: o byte seguinte não ocupa nenhum bit.
+#
+# A decodificação usa uma tabela de consulta por contexto, como a do
+# decodificador multi-bit, em que cada entrada já segue a troca de contexto
+# a cada byte emitido e indica a tabela da próxima consulta.
+
+# Janela das tabelas de decodificação, a mesma do modo comum. Janelas de 8
+# bits montam as tabelas de todos os contextos 4x mais rápido, mas
+# decodificam cerca de 15% mais devagar: compensam só abaixo de
+# LIMIAR_JANELA_LONGA bytes, quando montar as tabelas domina o tempo.
+LARGURA_CONTEXTO = 10
+LARGURA_CONTEXTO_CURTA = 8
+LIMIAR_JANELA_LONGA = 2 << 20
+
+# Limite de bytes por entrada da tabela, que só é atingido por sequências de
+# códigos de comprimento 0 (por exemplo, uma longa repetição do mesmo byte).
+MAX_SIMBOLOS_ENTRADA = 64
+
+# Custo estimado, em bits, de uma tabela própria no cabeçalho: o contexto e
+# a quantidade de símbolos, mais o delta e o comprimento de cada símbolo.
+CUSTO_CABECALHO_CONTEXTO = 16
+CUSTO_CABECALHO_SIMBOLO = 16
+
+# Cada entrada da tabela: (bytes emitidos, bits consumidos, tabela da
+# próxima consulta, nó pendente). Como no decodificador multi-bit, o nó
+# pendente indica onde continuar bit a bit quando nenhum código termina
+# dentro da janela (depois dos bytes de comprimento 0 já emitidos).
+EntradaContexto = Tuple[bytes, int, Optional[list], Optional[Node]]
+
+
+def _contar_pares_bloco(bloco: Union[bytes, memoryview], anterior: int) -> Dict[int, int]:
+    """Conta os pares (contexto << 8 | byte) de um bloco, sendo 'anterior' o contexto do primeiro byte."""
+    if np is not None:
+        atual = np.frombuffer(bloco, dtype=np.uint8).astype(np.int64)
+        anteriores = np.concatenate(([anterior], atual[:-1]))
+        contagem = np.bincount((anteriores << 8) | atual, minlength=1 << 16)
+        indices = np.flatnonzero(contagem)
+        return dict(zip(indices.tolist(), contagem[indices].tolist()))
+
+    # Sem numpy: os pares vizinhos são lidos como inteiros de 16 bits, uma vez
+    # a partir das posições pares e outra das ímpares, e contados pelo Counter (em C)
+    dados = memoryview(bytes((anterior,)) + bytes(bloco))
+    n = len(dados)
+    contagem = Counter(dados[:n - n % 2].cast('H'))
+    contagem.update(dados[1:n - (n - 1) % 2].cast('H'))
+    if sys.byteorder == 'little':
+        return {(valor & 0xFF) << 8 | valor >> 8: freq for valor, freq in contagem.items()}
+    return dict(contagem)
+
+
+def contar_pares(blocos: Iterable[Union[bytes, memoryview]]) -> Dict[int, Dict[int, int]]:
+    """
+    Conta, para cada contexto (byte anterior), quantas vezes cada byte o
+    segue. Os blocos são partes consecutivas dos dados.
+    """
+    contagem: Counter = Counter()
+    anterior = 0
+    for bloco in blocos:
+        if not len(bloco):
+            continue
+        contagem.update(_contar_pares_bloco(bloco, anterior))
+        anterior = bloco[-1]
+    pares: Dict[int, Dict[int, int]] = {}
+    for par, freq in contagem.items():
+        pares.setdefault(par >> 8, {})[par & 0xFF] = freq
+    return pares
+
+
+def _comprimentos(frequencias: Dict[int, int], comprimento_maximo: Optional[int]) -> Dict[int, int]:
+    # Um único sucessor possível não precisa de nenhum bit
+    if len(frequencias) == 1:
+        return {next(iter(frequencias)): 0}
+    return calcular_comprimentos(frequencias, comprimento_maximo=comprimento_maximo)
+
+
+def _codigos(comprimentos: Dict[int, int]) -> List[str]:
+    """Vetor de 256 posições com o código (em bits) de cada byte."""
+    vetor = [''] * 256
+    if len(comprimentos) > 1:
+        for byte, codigo in gerar_codigos_canonicos(comprimentos).items():
+            vetor[byte] = codigo
+    return vetor
+
+
+class ModeloContexto:
+    """
+    Tabelas de códigos de ordem 1: os comprimentos dos contextos com tabela
+    própria e os da tabela compartilhada pelos demais. Os códigos e as
+    tabelas de decodificação são construídos no primeiro uso.
+    """
+
+    def __init__(self, contextos: Dict[int, Dict[int, int]], compartilhada: Dict[int, int]):
+        self.contextos = contextos
+        self.compartilhada = compartilhada
+        self._codigos: Optional[List[List[str]]] = None
+        self._tabelas: Dict[int, List[List[EntradaContexto]]] = {}
+
+    @property
+    def codigos(self) -> List[List[str]]:
+        """Para cada contexto, o vetor de 256 códigos dos bytes que o seguem."""
+        if self._codigos is None:
+            comum = _codigos(self.compartilhada)
+            self._codigos = [_codigos(self.contextos[contexto]) if contexto in self.contextos else comum
+                             for contexto in range(256)]
+        return self._codigos
+
+    def tabelas_decodificacao(self, largura: int = LARGURA_CONTEXTO) -> List[List[EntradaContexto]]:
+        """
+        Para cada contexto, a sua tabela de consulta com janelas de 'largura'
+        bits. Contextos sem códigos recebem uma tabela cujas entradas só
+        indicam dados corrompidos.
+        """
+        if largura not in self._tabelas:
+            raiz_comum = construir_arvore_canonica(self.compartilhada)
+            raizes = [construir_arvore_canonica(self.contextos[contexto]) if contexto in self.contextos
+                      else raiz_comum for contexto in range(256)]
+            # As listas são criadas antes de preenchidas: as entradas de uma
+            # tabela apontam para as tabelas dos contextos seguintes
+            por_raiz = {id(raiz): [] for raiz in raizes if raiz is not None}
+            invalida = [(b'', 0, None, None)] * (1 << largura)
+            tabelas = [por_raiz[id(raiz)] if raiz is not None else invalida for raiz in raizes]
+            for contexto, raiz in enumerate(raizes):
+                if raiz is not None and not tabelas[contexto]:
+                    tabelas[contexto].extend(_construir_tabela(raiz, tabelas[contexto], raizes, tabelas,
+                                                               largura))
+            self._tabelas[largura] = tabelas
+        return self._tabelas[largura]
+
+
+def construir_modelo(pares: Dict[int, Dict[int, int]], comprimento_maximo: Optional[int] = None) -> ModeloContexto:
+    """
+    Constrói o modelo a partir das contagens de contar_pares. Um contexto só
+    ganha tabela própria se os bits que ela economiza em relação à tabela
+    de ordem 0 pagam o seu espaço no cabeçalho.
+    """
+    geral: Counter = Counter()
+    for sucessores in pares.values():
+        geral.update(sucessores)
+    comprimentos_gerais = calcular_comprimentos(geral, comprimento_maximo=comprimento_maximo)
+
+    contextos: Dict[int, Dict[int, int]] = {}
+    compartilhada: Counter = Counter()
+    for contexto, sucessores in pares.items():
+        proprios = _comprimentos(sucessores, comprimento_maximo)
+        bits_proprios = (sum(freq * proprios[byte] for byte, freq in sucessores.items())
+                         + CUSTO_CABECALHO_CONTEXTO + CUSTO_CABECALHO_SIMBOLO * len(sucessores))
+        bits_compartilhados = sum(freq * comprimentos_gerais[byte] for byte, freq in sucessores.items())
+        if bits_proprios < bits_compartilhados:
+            contextos[contexto] = proprios
+        else:
+            compartilhada.update(sucessores)
+    return ModeloContexto(contextos, _comprimentos(compartilhada, comprimento_maximo) if compartilhada else {})
+
+
+def _construir_tabela(raiz: Node, tabela_inicial: list, raizes: List[Optional[Node]],
+                      tabelas: List[list], largura: int) -> List[EntradaContexto]:
+    """
+    Para cada valor dos próximos 'largura' bits, decodifica a partir de 'raiz'
+    trocando de árvore a cada byte emitido, como faria o decodificador.
+    'tabela_inicial' é a tabela sendo construída, que é a próxima quando
+    nenhum byte é emitido.
+    """
+    entradas: List[EntradaContexto] = []
+    for valor in range(1 << largura):
+        simbolos = bytearray()
+        consumidos = 0
+        proxima = tabela_inicial
+        no = raiz
+        posicao = 0
+        while True:
+            if no.char is not None:
+                simbolos.append(no.char)
+                consumidos = posicao
+                proxima = tabelas[no.char]
+                no = raizes[no.char]
+                if no is None or len(simbolos) >= MAX_SIMBOLOS_ENTRADA:
+                    break
+                continue
+            if posicao == largura:
+                break
+            no = no.right if (valor >> (largura - 1 - posicao)) & 1 else no.left
+            posicao += 1
+            if no is None:
+                break
+        # Só há nó pendente se nenhum código com bits terminou dentro da janela
+        pendente = no if consumidos == 0 and posicao == largura and no is not None and no.char is None else None
+        entradas.append((bytes(simbolos), consumidos, proxima, pendente))
+    return entradas
+
+
+class CodificadorContexto(CodificadorBits):
+    """Codificador em que o código de cada byte depende do byte anterior."""
+
+    def __init__(self, codigos: List[List[str]]):
+        super().__init__({})
+        self._codigos = codigos
+        self._anterior = 0
+
+    def _traduzir(self, lote: Union[bytes, memoryview]) -> str:
+        # Dois map em C: o vetor de códigos do contexto e, nele, o código do byte
+        anteriores = chain((self._anterior,), lote[:-1])
+        self._anterior = lote[-1]
+        return "".join(map(operator.getitem, map(self._codigos.__getitem__, anteriores), lote))
+
+
+def decodificar_contexto_fluxo(pedacos: Iterable[Union[bytes, memoryview]], modelo: ModeloContexto,
+                               total_bytes: int) -> Iterator[bytes]:
+    """
+    Decodifica os dados de um arquivo da versão 8, pedaço a pedaço,
+    consultando a tabela do contexto atual.
+
+    Raises:
+        ValueError: Se os dados estiverem truncados ou não corresponderem ao modelo.
+    """
+    largura = LARGURA_CONTEXTO if total_bytes >= LIMIAR_JANELA_LONGA else LARGURA_CONTEXTO_CURTA
+    tabelas = modelo.tabelas_decodificacao(largura)
+    mascara = (1 << largura) - 1
+    tabela = tabelas[0]
+    iterador = iter(pedacos)
+    dados = b''
+    tamanho = 0
+    posicao = 0
+    esgotado = False
+
+    partes = []
+    emitidos = 0
+    acumulador = 0
+    n_bits = 0
+
+    while emitidos < total_bytes:
+        if n_bits < largura:
+            if posicao == tamanho and not esgotado:
+                proximo = next(iterador, None)
+                if proximo is None:
+                    esgotado = True
+                else:
+                    dados, tamanho, posicao = proximo, len(proximo), 0
+                continue
+            if posicao < tamanho:
+                pedaco = dados[posicao:posicao + 8]
+                posicao += len(pedaco)
+                acumulador = ((acumulador & ((1 << n_bits) - 1)) << (8 * len(pedaco))) | int.from_bytes(pedaco, 'big')
+                n_bits += 8 * len(pedaco)
+                continue
+            # Fim dos dados: completa a janela com zeros (o padding é descartado
+            # abaixo); sem nenhum bit, só códigos de comprimento 0 podem seguir
+            if n_bits <= 0:
+                if tabela[0][1] or tabela[0][3] is not None:
+                    raise ValueError("Dados truncados.")
+                janela = 0
+            else:
+                janela = (acumulador << (largura - n_bits)) & mascara
+        else:
+            janela = (acumulador >> (n_bits - largura)) & mascara
+
+        simbolos, consumidos, proxima, no = tabela[janela]
+        if consumidos:
+            n_bits -= consumidos
+        elif no is None:
+            # Só bytes de comprimento 0; sem nenhum, os bits não formam um código
+            if not simbolos:
+                raise ValueError("Dados corrompidos: código inválido.")
+        else:
+            # Código mais longo que a janela: desce o restante da árvore bit a bit
+            if n_bits < largura:
+                raise ValueError("Dados truncados.")
+            n_bits -= largura
+            acumulador &= (1 << n_bits) - 1
+            while no.char is None:
+                if n_bits == 0:
+                    if posicao == tamanho:
+                        proximo = None if esgotado else next(iterador, None)
+                        if proximo is None:
+                            raise ValueError("Dados truncados.")
+                        dados, tamanho, posicao = proximo, len(proximo), 0
+                        continue
+                    acumulador = dados[posicao]
+                    posicao += 1
+                    n_bits = 8
+                n_bits -= 1
+                no = no.right if (acumulador >> n_bits) & 1 else no.left
+                acumulador &= (1 << n_bits) - 1
+                if no is None:
+                    raise ValueError("Dados corrompidos: código inválido.")
+            simbolos += bytes((no.char,))
+            proxima = tabelas[no.char]
+
+        emitidos += len(simbolos)
+        if emitidos > total_bytes:
+            # A última consulta pode ter decodificado bits de padding
+            simbolos = simbolos[:len(simbolos) - (emitidos - total_bytes)]
+        partes.append(simbolos)
+        if len(partes) >= PARTES_POR_SAIDA:
+            yield b"".join(partes)
+            partes = []
+        tabela = proxima
+
+    if partes:
+        yield b"".join(partes)
@@ -0,0 +1,216 @@
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from src.huffman_tree import Node
+
+# Largura padrão (em bits) da janela usada para indexar a tabela de decodificação.
+# 10 bits = 1024 entradas: cobre a maioria dos códigos de textos comuns e a
+# tabela é construída em poucos milissegundos.
+LARGURA_PADRAO = 10
+LARGURA_MINIMA = 1
+LARGURA_MAXIMA = 16
+
+# Quantidade de trechos decodificados acumulados antes de entregar um pedaço de texto.
+PARTES_POR_SAIDA = 1 << 14
+
+# Cada entrada da tabela: (símbolos emitidos, bits consumidos, nó pendente).
+# Se nenhum código termina dentro da janela, 'bits consumidos' é 0 e o nó
+# pendente indica onde a descida na árvore deve continuar bit a bit.
+# No modo binário os símbolos emitidos são 'bytes' em vez de 'str'.
+EntradaTabela = Tuple[Union[str, bytes], int, Optional[Node]]
+
+
+def simbolos_sao_bytes(raiz: Node) -> bool:
+    """Indica se as folhas da árvore guardam valores de byte (modo binário)."""
+    no = raiz
+    while no.char is None:
+        no = no.left if no.left is not None else no.right
+    return isinstance(no.char, int)
+
+
+def construir_tabela_decodificacao(raiz: Node, largura: int = LARGURA_PADRAO) -> List[EntradaTabela]:
+    """
+    Constrói a tabela de consulta para decodificação multi-bit.
+
+    Para cada valor possível dos próximos 'largura' bits, percorre a árvore
+    uma única vez e registra todos os símbolos completos dentro da janela
+    e quantos bits eles ocupam.
+
+    Args:
+        raiz: A raiz da árvore de Huffman (com pelo menos dois símbolos).
+        largura: Quantidade de bits usada para indexar a tabela.
+
+    Returns:
+        Uma lista com 2**largura entradas.
+    """
+    if not LARGURA_MINIMA <= largura <= LARGURA_MAXIMA:
+        raise ValueError(f"Largura da tabela deve estar entre {LARGURA_MINIMA} e {LARGURA_MAXIMA}.")
+
+    juntar = bytes if simbolos_sao_bytes(raiz) else "".join
+    tabela: List[EntradaTabela] = []
+    for valor in range(1 << largura):
+        simbolos = []
+        consumidos = 0
+        no = raiz
+        for posicao in range(largura):
+            bit = (valor >> (largura - 1 - posicao)) & 1
+            no = no.right if bit else no.left
+            if no.char is not None:
+                simbolos.append(no.char)
+                consumidos = posicao + 1
+                no = raiz
+        # O nó pendente só interessa quando nenhum símbolo foi emitido
+        pendente = no if consumidos == 0 else None
+        tabela.append((juntar(simbolos), consumidos, pendente))
+    return tabela
+
+
+def decodificar_arvore_fluxo(pedacos: Iterable[bytes], raiz: Node, total_chars: int) -> Iterator[Union[str, bytes]]:
+    """Decodifica percorrendo a árvore bit a bit (implementação de referência)."""
+    juntar = bytes if simbolos_sao_bytes(raiz) else "".join
+    texto_decodificado = []
+    char_count = 0
+    no_atual = raiz
+    for dados in pedacos:
+        for byte in dados:
+            bits = f'{byte:08b}'
+            for bit in bits:
+                if char_count >= total_chars:
+                    break
+
+                no_atual = no_atual.left if bit == '0' else no_atual.right
+                if no_atual.char is not None:
+                    texto_decodificado.append(no_atual.char)
+                    char_count += 1
+                    no_atual = raiz
+            if char_count >= total_chars:
+                break
+        if len(texto_decodificado) >= PARTES_POR_SAIDA:
+            yield juntar(texto_decodificado)
+            texto_decodificado = []
+        if char_count >= total_chars:
+            break
+    if texto_decodificado:
+        yield juntar(texto_decodificado)
+
+
+def decodificar_tabela_fluxo(pedacos: Iterable[bytes], raiz: Node, total_chars: int,
+                             largura: int = LARGURA_PADRAO,
+                             tabela: Optional[List[EntradaTabela]] = None,
+                             bits_iniciais: int = 0) -> Iterator[Union[str, bytes]]:
+    """
+    Decodifica consultando a tabela multi-bit, emitindo vários símbolos por
+    consulta. Códigos mais longos que a janela são completados bit a bit a
+    partir do nó pendente registrado na tabela.
+
+    Os dados são consumidos pedaço a pedaço e o texto é produzido em trechos,
+    de forma que a memória usada não depende do tamanho do arquivo.
+    Uma tabela já construída (com a mesma largura) pode ser reaproveitada, e
+    'bits_iniciais' (0 a 7) descarta os primeiros bits do primeiro byte, para
+    começar a decodificar num ponto de sincronização que não cai em byte inteiro.
+    """
+    if tabela is None:
+        tabela = construir_tabela_decodificacao(raiz, largura)
+    modo_bytes = simbolos_sao_bytes(raiz)
+    juntar = b"".join if modo_bytes else "".join
+    mascara = (1 << largura) - 1
+    iterador = iter(pedacos)
+    dados = b''
+    tamanho = 0
+    posicao = 0
+    esgotado = False
+
+    partes = []
+    emitidos = 0
+    acumulador = 0
+    n_bits = 0
+
+    if bits_iniciais:
+        for dados in iterador:
+            if dados:
+                # Os bits já consumidos ficam acima de n_bits e são ignorados
+                acumulador, n_bits = dados[0], 8 - bits_iniciais
+                tamanho, posicao = len(dados), 1
+                break
+
+    while emitidos < total_chars:
+        if n_bits < largura:
+            if posicao == tamanho and not esgotado:
+                proximo = next(iterador, None)
+                if proximo is None:
+                    esgotado = True
+                else:
+                    dados, tamanho, posicao = proximo, len(proximo), 0
+                continue
+            if posicao < tamanho:
+                # Reabastece o acumulador com até 8 bytes de uma vez, descartando
+                # os bits já consumidos para que o inteiro não cresça
+                pedaco = dados[posicao:posicao + 8]
+                posicao += len(pedaco)
+                acumulador = ((acumulador & ((1 << n_bits) - 1)) << (8 * len(pedaco))) | int.from_bytes(pedaco, 'big')
+                n_bits += 8 * len(pedaco)
+                continue
+            if n_bits == 0:
+                break
+            # Fim dos dados: completa a janela com zeros (o padding é descartado abaixo)
+            janela = (acumulador << (largura - n_bits)) & mascara
+        else:
+            janela = (acumulador >> (n_bits - largura)) & mascara
+
+        simbolos, consumidos, no = tabela[janela]
+        if consumidos:
+            n_bits -= consumidos
+        else:
+            # Código mais longo que a janela: desce o restante da árvore bit a bit
+            if n_bits < largura:
+                break
+            n_bits -= largura
+            acumulador &= (1 << n_bits) - 1
+            while no.char is None:
+                if n_bits == 0:
+                    if posicao == tamanho:
+                        proximo = None if esgotado else next(iterador, None)
+                        if proximo is None:
+                            esgotado = True
+                            break
+                        dados, tamanho, posicao = proximo, len(proximo), 0
+                        continue
+                    acumulador = dados[posicao]
+                    posicao += 1
+                    n_bits = 8
+                n_bits -= 1
+                no = no.right if (acumulador >> n_bits) & 1 else no.left
+                acumulador &= (1 << n_bits) - 1
+            if no.char is None:
+                break
+            simbolos = bytes((no.char,)) if modo_bytes else no.char
+
+        emitidos += len(simbolos)
+        if emitidos > total_chars:
+            # A última consulta pode ter decodificado bits de padding
+            simbolos = simbolos[:len(simbolos) - (emitidos - total_chars)]
+        partes.append(simbolos)
+        if len(partes) >= PARTES_POR_SAIDA:
+            yield juntar(partes)
+            partes = []
+
+    if partes:
+        yield juntar(partes)
+
+
+def decodificar_arvore(dados: bytes, raiz: Node, total_chars: int) -> Union[str, bytes]:
+    """Decodifica um bloco de dados em memória percorrendo a árvore."""
+    vazio = b"" if simbolos_sao_bytes(raiz) else ""
+    return vazio.join(decodificar_arvore_fluxo([dados], raiz, total_chars))
+
+
+def decodificar_tabela(dados: bytes, raiz: Node, total_chars: int, largura: int = LARGURA_PADRAO,
+                       tabela: Optional[List[EntradaTabela]] = None) -> Union[str, bytes]:
+    """Decodifica um bloco de dados em memória usando a tabela multi-bit."""
+    vazio = b"" if simbolos_sao_bytes(raiz) else ""
+    return vazio.join(decodificar_tabela_fluxo([dados], raiz, total_chars, largura, tabela))
+
+
+DECODIFICADORES: Dict[str, Callable[[Iterable[bytes], Node, int], Iterator[Union[str, bytes]]]] = {
+    'tabela': decodificar_tabela_fluxo,
+    'arvore': decodificar_arvore_fluxo,
+}
@@ -0,0 +1,149 @@
+import hashlib
+import io
+import os
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Union
+
+from src.decodificador import construir_tabela_decodificacao, EntradaTabela
+from src.formato import escrever_tabela_comprimentos, ler_tabela_comprimentos
+from src.frequencias import gerar_tabela_frequencias_bytes
+from src.huffman_tree import Node, calcular_comprimentos, construir_arvore_canonica, gerar_codigos_canonicos
+
+# --- Tabelas de códigos treinadas ---
+#
+# Para muitos arquivos pequenos e parecidos (JSON, logs), contar as
+# frequências e gravar a tabela de comprimentos em cada arquivo custa mais
+# do que os próprios dados. Uma tabela treinada é construída uma única vez a
+# partir de uma amostra e salva num arquivo:
+#
+#   MAGICO_TABELA (4 bytes) | versão (1 byte) | tabela de comprimentos (bytes)
+#
+# O arquivo .huff compactado com ela (versão 6 do formato) guarda apenas o
+# identificador da tabela: os 8 primeiros bytes do SHA-256 da tabela de
+# comprimentos. O alfabeto é sempre o de bytes, e todos os 256 valores
+# recebem um código, para que qualquer arquivo possa ser compactado.
+
+MAGICO_TABELA = b'HUFT'
+VERSAO_TABELA = 1
+EXTENSAO_TABELA = '.hufft'
+TAMANHO_IDENTIFICADOR = 8
+
+# Quantidade de tabelas carregadas mantidas em memória por processo
+TAMANHO_CACHE = 16
+
+
+class TabelaTreinada:
+    """
+    Tabela de códigos canônicos treinada, com os objetos derivados (códigos,
+    árvore e tabela de decodificação) construídos uma única vez, sob demanda.
+    """
+
+    def __init__(self, comprimentos: Dict[int, int]):
+        self.comprimentos = comprimentos
+        buffer = io.BytesIO()
+        escrever_tabela_comprimentos(buffer, comprimentos)
+        self.serializada = buffer.getvalue()
+        self.identificador = hashlib.sha256(self.serializada).digest()[:TAMANHO_IDENTIFICADOR]
+        self._codigos: Optional[Dict[int, str]] = None
+        self._raiz: Optional[Node] = None
+        self._tabela_decodificacao: Optional[List[EntradaTabela]] = None
+
+    @property
+    def codigos(self) -> Dict[int, str]:
+        if self._codigos is None:
+            self._codigos = gerar_codigos_canonicos(self.comprimentos)
+        return self._codigos
+
+    @property
+    def raiz(self) -> Node:
+        if self._raiz is None:
+            self._raiz = construir_arvore_canonica(self.comprimentos)
+        return self._raiz
+
+    @property
+    def tabela_decodificacao(self) -> List[EntradaTabela]:
+        if self._tabela_decodificacao is None:
+            self._tabela_decodificacao = construir_tabela_decodificacao(self.raiz)
+        return self._tabela_decodificacao
+
+
+# Tabelas já carregadas, da menos para a mais recentemente usada, por identificador
+_cache: "OrderedDict[bytes, TabelaTreinada]" = OrderedDict()
+# Caminho -> (mtime, tamanho, identificador), para não reler arquivos inalterados
+_arquivos: Dict[str, tuple] = {}
+
+
+def registrar_tabela(tabela: TabelaTreinada) -> TabelaTreinada:
+    """Guarda a tabela no cache LRU do processo, descartando a menos usada se cheio."""
+    _cache[tabela.identificador] = tabela
+    _cache.move_to_end(tabela.identificador)
+    while len(_cache) > TAMANHO_CACHE:
+        _cache.popitem(last=False)
+    return tabela
+
+
+def treinar_tabela(caminhos: Iterable[str], comprimento_maximo: Optional[int] = None) -> TabelaTreinada:
+    """
+    Constrói uma tabela a partir das frequências de bytes de uma amostra de arquivos.
+
+    Cada um dos 256 valores de byte recebe uma contagem extra, de modo que
+    bytes ausentes da amostra também tenham código (mais longo).
+    """
+    frequencias = {byte: 1 for byte in range(256)}
+    for caminho in caminhos:
+        for byte, freq in gerar_tabela_frequencias_bytes(caminho, workers=1).items():
+            frequencias[byte] += freq
+    return registrar_tabela(TabelaTreinada(calcular_comprimentos(frequencias, comprimento_maximo=comprimento_maximo)))
+
+
+def salvar_tabela(tabela: TabelaTreinada, caminho: str):
+    """Grava a tabela treinada num arquivo (extensão sugerida: .hufft)."""
+    with open(caminho, 'wb') as f:
+        f.write(MAGICO_TABELA)
+        f.write(bytes([VERSAO_TABELA]))
+        f.write(tabela.serializada)
+
+
+def carregar_tabela(caminho: str) -> TabelaTreinada:
+    """
+    Carrega uma tabela treinada, reaproveitando a cópia em cache enquanto o
+    arquivo não for modificado.
+
+    Raises:
+        ValueError: Se o arquivo não for uma tabela treinada válida.
+    """
+    estado = os.stat(caminho)
+    conhecido = _arquivos.get(caminho)
+    if conhecido is not None and conhecido[:2] == (estado.st_mtime_ns, estado.st_size) and conhecido[2] in _cache:
+        _cache.move_to_end(conhecido[2])
+        return _cache[conhecido[2]]
+
+    with open(caminho, 'rb') as f:
+        if f.read(len(MAGICO_TABELA)) != MAGICO_TABELA or f.read(1) != bytes([VERSAO_TABELA]):
+            raise ValueError(f"'{caminho}' não é uma tabela treinada.")
+        tabela = TabelaTreinada(ler_tabela_comprimentos(f, simbolos_bytes=True))
+    _arquivos[caminho] = (estado.st_mtime_ns, estado.st_size, tabela.identificador)
+    return registrar_tabela(tabela)
+
+
+def obter_tabela(tabela: Union[str, TabelaTreinada]) -> TabelaTreinada:
+    """Aceita uma tabela já carregada ou o caminho do arquivo da tabela."""
+    return tabela if isinstance(tabela, TabelaTreinada) else carregar_tabela(tabela)
+
+
+def buscar_tabela(identificador: bytes, tabelas: Iterable[Union[str, TabelaTreinada]] = ()) -> TabelaTreinada:
+    """
+    Encontra a tabela com o identificador dado: primeiro no cache do processo,
+    depois entre as 'tabelas' informadas (caminhos ou tabelas carregadas).
+
+    Raises:
+        ValueError: Se nenhuma tabela conhecida tiver esse identificador.
+    """
+    if identificador in _cache:
+        _cache.move_to_end(identificador)
+        return _cache[identificador]
+    for candidata in tabelas:
+        tabela = obter_tabela(candidata)
+        if tabela.identificador == identificador:
+            return registrar_tabela(tabela)
+    raise ValueError(f"Tabela treinada {identificador.hex()} não encontrada; informe o arquivo da tabela.")
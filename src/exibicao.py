@@ -0,0 +1,207 @@
+import json
+import sys
+from typing import Dict, List, Optional, TextIO, Union
+
+# --- Exibição e exportação das estruturas do algoritmo ---
+#
+# Alfabetos grandes (texto CJK, modo binário) têm milhares de símbolos: um
+# print por linha leva segundos e inunda o terminal. As funções formatar_*
+# montam o texto inteiro de uma vez, para uma única escrita, e limitam o que
+# é exibido: uma página da tabela (início e limite) ou os primeiros níveis
+# da árvore. Para inspeção completa fora do terminal, a árvore e os códigos
+# são exportados em JSON ou DOT (Graphviz).
+
+# Símbolo de um nó: um caractere (modo texto) ou um valor de byte (modo
+# binário); o mesmo Simbolo de huffman_tree.py, repetido aqui para que este
+# módulo não dependa dele (huffman_tree.py importa este).
+Simbolo = Union[str, int]
+
+# Linhas por página no menu interativo
+LINHAS_POR_PAGINA = 40
+
+# Níveis da árvore exibidos por padrão quando ela não cabe na tela
+PROFUNDIDADE_PADRAO = 6
+
+FORMATOS_EXPORTACAO = ('json', 'dot')
+
+
+def formatar_simbolo(simbolo: Simbolo) -> str:
+    """Representação legível de um símbolo, com escapes para caracteres e bytes não imprimíveis."""
+    if isinstance(simbolo, int):
+        return repr(bytes((simbolo,)))[2:-1]
+    return repr(simbolo)[1:-1]
+
+
+def _celula(simbolo: Simbolo) -> str:
+    # Na coluna das tabelas, o espaço fica entre aspas para ser visível
+    exibido = formatar_simbolo(simbolo)
+    return "' '" if exibido == ' ' else exibido
+
+
+def _rodape_pagina(inicio: int, exibidos: int, total: int) -> str:
+    if exibidos == total:
+        return ""
+    return f"(símbolos {inicio + 1} a {inicio + exibidos} de {total})\n"
+
+
+def formatar_frequencias(frequencias: Dict[Simbolo, int], inicio: int = 0, limite: Optional[int] = None) -> str:
+    """
+    Tabela de frequências, da maior para a menor; com 'limite', só as
+    linhas de 'inicio' a 'inicio + limite' (os 'limite' mais frequentes, se
+    'inicio' for 0).
+    """
+    ordenados = sorted(frequencias.items(), key=lambda item: item[1], reverse=True)
+    pagina = ordenados[inicio:inicio + limite if limite is not None else None]
+    linhas = [f"{_celula(simbolo):<9} | {freq}" for simbolo, freq in pagina]
+    return ("--- Tabela de Frequências ---\n"
+            "Caractere | Frequência\n"
+            "---------------------------\n"
+            + "".join(linha + "\n" for linha in linhas)
+            + "---------------------------\n"
+            + _rodape_pagina(inicio, len(pagina), len(ordenados)))
+
+
+def formatar_codigos(codigos: Dict[Simbolo, str], inicio: int = 0, limite: Optional[int] = None) -> str:
+    """Tabela de códigos, ordenada pelo símbolo; 'inicio' e 'limite' como em formatar_frequencias."""
+    ordenados = sorted(codigos.items())
+    pagina = ordenados[inicio:inicio + limite if limite is not None else None]
+    linhas = [f"{_celula(simbolo):<9} | {codigo}" for simbolo, codigo in pagina]
+    return ("Caractere | Código\n"
+            "-------------------------\n"
+            + "".join(linha + "\n" for linha in linhas)
+            + "-------------------------\n"
+            + _rodape_pagina(inicio, len(pagina), len(ordenados)))
+
+
+def _contar_folhas(no) -> int:
+    folhas = 0
+    pilha = [no]
+    while pilha:
+        no = pilha.pop()
+        if no.char is not None:
+            folhas += 1
+        else:
+            pilha.extend(filho for filho in (no.left, no.right) if filho is not None)
+    return folhas
+
+
+def formatar_arvore(raiz, profundidade_maxima: Optional[int] = None, prefixo: str = "", is_ultimo: bool = True) -> str:
+    """
+    A árvore de Huffman desenhada com ├── e └──. Com 'profundidade_maxima',
+    os nós internos desse nível aparecem recolhidos, com o total de folhas
+    abaixo deles.
+    """
+    linhas: List[str] = []
+    # Pilha explícita de (nó, prefixo, é o último filho, profundidade): a
+    # profundidade da árvore não fica limitada pelo limite de recursão do Python.
+    pilha = [(raiz, prefixo, is_ultimo, 0)] if raiz is not None else []
+    while pilha:
+        no, prefixo, is_ultimo, profundidade = pilha.pop()
+        ramo = "└── " if is_ultimo else "├── "
+        prefixo_filhos = prefixo + ("    " if is_ultimo else "|   ")
+
+        if no.char is not None:
+            linhas.append(f"{prefixo}{ramo}'{formatar_simbolo(no.char)}' ({no.freq})")
+            continue
+        if profundidade_maxima is not None and profundidade >= profundidade_maxima:
+            linhas.append(f"{prefixo}{ramo}[I] ({no.freq}) [+ {_contar_folhas(no)} folhas]")
+            continue
+        linhas.append(f"{prefixo}{ramo}[I] ({no.freq})")
+
+        # São sempre 2 ou 0 filhos. O direito é impresso primeiro, então é
+        # empilhado por último; um filho único (por robustez) é o último.
+        if no.right is not None and no.left is not None:
+            pilha.append((no.left, prefixo_filhos, True, profundidade + 1))
+            pilha.append((no.right, prefixo_filhos, False, profundidade + 1))
+        elif no.right is not None:
+            pilha.append((no.right, prefixo_filhos, True, profundidade + 1))
+        elif no.left is not None:
+            pilha.append((no.left, prefixo_filhos, True, profundidade + 1))
+    return "".join(linha + "\n" for linha in linhas)
+
+
+def arvore_para_dict(raiz) -> Optional[Dict]:
+    """
+    A árvore como dicionários aninhados: {'freq', 'simbolo'} nas folhas e
+    {'freq', 'esquerda', 'direita'} nos nós internos (bit 0 e bit 1).
+    """
+    if raiz is None:
+        return None
+    resultado: Dict = {}
+    pilha = [(raiz, resultado)]
+    while pilha:
+        no, destino = pilha.pop()
+        destino['freq'] = no.freq
+        if no.char is not None:
+            destino['simbolo'] = no.char
+            continue
+        for chave, filho in (('esquerda', no.left), ('direita', no.right)):
+            if filho is not None:
+                destino[chave] = {}
+                pilha.append((filho, destino[chave]))
+    return resultado
+
+
+def _rotulo_dot(texto: str) -> str:
+    return '"' + texto.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def exportar_arvore(raiz, f: TextIO, formato: str = 'json'):
+    """
+    Grava a árvore inteira em 'f': 'json' (veja arvore_para_dict) ou 'dot',
+    um grafo para o Graphviz (ex: dot -Tsvg arvore.dot -o arvore.svg).
+
+    Raises:
+        ValueError: Se o formato for desconhecido.
+    """
+    if formato == 'json':
+        json.dump(arvore_para_dict(raiz), f, ensure_ascii=False)
+        f.write("\n")
+        return
+    if formato != 'dot':
+        raise ValueError(f"Formato desconhecido: '{formato}'. Use um de {FORMATOS_EXPORTACAO}.")
+
+    linhas = ["digraph huffman {", "  node [shape=box, fontname=monospace];"]
+    pilha = [(raiz, 0)] if raiz is not None else []
+    proximo_id = 1
+    while pilha:
+        no, id_no = pilha.pop()
+        if no.char is not None:
+            rotulo = _rotulo_dot(f"'{formatar_simbolo(no.char)}' ({no.freq})")
+            linhas.append(f"  n{id_no} [label={rotulo}, style=filled, fillcolor=lightgrey];")
+            continue
+        linhas.append(f"  n{id_no} [label=\"{no.freq}\", shape=circle];")
+        for bit, filho in (('0', no.left), ('1', no.right)):
+            if filho is not None:
+                linhas.append(f"  n{id_no} -> n{proximo_id} [label=\"{bit}\"];")
+                pilha.append((filho, proximo_id))
+                proximo_id += 1
+    linhas.append("}")
+    f.write("\n".join(linhas) + "\n")
+
+
+def exportar_frequencias(frequencias: Dict[Simbolo, int], f: TextIO):
+    """Grava a tabela de frequências em JSON: uma lista de {'simbolo', 'freq'}, da maior para a menor."""
+    ordenados = sorted(frequencias.items(), key=lambda item: item[1], reverse=True)
+    json.dump([{'simbolo': simbolo, 'freq': freq} for simbolo, freq in ordenados], f, ensure_ascii=False)
+    f.write("\n")
+
+
+def exportar_codigos(codigos: Dict[Simbolo, str], f: TextIO, frequencias: Optional[Dict[Simbolo, int]] = None):
+    """
+    Grava a tabela de códigos em JSON: uma lista de {'simbolo', 'codigo',
+    'bits'} (e 'freq', se 'frequencias' for informado), ordenada pelo símbolo.
+    """
+    registros = []
+    for simbolo, codigo in sorted(codigos.items()):
+        registro = {'simbolo': simbolo, 'codigo': codigo, 'bits': len(codigo)}
+        if frequencias is not None:
+            registro['freq'] = frequencias.get(simbolo, 0)
+        registros.append(registro)
+    json.dump(registros, f, ensure_ascii=False)
+    f.write("\n")
+
+
+def escrever(texto: str, saida: Optional[TextIO] = None):
+    """Escreve o texto já montado numa única chamada (stdout por padrão)."""
+    (saida if saida is not None else sys.stdout).write(texto)
@@ -0,0 +1,362 @@
+import io
+import zlib
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from src.codificador import CodificadorBits
+from src.decodificador import EntradaTabela, construir_tabela_decodificacao, decodificar_tabela_fluxo
+from src.formato import FLAG_INTEGRIDADE, MAGICO, VERSAO_FLUXO, escrever_varint
+from src.frequencias import gerar_tabela_frequencias
+from src.huffman_tree import Node, calcular_comprimentos, construir_arvore_canonica, gerar_codigos_canonicos
+from src.metricas import Metricas
+
+# --- Modo adaptativo em uma passada (fluxos, pipes) ---
+#
+# Para entradas que só podem ser lidas uma vez (stdin, sockets), não há como
+# contar as frequências antes de codificar. O fluxo é dividido em quadros, e
+# cada quadro é codificado com um modelo construído a partir dos quadros
+# anteriores; o decodificador reconstrói o mesmo modelo depois de cada
+# quadro, então nenhuma tabela é transmitida:
+#
+#   MAGICO | versão 7 | quadro* | varint 0
+#   quadro = varint n_bytes (> 0) | varint tamanho dos dados | dados
+#
+# Os dados de cada quadro começam num byte inteiro, e a memória usada fica
+# limitada ao tamanho de um quadro dos dois lados.
+
+# Os primeiros quadros são pequenos, para que o modelo se adapte logo;
+# o tamanho dobra a cada quadro até o máximo.
+TAMANHO_QUADRO_INICIAL = 1 << 12
+TAMANHO_QUADRO_MAXIMO = 1 << 16
+
+# Quando a soma das contagens passa deste valor, elas são divididas por dois,
+# dando mais peso aos dados recentes.
+LIMITE_CONTAGENS = 1 << 20
+
+
+class ModeloAdaptativo:
+    """
+    Frequências dos bytes já vistos e os códigos canônicos derivados delas.
+    Todos os 256 valores começam com contagem 1, para que qualquer byte
+    tenha código desde o primeiro quadro.
+    """
+
+    def __init__(self, contagens: Optional[List[int]] = None):
+        self.contagens: List[int] = list(contagens) if contagens is not None else [1] * 256
+        self._descartar()
+
+    def _descartar(self):
+        # Os códigos são reconstruídos sob demanda, na próxima vez que forem usados
+        self._comprimentos: Optional[Dict[int, int]] = None
+        self._codigos: Optional[Dict[int, str]] = None
+        self._raiz: Optional[Node] = None
+        self._tabela: Optional[List[EntradaTabela]] = None
+
+    @property
+    def comprimentos(self) -> Dict[int, int]:
+        if self._comprimentos is None:
+            self._comprimentos = calcular_comprimentos(dict(enumerate(self.contagens)))
+        return self._comprimentos
+
+    @property
+    def codigos(self) -> Dict[int, str]:
+        if self._codigos is None:
+            self._codigos = gerar_codigos_canonicos(self.comprimentos)
+        return self._codigos
+
+    @property
+    def raiz(self) -> Node:
+        if self._raiz is None:
+            self._raiz = construir_arvore_canonica(self.comprimentos)
+        return self._raiz
+
+    @property
+    def tabela_decodificacao(self) -> List[EntradaTabela]:
+        if self._tabela is None:
+            self._tabela = construir_tabela_decodificacao(self.raiz)
+        return self._tabela
+
+    def atualizar(self, dados: bytes):
+        """Soma as frequências de um quadro; os códigos passam a refleti-las."""
+        for byte, freq in gerar_tabela_frequencias(dados).items():
+            self.contagens[byte] += freq
+        if sum(self.contagens) > LIMITE_CONTAGENS:
+            self.contagens = [max(1, contagem >> 1) for contagem in self.contagens]
+        self._descartar()
+
+
+def inicio_fluxo(verificacao: bool = True) -> bytes:
+    """Os bytes mágicos e a versão que abrem o fluxo adaptativo."""
+    return MAGICO + bytes([VERSAO_FLUXO | (FLAG_INTEGRIDADE if verificacao else 0)])
+
+
+def codificar_quadro(modelo: ModeloAdaptativo, dados: bytes) -> bytes:
+    """
+    Codifica um quadro com o modelo atual e atualiza o modelo com ele.
+    Retorna o quadro completo, com os dois varints de tamanho.
+    """
+    codificador = CodificadorBits(modelo.codigos)
+    codificados = codificador.codificar(dados) + codificador.finalizar()
+    modelo.atualizar(dados)
+    quadro = io.BytesIO()
+    escrever_varint(quadro, len(dados))
+    escrever_varint(quadro, len(codificados))
+    quadro.write(codificados)
+    return quadro.getvalue()
+
+
+def decodificar_quadro(modelo: ModeloAdaptativo, n_bytes: int, codificados: bytes) -> bytes:
+    """Decodifica os dados de um quadro com o modelo atual e atualiza o modelo com eles."""
+    dados = b"".join(decodificar_tabela_fluxo((codificados,), modelo.raiz, n_bytes,
+                                              tabela=modelo.tabela_decodificacao))
+    modelo.atualizar(dados)
+    return dados
+
+
+def _ler_varint_buffer(buffer: bytearray, posicao: int) -> Optional[Tuple[int, int]]:
+    # Como ler_varint, mas sobre um buffer que pode ainda não ter o varint completo
+    valor = 0
+    deslocamento = 0
+    while posicao < len(buffer):
+        byte = buffer[posicao]
+        posicao += 1
+        valor |= (byte & 0x7F) << deslocamento
+        if not byte & 0x80:
+            return valor, posicao
+        deslocamento += 7
+    return None
+
+
+class Compactador:
+    """
+    Compactação incremental no modo adaptativo, no estilo de zlib.compressobj:
+    alimentar() recebe os dados em pedaços de qualquer tamanho e devolve os
+    quadros já completos; esvaziar() emite o que estiver pendente e
+    finalizar() encerra o fluxo.
+
+    Com 'verificacao', cada quadro é seguido do seu CRC32 e o marcador de fim,
+    do CRC32 de todo o fluxo (veja formato.py).
+    """
+
+    def __init__(self, tamanho_quadro: int = TAMANHO_QUADRO_MAXIMO, verificacao: bool = True):
+        self.modelo = ModeloAdaptativo()
+        self.tamanho_quadro = tamanho_quadro
+        self.verificacao = verificacao
+        # Tamanho do próximo quadro: dobra a cada quadro até tamanho_quadro
+        self.limite = min(TAMANHO_QUADRO_INICIAL, tamanho_quadro)
+        self._pendente = bytearray()
+        self._iniciado = False
+        self._crc = 0
+        self.total = 0
+
+    def _emitir(self, dados: bytes) -> bytes:
+        self._crc = zlib.crc32(dados, self._crc)
+        return dados
+
+    def _quadro(self, dados: bytes) -> bytes:
+        self.total += len(dados)
+        self.limite = min(2 * self.limite, self.tamanho_quadro)
+        quadro = codificar_quadro(self.modelo, dados)
+        if self.verificacao:
+            quadro += zlib.crc32(quadro).to_bytes(4, 'big')
+        return self._emitir(quadro)
+
+    def _inicio(self) -> bytes:
+        if self._iniciado:
+            return b''
+        self._iniciado = True
+        return self._emitir(inicio_fluxo(self.verificacao))
+
+    def alimentar(self, dados: bytes) -> bytes:
+        """Acrescenta dados e retorna os bytes compactados dos quadros que ficaram completos."""
+        self._pendente += dados
+        saida = [self._inicio()]
+        while len(self._pendente) >= self.limite:
+            limite = self.limite
+            saida.append(self._quadro(bytes(self._pendente[:limite])))
+            del self._pendente[:limite]
+        return b''.join(saida)
+
+    def esvaziar(self) -> bytes:
+        """Codifica os dados pendentes num quadro, para que o outro lado já possa lê-los."""
+        saida = self._inicio()
+        if self._pendente:
+            saida += self._quadro(bytes(self._pendente))
+            self._pendente.clear()
+        return saida
+
+    def finalizar(self) -> bytes:
+        """Emite os dados pendentes e o marcador de fim do fluxo."""
+        saida = self.esvaziar() + self._emitir(b'\x00')
+        if self.verificacao:
+            saida += self._crc.to_bytes(4, 'big')
+        return saida
+
+
+class Descompactador:
+    """
+    Descompactação incremental de um fluxo adaptativo: alimentar() aceita os
+    bytes compactados em pedaços de qualquer tamanho e devolve os dados dos
+    quadros já completos. Bytes após o fim do fluxo ficam em 'sobra'.
+
+    Fluxos com verificação têm cada quadro conferido antes de ser
+    decodificado. separar() apenas confere e separa os quadros, sem decodificá-los.
+    """
+
+    def __init__(self):
+        self.modelo = ModeloAdaptativo()
+        self.verificacao = False
+        self._buffer = bytearray()
+        self._iniciado = False
+        self._crc = 0
+        self.terminado = False
+        self.sobra = b''
+        self.total = 0
+
+    def alimentar(self, dados: bytes) -> bytes:
+        """
+        Raises:
+            ValueError: Se os dados não forem de um fluxo adaptativo ou um CRC32 não conferir.
+        """
+        return b''.join(decodificar_quadro(self.modelo, n_bytes, codificados)
+                        for n_bytes, codificados in self.separar(dados))
+
+    def separar(self, dados: bytes) -> List[Tuple[int, bytes]]:
+        """
+        Acrescenta dados e retorna os quadros completos, já conferidos, como
+        pares (bytes originais, dados codificados), sem decodificá-los.
+        """
+        if self.terminado:
+            self.sobra += dados
+            return []
+        self._buffer += dados
+        if not self._iniciado:
+            if len(self._buffer) < len(MAGICO) + 1:
+                if self._buffer != MAGICO[:len(self._buffer)]:
+                    raise ValueError("O fluxo não está no formato adaptativo.")
+                return []
+            versao = self._buffer[len(MAGICO)]
+            if self._buffer[:len(MAGICO)] != MAGICO or versao & ~FLAG_INTEGRIDADE != VERSAO_FLUXO:
+                raise ValueError("O fluxo não está no formato adaptativo.")
+            self.verificacao = bool(versao & FLAG_INTEGRIDADE)
+            self._crc = zlib.crc32(self._buffer[:len(MAGICO) + 1])
+            del self._buffer[:len(MAGICO) + 1]
+            self._iniciado = True
+
+        tamanho_crc = 4 if self.verificacao else 0
+        saida = []
+        posicao = 0
+        while True:
+            lido = _ler_varint_buffer(self._buffer, posicao)
+            if lido is None:
+                break
+            n_bytes, depois = lido
+            if not n_bytes:
+                if len(self._buffer) < depois + tamanho_crc:
+                    break
+                self._crc = zlib.crc32(self._buffer[posicao:depois], self._crc)
+                if self.verificacao and int.from_bytes(self._buffer[depois:depois + 4], 'big') != self._crc:
+                    raise ValueError("Fluxo corrompido: CRC32 do fluxo não confere.")
+                self.terminado = True
+                self.sobra = bytes(self._buffer[depois + tamanho_crc:])
+                posicao = len(self._buffer)
+                break
+            lido = _ler_varint_buffer(self._buffer, depois)
+            if lido is None or lido[1] + lido[0] + tamanho_crc > len(self._buffer):
+                break
+            tamanho, depois = lido
+            fim = depois + tamanho
+            quadro = self._buffer[posicao:fim]
+            if self.verificacao and int.from_bytes(self._buffer[fim:fim + 4], 'big') != zlib.crc32(quadro):
+                raise ValueError(f"Fluxo corrompido: CRC32 do quadro que começa no byte {self.total} "
+                                 f"dos dados não confere.")
+            self._crc = zlib.crc32(self._buffer[posicao:fim + tamanho_crc], self._crc)
+            saida.append((n_bytes, bytes(self._buffer[depois:fim])))
+            self.total += n_bytes
+            posicao = fim + tamanho_crc
+        del self._buffer[:posicao]
+        return saida
+
+    def finalizar(self) -> bytes:
+        """
+        Confere que o fluxo terminou.
+
+        Raises:
+            ValueError: Se o marcador de fim ainda não chegou (fluxo truncado).
+        """
+        if not self.terminado:
+            raise ValueError("Fluxo truncado: quadro incompleto.")
+        return b''
+
+
+def _ler(f: BinaryIO, n: int) -> bytes:
+    # read1 devolve o que já estiver disponível, para que dados que chegam
+    # devagar por um pipe não esperem um quadro inteiro
+    ler = getattr(f, 'read1', f.read)
+    return ler(n)
+
+
+def compactar_fluxo(entrada: BinaryIO, saida: BinaryIO, metricas: Optional[Metricas] = None,
+                    tamanho_quadro: int = TAMANHO_QUADRO_MAXIMO, verificacao: bool = True) -> int:
+    """
+    Compacta 'entrada' em 'saida' numa única passada, com o modelo adaptativo.
+    Cada quadro é gravado (e a saída esvaziada) assim que é lido; com
+    'verificacao', cada um leva o seu CRC32.
+
+    Returns:
+        A quantidade de bytes lidos.
+    """
+    metricas = metricas if metricas is not None else Metricas()
+    metricas.iniciar('compactar', 0)
+    compactador = Compactador(tamanho_quadro, verificacao)
+    while True:
+        with metricas.etapa('leitura'):
+            dados = _ler(entrada, compactador.limite)
+        if not dados:
+            break
+        with metricas.etapa('codificacao'):
+            quadro = compactador.alimentar(dados) + compactador.esvaziar()
+        with metricas.etapa('escrita'):
+            saida.write(quadro)
+            saida.flush()
+        metricas.bytes_saida += len(quadro)
+        metricas.avancar(len(dados))
+
+    final = compactador.finalizar()
+    saida.write(final)
+    saida.flush()
+    metricas.bytes_saida += len(final)
+    metricas.bytes_entrada = metricas.simbolos = compactador.total
+    metricas.finalizar()
+    return compactador.total
+
+
+def descompactar_fluxo(entrada: BinaryIO, saida: BinaryIO, metricas: Optional[Metricas] = None) -> int:
+    """
+    Descompacta um fluxo gerado por compactar_fluxo, quadro a quadro.
+
+    Returns:
+        A quantidade de bytes escritos.
+
+    Raises:
+        ValueError: Se o fluxo não for do modo adaptativo, estiver truncado ou corrompido.
+    """
+    metricas = metricas if metricas is not None else Metricas()
+    metricas.iniciar('descompactar', 0)
+    descompactador = Descompactador()
+    while not descompactador.terminado:
+        with metricas.etapa('leitura'):
+            codificados = _ler(entrada, TAMANHO_QUADRO_MAXIMO)
+        if not codificados:
+            break
+        with metricas.etapa('decodificacao'):
+            dados = descompactador.alimentar(codificados)
+        with metricas.etapa('escrita'):
+            saida.write(dados)
+            saida.flush()
+        metricas.bytes_entrada += len(codificados)
+        metricas.avancar(len(codificados))
+    descompactador.finalizar()
+
+    metricas.bytes_saida = metricas.simbolos = descompactador.total
+    metricas.finalizar()
+    return descompactador.total
@@ -0,0 +1,343 @@
+import io
+import json
+import os
+import zlib
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from src.huffman_tree import Node, Simbolo, construir_arvore, construir_arvore_canonica
+
+# --- Formato binário do arquivo .huff ---
+#
+#   MAGICO (4 bytes) | versão (1 byte) | total_chars (varint) | n_simbolos (varint)
+#   n_simbolos x [ delta do código do caractere (varint) | comprimento do código (1 byte) ]
+#   dados compactados (códigos canônicos, último byte completado com zeros)
+#
+# Os caracteres são gravados em ordem crescente de código Unicode, guardando
+# apenas a diferença para o anterior, o que mantém o cabeçalho pequeno mesmo
+# para alfabetos grandes. A versão 1 (implícita) é o formato antigo: 4 bytes
+# com o tamanho de um cabeçalho JSON com as frequências. A versão 3 é o
+# contêiner de blocos independentes descrito em blocos.py.
+#
+# A versão 4 tem o mesmo cabeçalho da versão 2 e, após os dados, uma tabela
+# de pontos de sincronização (veja escrever_pontos_sincronizacao) que permite
+# decodificar um trecho do texto sem começar do primeiro bit.
+#
+# A versão 5 é idêntica à versão 4, mas o alfabeto são os 256 valores de byte
+# (modo binário): a tabela guarda valores de byte no lugar de códigos Unicode
+# e a descompactação produz bytes em vez de texto.
+#
+# A versão 6 não traz tabela: apenas o identificador (8 bytes) de uma tabela
+# treinada externa (veja dicionario.py) e o total de bytes, seguidos dos dados.
+#
+# A versão 7 é o modo adaptativo em uma passada, gravado em quadros sem
+# tabela nem total (veja fluxo.py).
+#
+# A versão 8 usa um modelo de contexto de ordem 1 sobre bytes: o código de
+# cada byte depende do byte anterior (veja contexto.py). O cabeçalho traz uma
+# tabela compartilhada pelos contextos raros e a de cada contexto frequente:
+#
+#   MAGICO | versão | total de bytes (varint) | tabela compartilhada
+#   | n_contextos (varint) | n_contextos x [ delta do contexto (varint) | tabela ]
+#
+# Cada tabela é gravada como na versão 5; um contexto com um único sucessor
+# usa código de comprimento 0.
+#
+# Se o bit mais alto do byte de versão (FLAG_INTEGRIDADE) estiver ligado, o
+# arquivo tem verificação de integridade (veja integridade.py). Nas versões
+# 2 a 6 e 8, todo o conteúdo é seguido de um rodapé:
+#
+#   conteúdo | tamanho do pedaço (varint) | n_pedacos (varint) | CRC32 de cada pedaço
+#   | CRC32 do conteúdo | CRC32 do rodapé | posição do rodapé (8 bytes)
+#
+# Os pedaços são fatias consecutivas do conteúdo, a partir do byte 0, e
+# os CRC32 ocupam 4 bytes (big-endian). Na versão 7, cada quadro traz o CRC32
+# dos seus bytes (varints e dados) e o marcador de fim, o CRC32 de todo o fluxo.
+
+MAGICO = b'HUFF'
+VERSAO_FORMATO = 2
+VERSAO_BLOCOS = 3
+VERSAO_SINCRONIZADA = 4
+VERSAO_BYTES = 5
+VERSAO_TREINADA = 6
+VERSAO_FLUXO = 7
+VERSAO_CONTEXTO = 8
+FLAG_INTEGRIDADE = 0x80
+
+
+def escrever_varint(f: BinaryIO, valor: int):
+    """Escreve um inteiro não negativo em LEB128 (7 bits por byte)."""
+    saida = bytearray()
+    while True:
+        byte = valor & 0x7F
+        valor >>= 7
+        if valor:
+            saida.append(byte | 0x80)
+        else:
+            saida.append(byte)
+            break
+    f.write(saida)
+
+
+def ler_varint(f: BinaryIO) -> int:
+    """Lê um inteiro em LEB128 escrito por escrever_varint."""
+    valor = 0
+    deslocamento = 0
+    while True:
+        byte = f.read(1)
+        if not byte:
+            raise ValueError("Cabeçalho truncado: varint incompleto.")
+        valor |= (byte[0] & 0x7F) << deslocamento
+        if not byte[0] & 0x80:
+            return valor
+        deslocamento += 7
+
+
+def escrever_tabela_comprimentos(f: BinaryIO, comprimentos: Dict[Simbolo, int]):
+    """
+    Escreve a quantidade de símbolos seguida dos pares (delta do símbolo, comprimento).
+    Caracteres são gravados pelo código Unicode e bytes pelo próprio valor.
+    """
+    escrever_varint(f, len(comprimentos))
+    anterior = 0
+    for simbolo in sorted(comprimentos):
+        valor = simbolo if isinstance(simbolo, int) else ord(simbolo)
+        escrever_varint(f, valor - anterior)
+        f.write(bytes([comprimentos[simbolo]]))
+        anterior = valor
+
+
+def ler_tabela_comprimentos(f: BinaryIO, simbolos_bytes: bool = False) -> Dict[Simbolo, int]:
+    """
+    Lê uma tabela de comprimentos escrita por escrever_tabela_comprimentos.
+    Com 'simbolos_bytes', as chaves são valores de byte (int) em vez de caracteres.
+    """
+    n_simbolos = ler_varint(f)
+    comprimentos: Dict[Simbolo, int] = {}
+    anterior = 0
+    for _ in range(n_simbolos):
+        anterior += ler_varint(f)
+        comprimento = f.read(1)
+        if not comprimento:
+            raise ValueError("Cabeçalho truncado: tabela de comprimentos incompleta.")
+        comprimentos[anterior if simbolos_bytes else chr(anterior)] = comprimento[0]
+    return comprimentos
+
+
+def identificar_versao(f: BinaryIO) -> int:
+    """
+    Identifica a versão do formato sem consumir bytes do arquivo.
+    Retorna 1 para o formato antigo com cabeçalho JSON.
+    """
+    inicio = f.peek(len(MAGICO) + 1)[:len(MAGICO) + 1]
+    if inicio[:len(MAGICO)] != MAGICO or len(inicio) <= len(MAGICO):
+        return 1
+    return inicio[len(MAGICO)] & ~FLAG_INTEGRIDADE
+
+
+def possui_integridade(f: BinaryIO) -> bool:
+    """Indica, sem consumir bytes, se o arquivo tem verificação de integridade."""
+    inicio = f.peek(len(MAGICO) + 1)[:len(MAGICO) + 1]
+    return len(inicio) > len(MAGICO) and inicio[:len(MAGICO)] == MAGICO and bool(inicio[-1] & FLAG_INTEGRIDADE)
+
+
+def ler_versao(f: BinaryIO, esperada: int) -> bool:
+    """
+    Consome os bytes mágicos e o byte de versão, conferindo a versão esperada.
+    Retorna se o arquivo tem verificação de integridade.
+
+    Raises:
+        ValueError: Se o arquivo não tiver a versão esperada.
+    """
+    inicio = f.read(len(MAGICO) + 1)
+    if len(inicio) != len(MAGICO) + 1 or inicio[:len(MAGICO)] != MAGICO or \
+            inicio[-1] & ~FLAG_INTEGRIDADE != esperada:
+        raise ValueError(f"O arquivo não é da versão {esperada} do formato .huff.")
+    return bool(inicio[-1] & FLAG_INTEGRIDADE)
+
+
+def fim_conteudo(f: BinaryIO) -> int:
+    """
+    Posição onde termina o conteúdo do arquivo: o início do rodapé de
+    integridade, se houver, ou o fim do arquivo. Muda a posição de 'f'.
+    """
+    f.seek(0)
+    inicio = f.read(len(MAGICO) + 1)
+    if len(inicio) == len(MAGICO) + 1 and inicio[:len(MAGICO)] == MAGICO and inicio[-1] & FLAG_INTEGRIDADE:
+        f.seek(-8, os.SEEK_END)
+        return int.from_bytes(f.read(8), 'big')
+    return f.seek(0, os.SEEK_END)
+
+
+def escrever_cabecalho(f: BinaryIO, comprimentos: Dict[Simbolo, int], total_chars: int,
+                       versao: int = VERSAO_FORMATO):
+    """
+    Escreve o cabeçalho binário com os comprimentos dos códigos canônicos.
+    'versao' pode incluir FLAG_INTEGRIDADE.
+    """
+    f.write(MAGICO)
+    f.write(bytes([versao]))
+    escrever_varint(f, total_chars)
+    escrever_tabela_comprimentos(f, comprimentos)
+
+
+def ler_cabecalho(f: BinaryIO) -> Tuple[Optional[Node], int]:
+    """
+    Lê o cabeçalho de um arquivo .huff (formato binário ou JSON antigo) e
+    retorna a árvore de decodificação e o total de símbolos. No modo binário
+    (versão 5) as folhas da árvore guardam valores de byte.
+
+    Raises:
+        ValueError: Se o arquivo tiver uma versão desconhecida ou estiver truncado.
+    """
+    inicio = f.read(4)
+    if inicio != MAGICO:
+        # Formato antigo: tamanho do cabeçalho JSON seguido das frequências
+        tamanho_cabecalho = int.from_bytes(inicio, 'big')
+        header_data = json.loads(f.read(tamanho_cabecalho).decode('utf-8'))
+        return construir_arvore(header_data['frequencias']), header_data['total_chars']
+
+    versao = f.read(1)
+    versao = bytes([versao[0] & ~FLAG_INTEGRIDADE]) if versao else versao
+    if versao and versao[0] == VERSAO_TREINADA:
+        raise ValueError("O arquivo usa uma tabela treinada; leia-o com ler_cabecalho_treinado.")
+    if versao and versao[0] == VERSAO_FLUXO:
+        raise ValueError("O arquivo está no modo adaptativo; leia-o com descompactar_fluxo.")
+    if versao and versao[0] == VERSAO_CONTEXTO:
+        raise ValueError("O arquivo usa o modelo de contexto; leia-o com ler_cabecalho_contexto.")
+    if not versao or versao[0] not in (VERSAO_FORMATO, VERSAO_SINCRONIZADA, VERSAO_BYTES):
+        raise ValueError(f"Versão do formato .huff não suportada: {versao[0] if versao else None}.")
+
+    total_chars = ler_varint(f)
+    comprimentos = ler_tabela_comprimentos(f, simbolos_bytes=versao[0] == VERSAO_BYTES)
+    return construir_arvore_canonica(comprimentos), total_chars
+
+
+def escrever_cabecalho_treinado(f: BinaryIO, identificador: bytes, total_chars: int, flags: int = 0):
+    """Escreve o cabeçalho da versão 6, que referencia uma tabela treinada pelo identificador."""
+    f.write(MAGICO)
+    f.write(bytes([VERSAO_TREINADA | flags]))
+    f.write(identificador)
+    escrever_varint(f, total_chars)
+
+
+def ler_cabecalho_treinado(f: BinaryIO, tamanho_identificador: int = 8) -> Tuple[bytes, int]:
+    """Lê o cabeçalho da versão 6 e retorna o identificador da tabela e o total de bytes."""
+    try:
+        ler_versao(f, VERSAO_TREINADA)
+    except ValueError:
+        raise ValueError("O arquivo não usa uma tabela treinada.") from None
+    identificador = f.read(tamanho_identificador)
+    if len(identificador) != tamanho_identificador:
+        raise ValueError("Cabeçalho truncado: identificador da tabela incompleto.")
+    return identificador, ler_varint(f)
+
+
+def escrever_cabecalho_contexto(f: BinaryIO, contextos: Dict[int, Dict[int, int]], compartilhada: Dict[int, int],
+                                total_bytes: int, flags: int = 0):
+    """
+    Escreve o cabeçalho da versão 8: os comprimentos da tabela compartilhada
+    e os de cada contexto com tabela própria.
+    """
+    f.write(MAGICO)
+    f.write(bytes([VERSAO_CONTEXTO | flags]))
+    escrever_varint(f, total_bytes)
+    escrever_tabela_comprimentos(f, compartilhada)
+    escrever_varint(f, len(contextos))
+    anterior = 0
+    for contexto in sorted(contextos):
+        escrever_varint(f, contexto - anterior)
+        escrever_tabela_comprimentos(f, contextos[contexto])
+        anterior = contexto
+
+
+def ler_cabecalho_contexto(f: BinaryIO) -> Tuple[Dict[int, Dict[int, int]], Dict[int, int], int]:
+    """
+    Lê o cabeçalho da versão 8 e retorna os comprimentos de cada contexto,
+    os da tabela compartilhada e o total de bytes.
+    """
+    try:
+        ler_versao(f, VERSAO_CONTEXTO)
+    except ValueError:
+        raise ValueError("O arquivo não usa o modelo de contexto.") from None
+    total_bytes = ler_varint(f)
+    compartilhada = ler_tabela_comprimentos(f, simbolos_bytes=True)
+    contextos: Dict[int, Dict[int, int]] = {}
+    contexto = 0
+    for _ in range(ler_varint(f)):
+        contexto += ler_varint(f)
+        if contexto > 255:
+            raise ValueError("Cabeçalho corrompido: contexto fora do intervalo de bytes.")
+        contextos[contexto] = ler_tabela_comprimentos(f, simbolos_bytes=True)
+    return contextos, compartilhada, total_bytes
+
+
+def escrever_pontos_sincronizacao(f: BinaryIO, pontos: List[Tuple[int, int]]):
+    """
+    Escreve, no fim do arquivo, a tabela de pontos de sincronização: pares
+    (posição em bits nos dados, posição em caracteres no texto), gravados como
+    diferenças em varint, seguidos da posição da tabela em 8 bytes.
+    """
+    posicao_tabela = f.tell()
+    escrever_varint(f, len(pontos))
+    bit_anterior = char_anterior = 0
+    for bit, char in pontos:
+        escrever_varint(f, bit - bit_anterior)
+        escrever_varint(f, char - char_anterior)
+        bit_anterior, char_anterior = bit, char
+    f.write(posicao_tabela.to_bytes(8, 'big'))
+
+
+def ler_pontos_sincronizacao(f: BinaryIO) -> List[Tuple[int, int]]:
+    """Lê a tabela escrita por escrever_pontos_sincronizacao."""
+    f.seek(fim_conteudo(f) - 8)
+    f.seek(int.from_bytes(f.read(8), 'big'))
+    pontos = []
+    bit = char = 0
+    for _ in range(ler_varint(f)):
+        bit += ler_varint(f)
+        char += ler_varint(f)
+        pontos.append((bit, char))
+    return pontos
+
+
+def escrever_rodape_integridade(f: BinaryIO, tamanho_pedaco: int, crcs: List[int], crc_conteudo: int):
+    """Escreve o rodapé de integridade na posição atual, que deve ser o fim do conteúdo."""
+    posicao_rodape = f.tell()
+    rodape = io.BytesIO()
+    escrever_varint(rodape, tamanho_pedaco)
+    escrever_varint(rodape, len(crcs))
+    for crc in crcs:
+        rodape.write(crc.to_bytes(4, 'big'))
+    rodape.write(crc_conteudo.to_bytes(4, 'big'))
+    dados = rodape.getvalue()
+    f.write(dados)
+    f.write(zlib.crc32(dados).to_bytes(4, 'big'))
+    f.write(posicao_rodape.to_bytes(8, 'big'))
+
+
+def ler_rodape_integridade(f: BinaryIO) -> Tuple[int, int, List[int], int]:
+    """
+    Lê o rodapé de integridade e retorna a posição onde ele começa (o tamanho
+    do conteúdo), o tamanho dos pedaços, o CRC32 de cada pedaço e o do conteúdo.
+
+    Raises:
+        ValueError: Se o rodapé estiver corrompido ou o arquivo truncado.
+    """
+    tamanho = f.seek(0, os.SEEK_END)
+    if tamanho < 12:
+        raise ValueError("Arquivo truncado: rodapé de integridade ausente.")
+    f.seek(-12, os.SEEK_END)
+    crc_rodape = int.from_bytes(f.read(4), 'big')
+    posicao_rodape = int.from_bytes(f.read(8), 'big')
+    if posicao_rodape > tamanho - 12:
+        raise ValueError("Arquivo truncado ou corrompido: posição do rodapé de integridade inválida.")
+    f.seek(posicao_rodape)
+    dados = f.read(tamanho - 12 - posicao_rodape)
+    if zlib.crc32(dados) != crc_rodape:
+        raise ValueError("Rodapé de integridade corrompido.")
+
+    rodape = io.BytesIO(dados)
+    tamanho_pedaco = ler_varint(rodape)
+    crcs = [int.from_bytes(rodape.read(4), 'big') for _ in range(ler_varint(rodape))]
+    crc_conteudo = int.from_bytes(rodape.read(4), 'big')
+    return posicao_rodape, tamanho_pedaco, crcs, crc_conteudo
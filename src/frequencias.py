@@ -1,38 +1,242 @@
 
+import os
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from src.exibicao import escrever, formatar_frequencias
+from src.huffman_tree import Simbolo
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional: sem ele a contagem usa bytes.count/Counter
+    np = None
+
+# Modos de leitura da entrada: caracteres Unicode de um texto UTF-8, bytes
+# quaisquer, ou escolha automática a partir do conteúdo do arquivo.
+MODOS = ('auto', 'texto', 'bytes')
+
+# Com até esta quantidade de símbolos distintos num bloco, contar cada um com
+# bytes.count/str.count (um laço em C por símbolo) é mais rápido que o Counter.
+LIMITE_CONTAGEM_DIRETA = 64
+
+# Arquivos a partir deste tamanho são contados em paralelo quando há mais de uma CPU.
+LIMIAR_PARALELO = 32 << 20
+
+def _presentes(bloco) -> set:
+    # Uma amostra espaçada do bloco revela quase todos os símbolos presentes
+    return set(bloco[::max(1, len(bloco) >> 16)])
+
+def _contar_bytes(bloco: bytes) -> list[int]:
+    """Conta os bytes de um bloco num vetor de 256 posições."""
+    if np is not None:
+        return np.bincount(np.frombuffer(bloco, dtype=np.uint8), minlength=256).tolist()
+
+    contagem = [0] * 256
+    presentes = _presentes(bloco)
+    if len(presentes) <= LIMITE_CONTAGEM_DIRETA:
+        for byte in presentes:
+            contagem[byte] = bloco.count(byte)
+        if sum(contagem) == len(bloco):
+            return contagem
+        contagem = [0] * 256
+    # Alfabeto grande, ou a amostra não viu todos os bytes
+    for byte, freq in Counter(bloco).items():
+        contagem[byte] = freq
+    return contagem
+
+def _contar_texto(bloco: str) -> Counter:
+    """Conta os caracteres de um bloco, na ordem de primeira ocorrência."""
+    presentes = _presentes(bloco)
+    if len(presentes) <= LIMITE_CONTAGEM_DIRETA:
+        contagem = {char: bloco.count(char) for char in sorted(presentes, key=bloco.find)}
+        if sum(contagem.values()) == len(bloco):
+            return Counter(contagem)
+    return Counter(bloco)
 
 def gerar_tabela_frequencias(texto: str) -> dict[str, int]:
     """
     Gera uma tabela de frequências de caracteres a partir de um texto.
 
     Args:
-        texto: O texto de entrada.
+        texto: O texto de entrada (ou 'bytes', no modo binário).
 
     Returns:
         Um dicionário com os caracteres e suas frequências.
     """
-    return Counter(texto)
+    if isinstance(texto, (bytes, bytearray)):
+        return Counter({byte: freq for byte, freq in enumerate(_contar_bytes(texto)) if freq})
+    return _contar_texto(texto)
+
+def _dividir_arquivo(caminho: str, partes: int, utf8: bool) -> list[tuple[int, int]]:
+    """
+    Divide o arquivo em até 'partes' intervalos (início, fim) de bytes. Para
+    texto, as fronteiras nunca caem no meio de um caractere UTF-8 nem entre
+    '\r' e '\n', para que cada parte possa ser decodificada isoladamente.
+    """
+    tamanho = os.path.getsize(caminho)
+    fronteiras = [0]
+    with open(caminho, 'rb') as f:
+        for i in range(1, partes):
+            posicao = max(tamanho * i // partes, fronteiras[-1])
+            if utf8:
+                f.seek(max(posicao - 1, 0))
+                janela = f.read(8)
+                desvio = 1 if posicao > 0 else 0
+                while desvio < len(janela) and ((janela[desvio] & 0xC0) == 0x80 or
+                                                (janela[desvio] == 0x0A and janela[desvio - 1] == 0x0D)):
+                    desvio += 1
+                posicao = min(max(posicao - 1, 0) + desvio, tamanho)
+            fronteiras.append(posicao)
+    fronteiras.append(tamanho)
+    return [(inicio, fim) for inicio, fim in zip(fronteiras, fronteiras[1:]) if fim > inicio]
+
+def _contar_intervalo(caminho: str, inicio: int, fim: int, utf8: bool, tamanho_bloco: int):
+    """Conta as frequências de um intervalo de bytes do arquivo (executado num processo)."""
+    if utf8:
+        frequencias = Counter()
+        restante = b''
+    else:
+        contagem = [0] * 256
+    with open(caminho, 'rb') as f:
+        f.seek(inicio)
+        posicao = inicio
+        while posicao < fim:
+            bloco = f.read(min(tamanho_bloco, fim - posicao))
+            if not bloco:
+                break
+            posicao += len(bloco)
+            if not utf8:
+                contagem = [a + b for a, b in zip(contagem, _contar_bytes(bloco))]
+                continue
+            # Deixa para o próximo bloco um caractere multibyte possivelmente
+            # incompleto ou um '\r' final (que pode ser a metade de um '\r\n')
+            bloco = restante + bloco
+            corte = len(bloco)
+            while corte > 0 and len(bloco) - corte < 4 and (bloco[corte - 1] & 0xC0) == 0x80:
+                corte -= 1
+            if corte > 0 and bloco[corte - 1] >= 0xC0:
+                corte -= 1
+            elif bloco.endswith(b'\r'):
+                corte = len(bloco) - 1
+            else:
+                corte = len(bloco)
+            bloco, restante = bloco[:corte], bloco[corte:]
+            frequencias.update(_contar_texto(_normalizar_quebras(bloco.decode('utf-8'))))
+    if not utf8:
+        return contagem
+    if restante:
+        frequencias.update(_normalizar_quebras(restante.decode('utf-8')))
+    return frequencias
+
+def _normalizar_quebras(texto: str) -> str:
+    # Reproduz a tradução de quebras de linha da leitura em modo texto
+    return texto.replace('\r\n', '\n').replace('\r', '\n') if '\r' in texto else texto
+
+def _workers_contagem(caminho: str, workers) -> int:
+    if workers is None:
+        workers = (os.cpu_count() or 1) if os.path.getsize(caminho) >= LIMIAR_PARALELO else 1
+    return max(1, workers)
+
+def gerar_tabela_frequencias_arquivo(caminho: str, tamanho_bloco: int = 1 << 20, workers=None) -> Counter:
+    """
+    Gera a tabela de frequências de um arquivo de texto lendo-o em blocos,
+    sem carregar o conteúdo inteiro na memória.
+
+    Args:
+        caminho: O caminho do arquivo de texto (UTF-8).
+        tamanho_bloco: Quantidade de caracteres lidos por vez.
+        workers: Processos usados na contagem. Com mais de um, o arquivo é
+            dividido em intervalos contados em paralelo e as contagens são
+            somadas na ordem dos intervalos. Padrão: paralelo para arquivos
+            grandes (LIMIAR_PARALELO).
+
+    Returns:
+        Um Counter com os caracteres e suas frequências, na mesma ordem
+        de primeira ocorrência que gerar_tabela_frequencias produziria.
+    """
+    workers = _workers_contagem(caminho, workers)
+    if workers > 1:
+        intervalos = _dividir_arquivo(caminho, workers, utf8=True)
+        frequencias = Counter()
+        with ProcessPoolExecutor(workers) as executor:
+            futuros = [executor.submit(_contar_intervalo, caminho, inicio, fim, True, tamanho_bloco)
+                       for inicio, fim in intervalos]
+            for futuro in futuros:
+                frequencias.update(futuro.result())
+        return frequencias
+
+    frequencias = Counter()
+    with open(caminho, 'r', encoding='utf-8') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), ''):
+            frequencias.update(_contar_texto(bloco))
+    return frequencias
+
+def gerar_tabela_frequencias_bytes(caminho: str, tamanho_bloco: int = 1 << 20, workers=None) -> dict[int, int]:
+    """
+    Gera a tabela de frequências dos bytes de um arquivo qualquer (modo binário).
+
+    As contagens são acumuladas num vetor fixo de 256 posições, indexado
+    pelo valor do byte: com numpy, via numpy.bincount; sem ele, com
+    bytes.count para cada byte presente (ou Counter, se houver muitos).
+
+    Args:
+        caminho: O caminho do arquivo.
+        tamanho_bloco: Quantidade de bytes lidos por vez.
+        workers: Processos usados na contagem (veja gerar_tabela_frequencias_arquivo).
+
+    Returns:
+        Um dicionário {valor do byte: frequência} com os bytes presentes,
+        em ordem crescente de valor.
+    """
+    workers = _workers_contagem(caminho, workers)
+    if workers > 1:
+        contagem = [0] * 256
+        with ProcessPoolExecutor(workers) as executor:
+            futuros = [executor.submit(_contar_intervalo, caminho, inicio, fim, False, tamanho_bloco)
+                       for inicio, fim in _dividir_arquivo(caminho, workers, utf8=False)]
+            for futuro in futuros:
+                contagem = [a + b for a, b in zip(contagem, futuro.result())]
+    else:
+        contagem = _contar_intervalo(caminho, 0, os.path.getsize(caminho), False, tamanho_bloco)
+    return {byte: freq for byte, freq in enumerate(contagem) if freq}
+
+def gerar_tabela_frequencias_modo(caminho: str, modo: str = 'auto',
+                                  tamanho_bloco: int = 1 << 20, workers=None) -> tuple[str, dict]:
+    """
+    Gera a tabela de frequências no modo indicado ('texto', 'bytes' ou 'auto').
+
+    No modo 'auto', arquivos só com ASCII e arquivos que não são UTF-8 válido
+    são tratados como bytes (mais rápido e sem perdas); os demais como texto,
+    para que caracteres multibyte sejam modelados como um único símbolo.
+
+    Returns:
+        O modo efetivamente usado e a tabela de frequências.
+    """
+    if modo not in MODOS:
+        raise ValueError(f"Modo desconhecido: '{modo}'. Use um de {MODOS}.")
+
+    if modo == 'auto':
+        with open(caminho, 'rb') as f:
+            somente_ascii = all(bloco.isascii() for bloco in iter(lambda: f.read(tamanho_bloco), b''))
+        if not somente_ascii:
+            try:
+                return 'texto', gerar_tabela_frequencias_arquivo(caminho, tamanho_bloco, workers)
+            except UnicodeDecodeError:
+                pass
+        modo = 'bytes'
 
-def imprimir_tabela(frequencias: dict[str, int]):
+    if modo == 'bytes':
+        return modo, gerar_tabela_frequencias_bytes(caminho, tamanho_bloco, workers)
+    return modo, gerar_tabela_frequencias_arquivo(caminho, tamanho_bloco, workers)
+
+def imprimir_tabela(frequencias: dict[Simbolo, int], limite: Optional[int] = None):
     """
     Imprime a tabela de frequências de forma legível no console,
     ordenada da maior para a menor frequência.
 
     Args:
         frequencias: O dicionário de frequências.
+        limite: Se informado, imprime só os 'limite' símbolos mais frequentes.
     """
-    print("--- Tabela de Frequências ---")
-    print("Caractere | Frequência")
-    print("---------------------------")
-    
-    # Ordena os itens do dicionário pela frequência (valor), em ordem decrescente
-    sorted_freq = sorted(frequencias.items(), key=lambda item: item[1], reverse=True)
-    
-    for char, freq in sorted_freq:
-        # Trata caracteres especiais para exibição
-        char_display = repr(char)[1:-1]
-        if char == ' ':
-            char_display = "' '"
-        print(f"{char_display:<9} | {freq}")
-    print("---------------------------")
-
+    escrever(formatar_frequencias(frequencias, limite=limite))
@@ -1,18 +1,31 @@
 
 import heapq
-from typing import Optional, Dict, List, Union
+from typing import Callable, Optional, Dict, List, Union
+
+from src.exibicao import escrever, formatar_arvore
+
+# Um símbolo é um caractere (modo texto) ou um valor de byte de 0 a 255 (modo binário)
+Simbolo = Union[str, int]
 
 # --- Estrutura do Nó e da Árvore ---
 
 class Node:
-    """Nó da árvore de Huffman."""
-    def __init__(self, char: Optional[str], freq: int):
+    """
+    Nó da árvore de Huffman.
+
+    Usa __slots__ em vez de um __dict__ por instância: alfabetos com dezenas
+    de milhares de símbolos criam o dobro disso em nós.
+    """
+    __slots__ = ('char', 'freq', 'left', 'right')
+
+    def __init__(self, char: Optional[Simbolo], freq: int):
         self.char = char
         self.freq = freq
         self.left: Optional[Node] = None
         self.right: Optional[Node] = None
 
-    # Métodos de comparação para que o heapq funcione corretamente
+    # Métodos de comparação mantidos por compatibilidade; a construção da
+    # árvore usa chaves (frequência, ordem) e não compara nós diretamente.
     def __lt__(self, other: "Node") -> bool:
         return self.freq < other.freq
 
@@ -21,86 +34,258 @@ class Node:
             return NotImplemented
         return self.freq == other.freq
 
+    __hash__ = object.__hash__
+
 # --- Funções Principais ---
 
-def construir_arvore(frequencias: Dict[str, int]) -> Optional[Node]:
-    """Constrói a árvore de Huffman a partir da tabela de frequências."""
+def construir_arvore(frequencias: Dict[Simbolo, int]) -> Optional[Node]:
+    """
+    Constrói a árvore de Huffman a partir da tabela de frequências.
+
+    Empates de frequência são desfeitos de forma determinística: as folhas
+    são ordenadas por (frequência, símbolo) e cada nó interno recebe uma
+    ordem maior que a de todos os nós já criados. Assim a árvore depende
+    apenas das contagens, e não da ordem em que os símbolos aparecem.
+    """
     if not frequencias:
         return None
 
     # 1. Cria a fila de prioridade com os nós folha
-    fila_prioridade = [Node(char, freq) for char, freq in frequencias.items()]
-    heapq.heapify(fila_prioridade)
+    folhas = sorted(frequencias.items(), key=lambda item: (item[1], item[0]))
+    fila_prioridade = [(freq, ordem, Node(char, freq)) for ordem, (char, freq) in enumerate(folhas)]
+    # 2. A lista já ordenada por (frequência, ordem) é um heap válido
+    ordem = len(fila_prioridade)
 
     # 3. Combina os nós até restar apenas um (a raiz)
     while len(fila_prioridade) > 1:
         # 3a. Remove os dois nós de menor frequência
-        no_esquerdo = heapq.heappop(fila_prioridade)
-        no_direito = heapq.heappop(fila_prioridade)
+        freq_esquerdo, _, no_esquerdo = heapq.heappop(fila_prioridade)
+        freq_direito, _, no_direito = heapq.heappop(fila_prioridade)
 
         # 3b. Cria um nó interno com a soma das frequências
-        freq_soma = no_esquerdo.freq + no_direito.freq
+        freq_soma = freq_esquerdo + freq_direito
         no_pai = Node(None, freq_soma)
         no_pai.left = no_esquerdo
         no_pai.right = no_direito
 
         # 3d. Adiciona o novo nó de volta à fila
-        heapq.heappush(fila_prioridade, no_pai)
+        heapq.heappush(fila_prioridade, (freq_soma, ordem, no_pai))
+        ordem += 1
 
     # 4. A raiz da árvore é o único nó que restou
-    return fila_prioridade[0] if fila_prioridade else None
+    return fila_prioridade[0][2]
 
-def gerar_codigos(raiz: Optional[Node]) -> Dict[str, str]:
-    """Gera os códigos de Huffman para cada caractere a partir da árvore."""
-    codigos: Dict[str, str] = {}
+def construir_arvore_duas_filas(frequencias: Dict[Simbolo, int]) -> Optional[Node]:
+    """
+    Constrói a mesma árvore que construir_arvore, em tempo linear após uma
+    única ordenação (algoritmo das duas filas).
+
+    As folhas ficam numa fila ordenada por (frequência, símbolo) e os nós
+    internos numa segunda fila, que já nasce ordenada porque cada soma é
+    maior ou igual à anterior. Cada passo compara apenas as frentes das duas
+    filas; no empate a folha vem primeiro, como no desempate do heap.
+    """
+    if not frequencias:
+        return None
+
+    folhas = [Node(char, freq) for char, freq in sorted(frequencias.items(), key=lambda item: (item[1], item[0]))]
+    internos: List[Node] = []
+    i = j = 0
+    n_folhas = len(folhas)
+    for _ in range(n_folhas - 1):
+        # Os dois menores entre as frentes das filas (sempre restam ao menos dois nós)
+        filhos = []
+        for _ in range(2):
+            if i < n_folhas and (j == len(internos) or folhas[i].freq <= internos[j].freq):
+                filhos.append(folhas[i])
+                i += 1
+            else:
+                filhos.append(internos[j])
+                j += 1
+        no_esquerdo, no_direito = filhos
+        no_pai = Node(None, no_esquerdo.freq + no_direito.freq)
+        no_pai.left = no_esquerdo
+        no_pai.right = no_direito
+        internos.append(no_pai)
 
-    def _percorrer(no: Optional[Node], codigo_atual: str):
-        if no is None:
-            return
+    return internos[-1] if internos else folhas[0]
+
+def gerar_codigos(raiz: Optional[Node]) -> Dict[Simbolo, str]:
+    """Gera os códigos de Huffman para cada caractere a partir da árvore."""
+    codigos: Dict[Simbolo, str] = {}
+    if raiz is None:
+        return codigos
+    # Caso especial: árvore com um único nó
+    if raiz.char is not None:
+        return {raiz.char: "0"}
 
+    # Percurso iterativo (pilha explícita), para não depender do limite de
+    # recursão em árvores muito desbalanceadas. O filho esquerdo é empilhado
+    # por último para que os códigos saiam na mesma ordem do percurso recursivo.
+    pilha = [(raiz, "")]
+    while pilha:
+        no, codigo_atual = pilha.pop()
         # Se o nó é uma folha, armazena o código para o caractere
         if no.char is not None:
-            # Caso especial: árvore com um único nó
-            if not codigo_atual:
-                codigos[no.char] = "0"
+            codigos[no.char] = codigo_atual
+            continue
+        # Percorre para a esquerda (adiciona '0') e para a direita (adiciona '1')
+        if no.right is not None:
+            pilha.append((no.right, codigo_atual + "1"))
+        if no.left is not None:
+            pilha.append((no.left, codigo_atual + "0"))
+    return codigos
+
+def gerar_comprimentos(raiz: Optional[Node]) -> Dict[Simbolo, int]:
+    """Retorna o comprimento do código de Huffman de cada símbolo da árvore."""
+    if raiz is None:
+        return {}
+    if raiz.char is not None:
+        return {raiz.char: 1}
+
+    # Só a profundidade de cada folha importa: não é preciso montar as strings dos códigos
+    comprimentos: Dict[Simbolo, int] = {}
+    pilha = [(raiz, 0)]
+    while pilha:
+        no, profundidade = pilha.pop()
+        if no.char is not None:
+            comprimentos[no.char] = profundidade
+            continue
+        if no.right is not None:
+            pilha.append((no.right, profundidade + 1))
+        if no.left is not None:
+            pilha.append((no.left, profundidade + 1))
+    return comprimentos
+
+def gerar_comprimentos_limitados(frequencias: Dict[Simbolo, int], comprimento_maximo: int) -> Dict[Simbolo, int]:
+    """
+    Calcula comprimentos de código ótimos com a restrição de que nenhum
+    código passe de 'comprimento_maximo' bits (algoritmo package-merge).
+
+    Em cada nível, da maior profundidade para a menor, os itens do nível de
+    baixo são agrupados em pares ("pacotes") e intercalados com as folhas
+    por peso. Os 2n-2 primeiros itens do último nível definem a solução:
+    o comprimento de um símbolo é o número de níveis em que a sua folha
+    foi escolhida. Só os pesos e se cada item é folha são guardados, e as
+    escolhas são reconstruídas de cima para baixo, em O(n * comprimento_maximo).
+
+    Raises:
+        ValueError: Se 2**comprimento_maximo for menor que o número de símbolos.
+    """
+    if not frequencias:
+        return {}
+    if comprimento_maximo < 1 or (1 << comprimento_maximo) < len(frequencias):
+        raise ValueError(f"Comprimento máximo {comprimento_maximo} insuficiente para {len(frequencias)} símbolos.")
+    simbolos = sorted(frequencias, key=lambda char: (frequencias[char], char))
+    if len(simbolos) == 1:
+        return {simbolos[0]: 1}
+
+    pesos = [frequencias[char] for char in simbolos]
+    n = len(pesos)
+    # Para cada nível (do mais profundo ao nível 1), quais itens da lista intercalada são folhas
+    folhas_por_nivel: List[List[bool]] = []
+    anterior: List[int] = []
+    for _ in range(comprimento_maximo):
+        pacotes = [anterior[k] + anterior[k + 1] for k in range(0, len(anterior) - 1, 2)]
+        itens: List[int] = []
+        eh_folha: List[bool] = []
+        i = j = 0
+        while i < n or j < len(pacotes):
+            if j >= len(pacotes) or (i < n and pesos[i] <= pacotes[j]):
+                itens.append(pesos[i])
+                eh_folha.append(True)
+                i += 1
             else:
-                codigos[no.char] = codigo_atual
-            return
+                itens.append(pacotes[j])
+                eh_folha.append(False)
+                j += 1
+        folhas_por_nivel.append(eh_folha)
+        anterior = itens
 
-        # Percorre para a esquerda (adiciona '0') e para a direita (adiciona '1')
-        _percorrer(no.left, codigo_atual + "0")
-        _percorrer(no.right, codigo_atual + "1")
+    # Desce do nível 1 escolhendo os primeiros 'escolhidos' itens de cada nível;
+    # as folhas escolhidas num nível são sempre as de menor peso
+    comprimentos = [0] * n
+    escolhidos = 2 * n - 2
+    for eh_folha in reversed(folhas_por_nivel):
+        n_folhas = sum(eh_folha[:escolhidos])
+        for k in range(n_folhas):
+            comprimentos[k] += 1
+        escolhidos = 2 * (escolhidos - n_folhas)
+    return dict(zip(simbolos, comprimentos))
+
+# Construtores de árvore selecionáveis: produzem a mesma árvore
+CONSTRUTORES: Dict[str, Callable[[Dict[Simbolo, int]], Optional[Node]]] = {
+    'heap': construir_arvore,
+    'duas_filas': construir_arvore_duas_filas,
+}
 
-    _percorrer(raiz, "")
+def calcular_comprimentos(frequencias: Dict[Simbolo, int], construtor: str = 'duas_filas',
+                          comprimento_maximo: Optional[int] = None) -> Dict[Simbolo, int]:
+    """
+    Calcula os comprimentos dos códigos de Huffman com o construtor escolhido.
+
+    Com 'comprimento_maximo', se algum código de Huffman passar do limite,
+    os comprimentos são recalculados pelo package-merge: ótimos entre os
+    códigos que respeitam o limite (o que mantém a tabela do decodificador
+    sem descidas bit a bit quando o limite não passa da largura da tabela).
+    """
+    if construtor not in CONSTRUTORES:
+        raise ValueError(f"Construtor desconhecido: '{construtor}'. Use um de {sorted(CONSTRUTORES)}.")
+    comprimentos = gerar_comprimentos(CONSTRUTORES[construtor](frequencias))
+    if comprimento_maximo is not None and comprimentos and max(comprimentos.values()) > comprimento_maximo:
+        comprimentos = gerar_comprimentos_limitados(frequencias, comprimento_maximo)
+    return comprimentos
+
+def gerar_codigos_canonicos(comprimentos: Dict[Simbolo, int]) -> Dict[Simbolo, str]:
+    """
+    Gera os códigos de Huffman canônicos a partir dos comprimentos.
+
+    Os caracteres são ordenados por (comprimento, caractere) e recebem códigos
+    consecutivos, de modo que apenas os comprimentos precisam ser guardados
+    no arquivo para que o decodificador reconstrua os mesmos códigos.
+    """
+    codigos: Dict[Simbolo, str] = {}
+    codigo = 0
+    comprimento_anterior = 0
+    for char, comprimento in sorted(comprimentos.items(), key=lambda item: (item[1], item[0])):
+        codigo <<= comprimento - comprimento_anterior
+        codigos[char] = format(codigo, f'0{comprimento}b')
+        codigo += 1
+        comprimento_anterior = comprimento
     return codigos
 
-def imprimir_arvore(raiz: Optional[Node], prefixo="", is_ultimo=True):
-    """Imprime a estrutura da árvore de Huffman de forma visual."""
-    if raiz is not None:
-        print(prefixo, end="")
-        if is_ultimo:
-            print("└── ", end="")
-            prefixo += "    "
-        else:
-            print("├── ", end="")
-            prefixo += "|   "
-
-        char_repr = f"'{raiz.char}'" if raiz.char is not None else "[I]"
-        print(f"{char_repr} ({raiz.freq})")
-
-        # A árvore de Huffman pode ter filhos em qualquer ordem, mas para uma impressão
-        # consistente, podemos tratar a impressão de múltiplos filhos.
-        # Neste caso, são sempre 2 ou 0 filhos.
-        if raiz.left is not None or raiz.right is not None:
-            # Imprime o filho direito primeiro se o esquerdo também existir
-            if raiz.right and raiz.left:
-                imprimir_arvore(raiz.right, prefixo, False)
-                imprimir_arvore(raiz.left, prefixo, True)
-            # Caso tenha apenas um filho (não deveria acontecer em Huffman, mas por robustez)
-            elif raiz.right:
-                imprimir_arvore(raiz.right, prefixo, True)
-            elif raiz.left:
-                imprimir_arvore(raiz.left, prefixo, True)
+def construir_arvore_canonica(comprimentos: Dict[Simbolo, int]) -> Optional[Node]:
+    """
+    Reconstrói a árvore de decodificação a partir dos comprimentos dos
+    códigos canônicos, sem precisar das frequências originais.
+    As frequências dos nós ficam zeradas.
+    """
+    if not comprimentos:
+        return None
+    if len(comprimentos) == 1:
+        # Caso especial: árvore com um único nó
+        return Node(next(iter(comprimentos)), 0)
 
+    # Monta a árvore nível a nível, do mais profundo para a raiz, sem gerar
+    # as strings dos códigos: num código canônico, em cada nível as folhas
+    # ficam à esquerda (códigos menores) e os nós internos, formados pelos
+    # pares consecutivos do nível de baixo, à direita.
+    folhas_por_nivel: Dict[int, List[Simbolo]] = {}
+    for char, comprimento in sorted(comprimentos.items(), key=lambda item: (item[1], item[0])):
+        folhas_por_nivel.setdefault(comprimento, []).append(char)
 
+    nivel: List[Node] = []
+    for comprimento in range(max(folhas_por_nivel), -1, -1):
+        internos = []
+        for i in range(0, len(nivel), 2):
+            pai = Node(None, 0)
+            pai.left = nivel[i]
+            # Um nível ímpar só ocorre com códigos incompletos
+            pai.right = nivel[i + 1] if i + 1 < len(nivel) else None
+            internos.append(pai)
+        nivel = [Node(char, 0) for char in folhas_por_nivel.get(comprimento, ())] + internos
+    return nivel[0]
 
+def imprimir_arvore(raiz: Optional[Node], prefixo="", is_ultimo=True, profundidade_maxima: Optional[int] = None):
+    """Imprime a estrutura da árvore de Huffman de forma visual (veja formatar_arvore)."""
+    escrever(formatar_arvore(raiz, profundidade_maxima, prefixo, is_ultimo))
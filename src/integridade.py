@@ -0,0 +1,170 @@
+import os
+import zlib
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Union
+
+from src.fluxo import Descompactador
+from src.formato import (VERSAO_FLUXO, escrever_rodape_integridade, identificar_versao, ler_rodape_integridade,
+                         possui_integridade)
+
+# --- Verificação de integridade ---
+#
+# Arquivos com FLAG_INTEGRIDADE guardam o CRC32 de cada pedaço de
+# TAMANHO_PEDACO_VERIFICACAO bytes do conteúdo e o de todo o conteúdo (veja o
+# rodapé descrito em formato.py). A descompactação confere cada pedaço assim
+# que termina de lê-lo, então um arquivo corrompido é rejeitado perto do
+# ponto do defeito, e verificar_arquivo() confere tudo sem decodificar nada.
+
+TAMANHO_PEDACO_VERIFICACAO = 1 << 20
+
+
+class EscritorVerificado:
+    """
+    Envolve um arquivo aberto para escrita, calculando o CRC32 de cada pedaço
+    do que é escrito. finalizar() grava o rodapé de integridade.
+    """
+
+    def __init__(self, f: BinaryIO, tamanho_pedaco: int = TAMANHO_PEDACO_VERIFICACAO):
+        self.f = f
+        self.tamanho_pedaco = tamanho_pedaco
+        self.crcs: List[int] = []
+        self.crc_conteudo = 0
+        self._crc_pedaco = 0
+        self._no_pedaco = 0
+
+    def write(self, dados: Union[bytes, bytearray, memoryview]) -> int:
+        self.f.write(dados)
+        self.crc_conteudo = zlib.crc32(dados, self.crc_conteudo)
+        visao = memoryview(dados)
+        while len(visao):
+            parte = visao[:self.tamanho_pedaco - self._no_pedaco]
+            self._crc_pedaco = zlib.crc32(parte, self._crc_pedaco)
+            self._no_pedaco += len(parte)
+            visao = visao[len(parte):]
+            if self._no_pedaco == self.tamanho_pedaco:
+                self.crcs.append(self._crc_pedaco)
+                self._crc_pedaco = self._no_pedaco = 0
+        return len(dados)
+
+    def tell(self) -> int:
+        return self.f.tell()
+
+    def finalizar(self):
+        """Grava o rodapé com os CRCs; nada mais pode ser escrito depois."""
+        if self._no_pedaco:
+            self.crcs.append(self._crc_pedaco)
+            self._crc_pedaco = self._no_pedaco = 0
+        escrever_rodape_integridade(self.f, self.tamanho_pedaco, self.crcs, self.crc_conteudo)
+
+
+class VerificadorIntegridade:
+    """
+    Confere, à medida que é lido, o conteúdo de um arquivo com rodapé de
+    integridade. O conteúdo deve ser entregue em ordem, a partir do byte 0,
+    a atualizar(); bytes além do fim do conteúdo são ignorados.
+    """
+
+    def __init__(self, f: BinaryIO):
+        self.fim, self.tamanho_pedaco, self.crcs, self.crc_esperado = ler_rodape_integridade(f)
+        if len(self.crcs) != -(-self.fim // self.tamanho_pedaco):
+            raise ValueError("Rodapé de integridade inconsistente com o tamanho do arquivo.")
+        self.posicao = 0
+        self._crc_pedaco = 0
+        self._crc_conteudo = 0
+
+    def atualizar(self, dados: Union[bytes, memoryview]):
+        """
+        Raises:
+            ValueError: Assim que um pedaço completo não confere com o seu CRC32.
+        """
+        erro = self._conferir(dados)
+        if erro is not None:
+            raise ValueError(erro)
+
+    def _conferir(self, dados: Union[bytes, memoryview]) -> Optional[str]:
+        # Retorna o erro em vez de lançá-lo: assim nenhuma fatia de um arquivo
+        # mapeado em memória fica presa no traceback (veja filtrar)
+        visao = memoryview(dados)[:max(self.fim - self.posicao, 0)]
+        self._crc_conteudo = zlib.crc32(visao, self._crc_conteudo)
+        while len(visao):
+            no_pedaco = self.posicao % self.tamanho_pedaco
+            parte = visao[:self.tamanho_pedaco - no_pedaco]
+            self._crc_pedaco = zlib.crc32(parte, self._crc_pedaco)
+            self.posicao += len(parte)
+            visao = visao[len(parte):]
+            if self.posicao % self.tamanho_pedaco == 0 or self.posicao == self.fim:
+                indice = (self.posicao - 1) // self.tamanho_pedaco
+                if self._crc_pedaco != self.crcs[indice]:
+                    inicio = indice * self.tamanho_pedaco
+                    return (f"Dados corrompidos entre os bytes {inicio} e {self.posicao} "
+                            f"(pedaço {indice}): CRC32 não confere.")
+                self._crc_pedaco = 0
+        return None
+
+    def conferir_ate(self, f: BinaryIO, posicao: int):
+        """Lê de 'f' e confere os pedaços que contêm os bytes até 'posicao' (exclusive)."""
+        alvo = min(-(-posicao // self.tamanho_pedaco) * self.tamanho_pedaco, self.fim)
+        f.seek(self.posicao)
+        while self.posicao < alvo:
+            dados = f.read(min(self.tamanho_pedaco, alvo - self.posicao))
+            if not dados:
+                raise ValueError("Arquivo truncado.")
+            self.atualizar(dados)
+
+    def filtrar(self, pedacos: Iterable[Union[bytes, memoryview]], inicio: int) -> Iterator[Union[bytes, memoryview]]:
+        """
+        Repassa os pedaços lidos a partir da posição 'inicio' do arquivo,
+        conferindo cada um antes de entregá-lo. Os bytes antes de 'posicao'
+        já foram conferidos e são apenas repassados.
+        """
+        if inicio > self.posicao:
+            raise ValueError("Os pedaços devem continuar a partir do último byte conferido.")
+        for pedaco in pedacos:
+            ja_conferidos = self.posicao - inicio
+            inicio += len(pedaco)
+            if ja_conferidos < len(pedaco):
+                erro = self._conferir(pedaco[ja_conferidos:] if ja_conferidos > 0 else pedaco)
+                if erro is not None:
+                    del pedaco
+                    raise ValueError(erro)
+            yield pedaco
+
+    def concluir(self, f: BinaryIO):
+        """
+        Lê de 'f' o que ainda não foi conferido (por exemplo, a tabela de
+        sincronização após os dados) e confere o CRC32 de todo o conteúdo.
+        """
+        self.conferir_ate(f, self.fim)
+        if self._crc_conteudo != self.crc_esperado:
+            raise ValueError("Conteúdo corrompido: CRC32 do arquivo não confere.")
+
+
+def verificar_arquivo(caminho: str) -> Dict:
+    """
+    Confere a integridade de um arquivo .huff sem decodificá-lo nem gravar nada.
+
+    Returns:
+        Um dicionário com a versão, se o arquivo tem verificação
+        ('verificavel') e o tamanho conferido em bytes.
+
+    Raises:
+        ValueError: Se o arquivo estiver corrompido ou truncado.
+    """
+    with open(caminho, 'rb') as f:
+        tamanho = os.fstat(f.fileno()).st_size
+        if not f.peek(1):
+            return {'versao': None, 'verificavel': False, 'bytes_verificados': 0}
+        versao = identificar_versao(f)
+        if not possui_integridade(f):
+            return {'versao': versao, 'verificavel': False, 'bytes_verificados': 0}
+
+        if versao == VERSAO_FLUXO:
+            # Os quadros são conferidos pelo próprio leitor do fluxo, sem decodificar os dados
+            descompactador = Descompactador()
+            for pedaco in iter(lambda: f.read(TAMANHO_PEDACO_VERIFICACAO), b''):
+                descompactador.separar(pedaco)
+            descompactador.finalizar()
+            return {'versao': versao, 'verificavel': True, 'bytes_verificados': tamanho}
+
+        verificador = VerificadorIntegridade(f)
+        verificador.concluir(f)
+    return {'versao': versao, 'verificavel': True, 'bytes_verificados': verificador.fim}
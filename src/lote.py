@@ -0,0 +1,251 @@
+import contextlib
+import filecmp
+import glob
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, TextIO
+
+from src.analise import AnaliseArquivo
+from src.blocos import ler_indice
+from src.compressor import compactar, descompactar
+from src.formato import (VERSAO_BLOCOS, VERSAO_CONTEXTO, VERSAO_TREINADA, identificar_versao, ler_cabecalho,
+                         ler_cabecalho_contexto, ler_cabecalho_treinado)
+from src.integridade import verificar_arquivo
+from src.metricas import Metricas
+
+# --- Processamento em lote (modo não interativo) ---
+#
+# Cada arquivo é processado por uma tarefa independente, executada num
+# conjunto de processos. O resultado de cada arquivo é um dicionário impresso
+# como uma linha JSON, e o código de saída indica se algum arquivo falhou.
+
+EXTENSAO = '.huff'
+
+SAIDA_OK = 0
+SAIDA_FALHA = 1
+
+
+def expandir_caminhos(padroes: Iterable[str]) -> List[str]:
+    """
+    Expande padrões glob (com suporte a '**') numa lista de arquivos, sem
+    repetições e preservando a ordem. Padrões sem correspondência são mantidos
+    como estão, para que o erro apareça no resultado daquele arquivo.
+    """
+    caminhos: List[str] = []
+    vistos = set()
+    for padrao in padroes:
+        encontrados = sorted(c for c in glob.glob(padrao, recursive=True) if os.path.isfile(c))
+        for caminho in encontrados or [padrao]:
+            if caminho not in vistos:
+                vistos.add(caminho)
+                caminhos.append(caminho)
+    return caminhos
+
+
+def _caminho_saida(entrada: str, diretorio_saida: Optional[str], nome: str) -> str:
+    diretorio = diretorio_saida if diretorio_saida is not None else (os.path.dirname(entrada) or '.')
+    return os.path.join(diretorio, nome)
+
+
+def _verificar_entrada(caminho: str):
+    # As funções de compactação apenas imprimem quando o arquivo não existe;
+    # no lote isso precisa virar uma falha do arquivo.
+    if not os.path.isfile(caminho):
+        raise FileNotFoundError(f"Arquivo '{caminho}' não encontrado.")
+
+
+def _separar_metricas(opcoes: Dict):
+    # A opção 'metricas' pede que o resultado inclua as métricas por etapa
+    opcoes = dict(opcoes)
+    return opcoes, (Metricas() if opcoes.pop('metricas', False) else None)
+
+
+def tarefa_compactar(entrada: str, diretorio_saida: Optional[str], opcoes: Dict) -> Dict:
+    """Compacta 'entrada' para '<nome>.huff' e retorna tamanhos, razão e tempo."""
+    _verificar_entrada(entrada)
+    opcoes, metricas = _separar_metricas(opcoes)
+    saida = _caminho_saida(entrada, diretorio_saida, os.path.basename(entrada) + EXTENSAO)
+    inicio = time.perf_counter()
+    compactar(entrada, saida, metricas=metricas, **opcoes)
+    duracao = time.perf_counter() - inicio
+
+    tamanho_entrada = os.path.getsize(entrada)
+    tamanho_saida = os.path.getsize(saida)
+    resultado = {
+        'saida': saida,
+        'bytes_entrada': tamanho_entrada,
+        'bytes_saida': tamanho_saida,
+        'razao': round(tamanho_saida / tamanho_entrada, 4) if tamanho_entrada else None,
+        'segundos': round(duracao, 4),
+    }
+    if metricas is not None:
+        resultado['metricas'] = metricas.para_dict()
+    return resultado
+
+
+def tarefa_descompactar(entrada: str, diretorio_saida: Optional[str], opcoes: Dict) -> Dict:
+    """Descompacta '<nome>.huff' para '<nome>' e retorna tamanhos e tempo."""
+    _verificar_entrada(entrada)
+    if not entrada.endswith(EXTENSAO):
+        raise ValueError(f"O arquivo de entrada deve ter a extensão {EXTENSAO}")
+    opcoes, metricas = _separar_metricas(opcoes)
+    saida = _caminho_saida(entrada, diretorio_saida, os.path.basename(entrada)[:-len(EXTENSAO)])
+    inicio = time.perf_counter()
+    descompactar(entrada, saida, metricas=metricas, **opcoes)
+    duracao = time.perf_counter() - inicio
+
+    tamanho_entrada = os.path.getsize(entrada)
+    tamanho_saida = os.path.getsize(saida)
+    resultado = {
+        'saida': saida,
+        'bytes_entrada': tamanho_entrada,
+        'bytes_saida': tamanho_saida,
+        'razao': round(tamanho_entrada / tamanho_saida, 4) if tamanho_saida else None,
+        'segundos': round(duracao, 4),
+    }
+    if metricas is not None:
+        resultado['metricas'] = metricas.para_dict()
+    return resultado
+
+
+def tarefa_estatisticas(entrada: str, diretorio_saida: Optional[str], opcoes: Dict) -> Dict:
+    """
+    Para arquivos .huff, informa a versão do formato e o total de símbolos.
+    Para os demais, informa o alfabeto, a entropia e o tamanho estimado
+    dos dados compactados, sem gravar nada (exceto o cache de frequências,
+    se a opção 'cache' indicar um diretório).
+    """
+    _verificar_entrada(entrada)
+    tamanho = os.path.getsize(entrada)
+    if entrada.endswith(EXTENSAO):
+        with open(entrada, 'rb') as f:
+            if not f.peek(1):
+                return {'bytes': tamanho, 'versao': None, 'total_simbolos': 0}
+            versao = identificar_versao(f)
+            if versao == VERSAO_BLOCOS:
+                _, indice, simbolos_bytes = ler_indice(f)
+                return {'bytes': tamanho, 'versao': versao, 'blocos': len(indice),
+                        'modo': 'bytes' if simbolos_bytes else 'texto',
+                        'total_simbolos': sum(n_chars for _, n_chars, _ in indice)}
+            if versao == VERSAO_TREINADA:
+                identificador, total = ler_cabecalho_treinado(f)
+                return {'bytes': tamanho, 'versao': versao, 'tabela': identificador.hex(), 'total_simbolos': total}
+            if versao == VERSAO_CONTEXTO:
+                contextos, _, total = ler_cabecalho_contexto(f)
+                return {'bytes': tamanho, 'versao': versao, 'contextos': len(contextos), 'total_simbolos': total}
+            _, total = ler_cabecalho(f)
+            return {'bytes': tamanho, 'versao': versao, 'total_simbolos': total}
+
+    analise = AnaliseArquivo(entrada, opcoes.get('modo', 'auto'), opcoes.get('cache'))
+    modo, frequencias = analise.modo_efetivo, analise.frequencias
+    total = sum(frequencias.values())
+    entropia = -sum(freq / total * math.log2(freq / total) for freq in frequencias.values()) if total else 0.0
+    comprimentos = analise.comprimentos(comprimento_maximo=opcoes.get('comprimento_maximo'))
+    bits = sum(frequencias[simbolo] * comprimento for simbolo, comprimento in comprimentos.items())
+    return {
+        'bytes': tamanho,
+        'modo': modo,
+        'total_simbolos': total,
+        'simbolos_distintos': len(frequencias),
+        'entropia_bits_por_simbolo': round(entropia, 4),
+        'bytes_dados_estimados': (bits + 7) // 8,
+    }
+
+
+def tarefa_verificar(entrada: str, diretorio_saida: Optional[str], opcoes: Dict) -> Dict:
+    """Confere os CRC32 de um arquivo .huff sem descompactá-lo; um defeito é uma falha."""
+    _verificar_entrada(entrada)
+    return verificar_arquivo(entrada)
+
+
+def tarefa_bench(entrada: str, diretorio_saida: Optional[str], opcoes: Dict) -> Dict:
+    """Faz o ciclo completo num diretório temporário, mede as vazões e confere o resultado."""
+    _verificar_entrada(entrada)
+    tamanho = os.path.getsize(entrada)
+    with tempfile.TemporaryDirectory() as diretorio:
+        compactado = os.path.join(diretorio, 'arquivo' + EXTENSAO)
+        recuperado = os.path.join(diretorio, 'arquivo')
+        inicio = time.perf_counter()
+        compactar(entrada, compactado, **opcoes)
+        meio = time.perf_counter()
+        descompactar(compactado, recuperado)
+        fim = time.perf_counter()
+        tamanho_compactado = os.path.getsize(compactado)
+        identico = filecmp.cmp(entrada, recuperado, shallow=False)
+
+    mb = tamanho / 1_000_000
+    return {
+        'bytes_entrada': tamanho,
+        'bytes_saida': tamanho_compactado,
+        'razao': round(tamanho_compactado / tamanho, 4) if tamanho else None,
+        'segundos_compactar': round(meio - inicio, 4),
+        'segundos_descompactar': round(fim - meio, 4),
+        'mb_s_compactar': round(mb / (meio - inicio), 2),
+        'mb_s_descompactar': round(mb / (fim - meio), 2),
+        'identico': identico,
+    }
+
+
+TAREFAS: Dict[str, Callable[[str, Optional[str], Dict], Dict]] = {
+    'compress': tarefa_compactar,
+    'decompress': tarefa_descompactar,
+    'stats': tarefa_estatisticas,
+    'verify': tarefa_verificar,
+    'bench': tarefa_bench,
+}
+
+
+def _executar_tarefa(comando: str, entrada: str, diretorio_saida: Optional[str], opcoes: Dict) -> Dict:
+    """Executa a tarefa de um arquivo e converte qualquer exceção numa falha do resultado."""
+    resultado = {'comando': comando, 'arquivo': entrada}
+    try:
+        # Mensagens impressas pelo motor não podem se misturar às linhas JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            resultado.update(TAREFAS[comando](entrada, diretorio_saida, opcoes))
+        resultado['ok'] = resultado.get('identico', True)
+    except Exception as e:
+        resultado['ok'] = False
+        resultado['erro'] = f"{type(e).__name__}: {e}"
+    return resultado
+
+
+def executar_lote(comando: str, padroes: Iterable[str], diretorio_saida: Optional[str] = None,
+                  jobs: Optional[int] = None, opcoes: Optional[Dict] = None, saida: TextIO = sys.stdout) -> int:
+    """
+    Processa todos os arquivos dos padrões em paralelo, imprimindo uma linha
+    JSON por arquivo, na ordem dos arquivos.
+
+    Returns:
+        SAIDA_OK se todos os arquivos foram processados, SAIDA_FALHA caso contrário.
+    """
+    if comando not in TAREFAS:
+        raise ValueError(f"Comando desconhecido: '{comando}'.")
+    opcoes = opcoes or {}
+    caminhos = expandir_caminhos(padroes)
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(caminhos) or 1))
+    if diretorio_saida is not None:
+        os.makedirs(diretorio_saida, exist_ok=True)
+
+    falhas = 0
+    argumentos = [(comando, caminho, diretorio_saida, opcoes) for caminho in caminhos]
+    if jobs == 1:
+        resultados = (_executar_tarefa(*args) for args in argumentos)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(jobs)
+        resultados = executor.map(_executar_tarefa, *zip(*argumentos))
+
+    try:
+        for resultado in resultados:
+            falhas += not resultado['ok']
+            saida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+            saida.flush()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return SAIDA_FALHA if falhas else SAIDA_OK
@@ -1,31 +1,43 @@
 import argparse
+import json
 import os
+import sys
 import time
 import threading
-from src.frequencias import gerar_tabela_frequencias, imprimir_tabela
-from src.huffman_tree import construir_arvore, gerar_codigos, imprimir_arvore
+from src.analise import AnaliseArquivo
+from src.exibicao import (FORMATOS_EXPORTACAO, LINHAS_POR_PAGINA, PROFUNDIDADE_PADRAO, escrever, exportar_arvore,
+                          exportar_codigos, exportar_frequencias, formatar_arvore, formatar_codigos,
+                          formatar_frequencias)
+from src.huffman_tree import imprimir_arvore
 from src.compressor import compactar, descompactar
+from src.acesso import extrair_trecho
+from src.frequencias import MODOS
+from src.lote import TAREFAS, executar_lote, expandir_caminhos
+from src.dicionario import EXTENSAO_TABELA, salvar_tabela, treinar_tabela
+from src.fluxo import compactar_fluxo, descompactar_fluxo
+from src.metricas import Metricas
+from src.pacote import empacotar, extrair_pacote, listar_pacote
 
 # --- Variáveis Globais ---
 arquivo_carregado = None
-conteudo_arquivo = None
-tabela_frequencias = None
-raiz_huffman = None
-codigos_huffman = None
+# Frequências, árvore e códigos do arquivo carregado, calculados sob demanda
+# e compartilhados com a compactação (veja analise.py)
+analise = None
 
 # --- Funções de Lógica ---
 
 def carregar_arquivo(caminho: str):
-    """Carrega o conteúdo de um arquivo de texto."""
-    global arquivo_carregado, conteudo_arquivo, tabela_frequencias, raiz_huffman, codigos_huffman
+    """
+    Seleciona um arquivo de texto para as operações seguintes.
+    O conteúdo não é mantido em memória: cada operação lê o arquivo em blocos.
+    """
+    global arquivo_carregado, analise
     try:
         with open(caminho, 'r', encoding='utf-8') as f:
-            conteudo_arquivo = f.read()
+            f.read(1)
         arquivo_carregado = caminho
-        # Reseta as estruturas dependentes
-        tabela_frequencias = None
-        raiz_huffman = None
-        codigos_huffman = None
+        # Uma nova análise: nada do arquivo anterior é reaproveitado
+        analise = AnaliseArquivo(caminho)
         print(f"\nArquivo '{caminho}' carregado com sucesso.")
         return True
     except FileNotFoundError:
@@ -35,16 +47,21 @@ def carregar_arquivo(caminho: str):
         print(f"\nOcorreu um erro inesperado: {e}")
         return False
 
-def run_with_live_timer(message, func, *args):
+def run_with_live_timer(message, func, *args, metricas=None, **kwargs):
     """
     Exibe uma animação de spinner e um cronômetro em tempo real enquanto a função 'func' é executada.
+    Se 'metricas' for informado, é repassado a 'func' e a linha de status mostra
+    também o percentual de bytes processados e a etapa atual. Os demais
+    argumentos nomeados são repassados a 'func'.
     Retorna a duração total da execução.
     """
     exception = None
+    if metricas is not None:
+        kwargs['metricas'] = metricas
     def target_wrapper():
         nonlocal exception
         try:
-            func(*args)
+            func(*args, **kwargs)
         except Exception as e:
             exception = e
 
@@ -60,6 +77,8 @@ def run_with_live_timer(message, func, *args):
         elapsed_time = time.time() - start_time
         char = spinner_chars[idx % len(spinner_chars)]
         status_line = f" {message}... {char} ({elapsed_time:.2f}s)"
+        if metricas is not None:
+            status_line += f" {metricas.percentual:5.1f}% [{metricas.etapa_atual or '...'}]"
         print(status_line, end='\r')
         time.sleep(0.1)
         idx += 1
@@ -75,58 +94,95 @@ def run_with_live_timer(message, func, *args):
     
     return final_time
 
+def imprimir_metricas(metricas: Metricas):
+    """Imprime o tempo de cada etapa e as vazões de uma operação."""
+    total = metricas.segundos or 1e-9
+    print("Etapa          | Tempo (s) |   %")
+    for nome, segundos in sorted(metricas.etapas.items(), key=lambda item: item[1], reverse=True):
+        print(f"{nome:<14} | {segundos:9.4f} | {100 * segundos / total:5.1f}")
+    dados = metricas.para_dict()
+    print(f"Bytes: {dados['bytes_entrada']} -> {dados['bytes_saida']}  |  "
+          f"Símbolos/s: {dados['simbolos_por_segundo']}  |  Pico de memória: {dados['pico_memoria_bytes']} bytes")
+
 # --- Funções do Menu ---
 
+def _paginar(formatar, total: int):
+    """
+    Exibe 'formatar(inicio, limite)' uma página por vez: Enter mostra a
+    próxima e 'q' volta ao menu.
+    """
+    inicio = 0
+    while True:
+        escrever(formatar(inicio, LINHAS_POR_PAGINA))
+        inicio += LINHAS_POR_PAGINA
+        if inicio >= total:
+            return
+        if input("Enter para a próxima página, 'q' para voltar: ").strip().lower() == 'q':
+            return
+
+def _oferecer_exportacao(gravar, formatos):
+    """Pergunta um arquivo de destino e grava nele com 'gravar(f, formato)', pelo formato da extensão."""
+    extensoes = ", ".join("." + formato for formato in formatos)
+    caminho = input(f"Exportar para arquivo ({extensoes}; deixe em branco para pular): ").strip()
+    if not caminho:
+        return
+    formato = os.path.splitext(caminho)[1][1:].lower()
+    if formato not in formatos:
+        print(f"Erro: Use uma das extensões {extensoes}.")
+        return
+    try:
+        with open(caminho, 'w', encoding='utf-8') as f:
+            gravar(f, formato)
+        print(f"Exportado para '{caminho}'.")
+    except OSError as e:
+        print(f"Erro ao exportar: {e}")
+
 def menu_gerar_tabela_freq():
-    """Opção 2: Gera e imprime a tabela de frequências."""
-    global tabela_frequencias
+    """Opção 2: Gera e imprime a tabela de frequências, uma página por vez."""
     print("\n--- Gerando Tabela de Frequências ---")
-    if conteudo_arquivo is None:
+    if arquivo_carregado is None:
         print("Erro: Nenhum arquivo carregado.")
         return
-    
-    if tabela_frequencias is None:
+
+    if not analise.disponivel():
         print("Calculando frequências...")
-        tabela_frequencias = gerar_tabela_frequencias(conteudo_arquivo)
-    
-    imprimir_tabela(tabela_frequencias)
+
+    frequencias = analise.frequencias
+    _paginar(lambda inicio, limite: formatar_frequencias(frequencias, inicio, limite), len(frequencias))
+    _oferecer_exportacao(lambda f, formato: exportar_frequencias(frequencias, f), ('json',))
 
 def menu_gerar_arvore():
-    """Opção 3: Gera e imprime a árvore de Huffman."""
-    global raiz_huffman
+    """Opção 3: Gera e imprime a árvore de Huffman (só os primeiros níveis, se for grande)."""
     print("\n--- Gerando Árvore de Huffman ---")
-    if tabela_frequencias is None:
-        print("Tabela de frequências não gerada. Gerando agora...")
-        menu_gerar_tabela_freq()
-        print("\n--- Gerando Árvore de Huffman ---") # Repete o header para clareza
-
-    if raiz_huffman is None:
-        print("Construindo árvore...")
-        raiz_huffman = construir_arvore(tabela_frequencias)
-    
-    imprimir_arvore(raiz_huffman)
+    if arquivo_carregado is None:
+        print("Erro: Nenhum arquivo carregado.")
+        return
+
+    if not analise.disponivel():
+        print("Calculando frequências e construindo a árvore...")
+
+    raiz = analise.raiz
+    profundidade = None
+    if len(analise.frequencias) > LINHAS_POR_PAGINA:
+        profundidade = PROFUNDIDADE_PADRAO
+        print(f"Árvore com {len(analise.frequencias)} folhas: exibindo os {profundidade} primeiros níveis "
+              f"(exporte para ver a árvore inteira).")
+    imprimir_arvore(raiz, profundidade_maxima=profundidade)
+    _oferecer_exportacao(lambda f, formato: exportar_arvore(raiz, f, formato), FORMATOS_EXPORTACAO)
 
 def menu_gerar_codigos():
-    """Opção 4: Gera e imprime os códigos de Huffman."""
-    global codigos_huffman
+    """Opção 4: Gera e imprime os códigos de Huffman (os mesmos gravados pela compactação), uma página por vez."""
     print("\n--- Gerando Tabela de Códigos ---")
-    if raiz_huffman is None:
-        print("Árvore de Huffman não gerada. Gerando agora...")
-        menu_gerar_arvore()
-        print("\n--- Gerando Tabela de Códigos ---") # Repete o header
-
-    if codigos_huffman is None:
-        print("Gerando códigos...")
-        codigos_huffman = gerar_codigos(raiz_huffman)
-    
-    print("Caractere | Código")
-    print("-------------------------")
-    for char, codigo in sorted(codigos_huffman.items()):
-        char_display = repr(char)[1:-1]
-        if char == ' ':
-            char_display = "' '"
-        print(f"{char_display:<9} | {codigo}")
-    print("-------------------------")
+    if arquivo_carregado is None:
+        print("Erro: Nenhum arquivo carregado.")
+        return
+
+    if not analise.disponivel():
+        print("Calculando frequências e gerando códigos...")
+
+    codigos = analise.codigos()
+    _paginar(lambda inicio, limite: formatar_codigos(codigos, inicio, limite), len(codigos))
+    _oferecer_exportacao(lambda f, formato: exportar_codigos(codigos, f, analise.frequencias), ('json',))
 
 def menu_compactar():
     """Opção 5: Compacta o arquivo carregado."""
@@ -150,14 +206,18 @@ def menu_compactar():
 
     try:
         print(f"Iniciando a compactação de '{os.path.basename(arquivo_carregado)}' para '{os.path.basename(arquivo_saida)}'...")
+        metricas = Metricas()
         duration = run_with_live_timer(
             "Compactando",
             compactar,
             arquivo_carregado,
-            arquivo_saida
+            arquivo_saida,
+            metricas=metricas,
+            analise=analise
         )
         print(f"Arquivo '{arquivo_saida}' gerado com sucesso.")
         print(f"Tempo de execução: {duration:.4f} segundos.")
+        imprimir_metricas(metricas)
     except Exception as e:
         print(f"\nOcorreu um erro durante a compactação: {e}")
 
@@ -175,18 +235,60 @@ def menu_descompactar():
 
     try:
         print(f"Iniciando a descompactação de '{os.path.basename(arquivo_entrada)}'...")
+        metricas = Metricas()
         duration = run_with_live_timer(
             "Descompactando",
             descompactar,
             arquivo_entrada,
-            arquivo_saida
+            arquivo_saida,
+            metricas=metricas
         )
         print(f"Arquivo '{arquivo_saida}' gerado com sucesso.")
         print(f"Tempo de execução: {duration:.4f} segundos.")
+        imprimir_metricas(metricas)
     except Exception as e:
         print(f"\nOcorreu um erro durante a descompactação: {e}")
 
 
+def mostrar_analise(args):
+    """Subcomando show: escreve em stdout a estrutura pedida, numa única escrita."""
+    analise_arquivo = AnaliseArquivo(args.arquivo, args.modo, args.cache)
+    if args.tipo == 'arvore':
+        raiz = analise_arquivo.raiz
+        if args.formato == 'texto':
+            escrever(formatar_arvore(raiz, args.profundidade))
+        else:
+            exportar_arvore(raiz, sys.stdout, args.formato)
+        return
+    if args.formato == 'dot':
+        raise ValueError("O formato dot só está disponível para a árvore.")
+
+    frequencias = analise_arquivo.frequencias
+    if args.tipo == 'codigos':
+        codigos = analise_arquivo.codigos(comprimento_maximo=args.max_bits)
+        if args.formato == 'json':
+            exportar_codigos(codigos, sys.stdout, frequencias)
+        else:
+            escrever(formatar_codigos(codigos, args.inicio, args.top))
+    elif args.formato == 'json':
+        exportar_frequencias(frequencias, sys.stdout)
+    else:
+        escrever(formatar_frequencias(frequencias, args.inicio, args.top))
+
+
+def executar_pacote(args):
+    """Subcomando archive: cria, amplia, lista ou extrai um pacote de vários arquivos."""
+    if args.acao == 'create':
+        total = empacotar(args.pacote, expandir_caminhos(args.caminhos), args.base, args.append, args.jobs,
+                          comprimento_maximo=args.max_bits)
+        print(json.dumps({'pacote': args.pacote, 'entradas': total, 'bytes': os.path.getsize(args.pacote)}))
+    elif args.acao == 'extract':
+        total = extrair_pacote(args.pacote, args.output_dir, args.nomes or None, args.jobs)
+        print(json.dumps({'pacote': args.pacote, 'extraidas': total, 'destino': args.output_dir}))
+    else:
+        escrever("".join(json.dumps(registro, ensure_ascii=False) + "\n" for registro in listar_pacote(args.pacote)))
+
+
 def menu_ler_arquivo_texto():
     """Opção 1: Lê um arquivo de texto."""
     print("\n--- Leitura de Arquivo de Texto ---")
@@ -238,8 +340,153 @@ def main():
     # Argument parser para --input
     parser = argparse.ArgumentParser(description="Compressor e Descompressor Huffman.")
     parser.add_argument("-i", "--input", help="Caminho do arquivo de texto para carregar inicialmente.")
+    parser.add_argument("-x", "--extrair", nargs=3, metavar=("ARQUIVO_HUFF", "INICIO", "FIM"),
+                        help="Imprime os caracteres [INICIO, FIM) de um arquivo .huff sem descompactá-lo inteiro.")
+
+    # Subcomandos não interativos para uso em scripts; sem subcomando, abre o menu
+    subparsers = parser.add_subparsers(dest="comando", metavar="{" + ",".join([*TAREFAS, 'train', 'stream', 'show', 'archive']) + "}")
+    ajudas = {
+        'compress': "Compacta cada arquivo para <nome>.huff.",
+        'decompress': "Descompacta cada <nome>.huff para <nome>.",
+        'stats': "Mostra estatísticas de arquivos comuns ou .huff, sem gravar nada.",
+        'bench': "Mede o ciclo completo de cada arquivo num diretório temporário.",
+        'verify': "Confere os CRC32 de arquivos .huff sem descompactá-los.",
+    }
+    for comando, ajuda in ajudas.items():
+        sub = subparsers.add_parser(comando, help=ajuda, description=ajuda)
+        sub.add_argument("caminhos", nargs="+", help="Arquivos ou padrões glob (ex: 'logs/**/*.txt').")
+        sub.add_argument("-j", "--jobs", type=int, help="Arquivos processados em paralelo (padrão: número de CPUs).")
+        if comando in ('compress', 'decompress'):
+            sub.add_argument("-o", "--output-dir", help="Diretório de saída (padrão: o diretório de cada arquivo).")
+            sub.add_argument("--metricas", action="store_true",
+                             help="Inclui no JSON o tempo de cada etapa, as vazões e o pico de memória.")
+            sub.add_argument("--tabela", help=f"Tabela treinada ({EXTENSAO_TABELA}) usada pelos arquivos.")
+        if comando in ('compress', 'stats', 'bench'):
+            sub.add_argument("--modo", choices=MODOS, default='auto', help="Alfabeto: texto, bytes ou auto.")
+        if comando in ('compress', 'stats'):
+            sub.add_argument("--cache", metavar="DIR",
+                             help="Guarda as frequências em DIR e as reaproveita enquanto o arquivo não mudar.")
+        if comando in ('compress', 'bench'):
+            sub.add_argument("--bloco", type=int, help="Gera o contêiner de blocos com N símbolos por bloco.")
+            sub.add_argument("--max-bits", type=int, help="Limita o comprimento dos códigos a N bits.")
+            sub.add_argument("--contexto", action="store_true",
+                             help="Códigos condicionados ao byte anterior (ordem 1): melhor razão em textos e logs.")
+            sub.add_argument("--no-verify", action="store_true",
+                             help="Não grava os CRC32 de verificação de integridade.")
+    ajuda = "Treina uma tabela de códigos com uma amostra de arquivos pequenos e parecidos."
+    sub = subparsers.add_parser('train', help=ajuda, description=ajuda)
+    sub.add_argument("caminhos", nargs="+", help="Arquivos de amostra ou padrões glob.")
+    sub.add_argument("-o", "--output", required=True, help=f"Arquivo da tabela (ex: json{EXTENSAO_TABELA}).")
+    sub.add_argument("--max-bits", type=int, help="Limita o comprimento dos códigos a N bits.")
+    ajuda = "Compacta stdin para stdout numa única passada (modo adaptativo), para uso em pipes."
+    sub = subparsers.add_parser('stream', help=ajuda, description=ajuda)
+    sub.add_argument("-d", "--decompress", action="store_true", help="Descompacta stdin para stdout.")
+    ajuda = "Mostra a tabela de frequências, a árvore ou os códigos de um arquivo, ou os exporta em JSON/DOT."
+    sub = subparsers.add_parser('show', help=ajuda, description=ajuda)
+    sub.add_argument("arquivo", help="Arquivo a analisar.")
+    sub.add_argument("tipo", nargs="?", choices=('freq', 'arvore', 'codigos'), default='freq',
+                     help="O que mostrar (padrão: freq).")
+    sub.add_argument("--formato", choices=('texto', *FORMATOS_EXPORTACAO), default='texto',
+                     help="texto (limitado por --top/--inicio/--profundidade), json ou dot (só a árvore).")
+    sub.add_argument("--top", type=int, help="Mostra só N símbolos (os mais frequentes, na tabela de frequências).")
+    sub.add_argument("--inicio", type=int, default=0, help="Pula os N primeiros símbolos (paginação com --top).")
+    sub.add_argument("--profundidade", type=int, help="Mostra só os N primeiros níveis da árvore.")
+    sub.add_argument("--modo", choices=MODOS, default='auto', help="Alfabeto: texto, bytes ou auto.")
+    sub.add_argument("--max-bits", type=int, help="Limita o comprimento dos códigos a N bits.")
+    sub.add_argument("--cache", metavar="DIR", help="Diretório do cache de frequências (veja compress --cache).")
+    ajuda = "Guarda muitos arquivos num único pacote com tabelas compartilhadas, e o lista ou extrai."
+    sub = subparsers.add_parser('archive', help=ajuda, description=ajuda)
+    acoes = sub.add_subparsers(dest="acao", required=True, metavar="{create,extract,list}")
+    criar = acoes.add_parser('create', help="Cria o pacote (ou o amplia, com --append).")
+    criar.add_argument("pacote", help="Arquivo do pacote (ex: dados.hufp).")
+    criar.add_argument("caminhos", nargs="+", help="Arquivos ou padrões glob (ex: 'src/**/*.py').")
+    criar.add_argument("-C", "--base", help="Diretório base: os nomes das entradas são relativos a ele.")
+    criar.add_argument("--append", action="store_true",
+                       help="Acrescenta as entradas ao pacote existente; nomes repetidos são substituídos.")
+    criar.add_argument("--max-bits", type=int, help="Limita o comprimento dos códigos a N bits.")
+    criar.add_argument("-j", "--jobs", type=int, help="Processos em paralelo (padrão: número de CPUs).")
+    extrair = acoes.add_parser('extract', help="Extrai todas as entradas, ou só as informadas.")
+    extrair.add_argument("pacote", help="Arquivo do pacote.")
+    extrair.add_argument("nomes", nargs="*", help="Entradas a extrair (padrão: todas).")
+    extrair.add_argument("-o", "--output-dir", default=".", help="Diretório de destino (padrão: o atual).")
+    extrair.add_argument("-j", "--jobs", type=int, help="Processos em paralelo (padrão: número de CPUs).")
+    listar = acoes.add_parser('list', help="Lista as entradas, uma linha JSON por entrada.")
+    listar.add_argument("pacote", help="Arquivo do pacote.")
     args = parser.parse_args()
 
+    if args.comando == 'archive':
+        try:
+            executar_pacote(args)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Erro no pacote '{args.pacote}': {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    if args.comando == 'show':
+        try:
+            mostrar_analise(args)
+        except (OSError, ValueError) as e:
+            print(f"Erro ao mostrar '{args.arquivo}': {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    if args.comando == 'stream':
+        operacao = descompactar_fluxo if args.decompress else compactar_fluxo
+        try:
+            operacao(sys.stdin.buffer, sys.stdout.buffer)
+        except (OSError, ValueError) as e:
+            print(f"Erro no fluxo: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    if args.comando == 'train':
+        try:
+            tabela = treinar_tabela(expandir_caminhos(args.caminhos), args.max_bits)
+            salvar_tabela(tabela, args.output)
+        except (OSError, ValueError) as e:
+            print(f"Erro ao treinar a tabela: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps({'tabela': args.output, 'identificador': tabela.identificador.hex()}))
+        return
+
+    if args.comando:
+        opcoes = {}
+        if getattr(args, 'modo', None):
+            opcoes['modo'] = args.modo
+        if getattr(args, 'max_bits', None):
+            opcoes['comprimento_maximo'] = args.max_bits
+        if getattr(args, 'metricas', False):
+            opcoes['metricas'] = True
+        if getattr(args, 'contexto', False):
+            opcoes['contexto'] = True
+        if getattr(args, 'cache', None):
+            opcoes['cache'] = args.cache
+        if getattr(args, 'no_verify', False):
+            opcoes['verificacao'] = False
+        if getattr(args, 'tabela', None):
+            # Cada processo carrega a tabela uma vez e a reaproveita para todos os seus arquivos
+            if args.comando == 'compress':
+                opcoes['tabela'] = args.tabela
+            else:
+                opcoes['tabelas'] = [args.tabela]
+        if getattr(args, 'bloco', None):
+            # Os arquivos já são processados em paralelo: um processo por arquivo
+            opcoes.update(tamanho_bloco=args.bloco, workers=1)
+        sys.exit(executar_lote(args.comando, args.caminhos, getattr(args, 'output_dir', None), args.jobs, opcoes))
+
+    if args.extrair:
+        caminho, inicio, fim = args.extrair
+        try:
+            trecho = extrair_trecho(caminho, int(inicio), int(fim))
+            if isinstance(trecho, bytes):
+                sys.stdout.buffer.write(trecho)
+            else:
+                sys.stdout.write(trecho)
+        except (OSError, ValueError) as e:
+            print(f"Erro ao extrair o trecho: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
     if args.input:
         if not carregar_arquivo(args.input):
             print("Não foi possível carregar o arquivo inicial fornecido via argumento.")
@@ -0,0 +1,127 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: o pico de memória não é informado
+    resource = None
+
+# --- Métricas do pipeline de compactação ---
+#
+# compactar() e descompactar() aceitam um objeto Metricas opcional e registram
+# nele o tempo de cada etapa, os bytes lidos e gravados e os símbolos
+# processados. Observadores registrados são chamados a cada mudança de etapa
+# e a cada bloco processado, o que permite exibir o progresso em tempo real.
+
+# Eventos enviados aos observadores
+EVENTO_ETAPA = 'etapa'
+EVENTO_PROGRESSO = 'progresso'
+EVENTO_FIM = 'fim'
+
+Observador = Callable[[str, 'Metricas'], None]
+
+
+def pico_memoria_processo() -> Optional[int]:
+    """Pico de memória residente do processo em bytes (None se indisponível)."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    return pico if sys.platform == 'darwin' else pico * 1024
+
+
+class Metricas:
+    """
+    Acumula as métricas de uma operação de compactação ou descompactação.
+
+    O tempo de cada etapa é exclusivo: quando uma etapa é aberta dentro de
+    outra (por exemplo, 'leitura' dentro de 'decodificacao'), o tempo da
+    interna não é contado na externa, e a soma das etapas é o tempo total.
+    """
+
+    def __init__(self, observadores: Optional[List[Observador]] = None):
+        self.observadores: List[Observador] = list(observadores or [])
+        self.operacao: Optional[str] = None
+        self.etapas: Dict[str, float] = {}
+        self.etapa_atual: Optional[str] = None
+        self.bytes_entrada = 0
+        self.bytes_saida = 0
+        self.simbolos = 0
+        # Trabalho total e já realizado, em bytes, para o percentual de progresso
+        self.bytes_totais = 0
+        self.bytes_processados = 0
+        self.segundos = 0.0
+        self.pico_memoria_bytes: Optional[int] = None
+        self._pilha: List[list] = []
+        self._inicio: Optional[float] = None
+
+    def adicionar_observador(self, observador: Observador):
+        self.observadores.append(observador)
+
+    def _notificar(self, evento: str):
+        for observador in self.observadores:
+            observador(evento, self)
+
+    def iniciar(self, operacao: str, bytes_totais: int):
+        """Marca o início da operação e o total de bytes que serão processados."""
+        self.operacao = operacao
+        self.bytes_totais = bytes_totais
+        self._inicio = time.perf_counter()
+
+    def finalizar(self):
+        """Registra o tempo total e o pico de memória e avisa os observadores."""
+        if self._inicio is not None:
+            self.segundos = time.perf_counter() - self._inicio
+        self.bytes_processados = self.bytes_totais
+        self.pico_memoria_bytes = pico_memoria_processo()
+        self._notificar(EVENTO_FIM)
+
+    @contextmanager
+    def etapa(self, nome: str) -> Iterator[None]:
+        """Mede o tempo do bloco 'with' e o acumula na etapa 'nome'."""
+        anterior = self.etapa_atual
+        self.etapa_atual = nome
+        if nome != anterior:
+            self._notificar(EVENTO_ETAPA)
+        # [início, tempo gasto em etapas internas]
+        registro = [time.perf_counter(), 0.0]
+        self._pilha.append(registro)
+        try:
+            yield
+        finally:
+            duracao = time.perf_counter() - registro[0]
+            self._pilha.pop()
+            if self._pilha:
+                self._pilha[-1][1] += duracao
+            self.etapas[nome] = self.etapas.get(nome, 0.0) + duracao - registro[1]
+            self.etapa_atual = anterior
+
+    def avancar(self, n_bytes: int):
+        """Soma 'n_bytes' ao trabalho realizado e avisa os observadores."""
+        self.bytes_processados += n_bytes
+        self._notificar(EVENTO_PROGRESSO)
+
+    @property
+    def percentual(self) -> float:
+        if not self.bytes_totais:
+            return 0.0
+        return min(100.0, 100.0 * self.bytes_processados / self.bytes_totais)
+
+    def para_dict(self) -> Dict:
+        """As métricas num dicionário serializável em JSON."""
+        return {
+            'operacao': self.operacao,
+            'segundos': round(self.segundos, 6),
+            'etapas': {nome: round(segundos, 6) for nome, segundos in self.etapas.items()},
+            'bytes_entrada': self.bytes_entrada,
+            'bytes_saida': self.bytes_saida,
+            'simbolos': self.simbolos,
+            'simbolos_por_segundo': round(self.simbolos / self.segundos, 1) if self.segundos else None,
+            'pico_memoria_bytes': self.pico_memoria_bytes,
+        }
+
+    def para_json(self, **opcoes) -> str:
+        return json.dumps(self.para_dict(), ensure_ascii=False, **opcoes)
@@ -0,0 +1,487 @@
+import io
+import os
+import struct
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from src.codificador import CodificadorBits
+from src.decodificador import decodificar_tabela
+from src.dicionario import TabelaTreinada
+from src.formato import escrever_tabela_comprimentos, escrever_varint, ler_tabela_comprimentos, ler_varint
+from src.frequencias import gerar_tabela_frequencias
+from src.huffman_tree import calcular_comprimentos, gerar_codigos_canonicos
+
+# --- Pacote de vários arquivos ---
+#
+# Um .huff guarda um único arquivo, com a sua própria tabela. Para milhares
+# de arquivos pequenos, o pacote guarda todos num único arquivo, com tabelas
+# de códigos compartilhadas por grupo (por padrão, a extensão) e um índice
+# central com a posição de cada entrada:
+#
+#   MAGICO_PACOTE (4 bytes) | versão (1 byte) | dados das entradas ...
+#   | índice | CRC32 do índice (4 bytes) | posição do índice (8 bytes, big-endian)
+#
+#   índice: n_tabelas (varint) | n_tabelas x [ tipo (1 byte) | tamanho do grupo (varint)
+#           | grupo (UTF-8) | tabela de comprimentos (bytes) ]
+#         | n_entradas (varint) | colunas de n_entradas varints: tamanho do nome,
+#           tabela (0 = armazenada sem compactar, k = k-ésima tabela), posição
+#           (a partir do fim da entrada anterior), bytes gravados, tamanho original
+#         | CRC32 do conteúdo original de cada entrada (4 bytes cada) | nomes (UTF-8)
+#
+# O índice é gravado em colunas para que a abertura leia todos os números
+# num único laço, sem uma chamada por campo: abrir um pacote com 100 mil
+# entradas custa uma fração de segundo.
+#
+# As tabelas de grupo dão código aos 256 valores de byte, como as tabelas
+# treinadas (veja dicionario.py), então servem para qualquer arquivo do
+# grupo. Uma entrada grande ganha tabela própria (tipo TABELA_PROPRIA) se ela
+# economiza mais do que ocupa no índice, e uma entrada que não diminui é
+# armazenada como está.
+#
+# Anexar entradas grava os novos dados sobre o índice antigo e um novo
+# índice no fim; uma entrada com nome já existente substitui a anterior
+# (cujos dados ficam sem uso no arquivo). Abrir o pacote lê só o índice, e
+# cada entrada é lida com um único seek.
+
+MAGICO_PACOTE = b'HUFP'
+VERSAO_PACOTE = 1
+EXTENSAO_PACOTE = '.hufp'
+
+TABELA_GRUPO = 0
+TABELA_PROPRIA = 1
+ARMAZENADA = 0
+
+# Entradas a partir deste tamanho são avaliadas para ter tabela própria
+LIMIAR_TABELA_PROPRIA = 64 << 10
+
+# Bytes de cada grupo lidos para treinar a sua tabela: uma amostra basta
+AMOSTRA_GRUPO = 4 << 20
+
+# Limites de cada lote enviado a um processo: arquivos pequenos viajam
+# juntos, para não pagar a comunicação entre processos por arquivo
+ARQUIVOS_POR_LOTE = 256
+BYTES_POR_LOTE = 4 << 20
+
+
+class EntradaPacote(NamedTuple):
+    nome: str
+    tabela: int
+    posicao: int
+    bytes_gravados: int
+    tamanho: int
+    crc: int
+
+
+class TabelaPacote(NamedTuple):
+    tipo: int
+    grupo: str
+    tabela: TabelaTreinada
+
+
+def grupo_por_extensao(nome: str) -> str:
+    """Grupo padrão de uma entrada: a extensão do nome, em minúsculas."""
+    return os.path.splitext(nome)[1].lower()
+
+
+def _nome_entrada(caminho: str, prefixo_base: Optional[str]) -> str:
+    # 'prefixo_base' é o caminho absoluto da base terminado em os.sep
+    if prefixo_base is None:
+        nome = os.path.normpath(caminho)
+    else:
+        nome = os.path.abspath(caminho)
+        nome = nome[len(prefixo_base):] if nome.startswith(prefixo_base) else os.path.relpath(nome, prefixo_base)
+    nome = nome.replace(os.sep, '/').lstrip('/')
+    _validar_nome(nome)
+    return nome
+
+
+def _validar_nome(nome: str):
+    # Nomes relativos e sem '..': a extração nunca escreve fora do destino
+    partes = nome.split('/')
+    if not nome or nome.startswith('/') or '..' in partes or ':' in partes[0]:
+        raise ValueError(f"Nome de entrada inválido: '{nome}' (use caminhos relativos ou informe a base).")
+
+
+# --- Escrita ---
+
+# Tabelas de cada processo, definidas uma única vez pelo inicializador, e um
+# codificador por tabela, reaproveitado entre os arquivos (finalizar() zera o
+# seu estado): montá-lo custa mais que codificar um arquivo pequeno
+_tabelas_processo: List[TabelaTreinada] = []
+_codificadores: Dict[int, CodificadorBits] = {}
+_comprimento_maximo: Optional[int] = None
+
+
+def _inicializar(tabelas: List[Dict[int, int]], comprimento_maximo: Optional[int]):
+    global _tabelas_processo, _comprimento_maximo
+    _tabelas_processo = [TabelaTreinada(comprimentos) for comprimentos in tabelas]
+    _codificadores.clear()
+    _comprimento_maximo = comprimento_maximo
+
+
+def _codificar_entrada(caminho: str, id_tabela: int) -> Tuple[bytes, int, Optional[Dict[int, int]], int, int]:
+    """
+    Lê e codifica um arquivo com a tabela do seu grupo, com uma tabela
+    própria ou sem compactar, o que for menor.
+
+    Returns:
+        (dados, tabela usada: 0 = armazenada, -1 = própria, k = a do grupo k-1,
+        comprimentos da tabela própria, tamanho original, CRC32 do original)
+    """
+    with open(caminho, 'rb') as f:
+        conteudo = f.read()
+    crc = zlib.crc32(conteudo)
+    tabela = _tabelas_processo[id_tabela]
+    usada, propria = id_tabela + 1, None
+    codificador = _codificadores.get(id_tabela)
+    if len(conteudo) >= LIMIAR_TABELA_PROPRIA:
+        frequencias = gerar_tabela_frequencias(conteudo)
+        comprimentos = calcular_comprimentos(frequencias, comprimento_maximo=_comprimento_maximo)
+        buffer = io.BytesIO()
+        escrever_tabela_comprimentos(buffer, comprimentos)
+        bits_proprios = sum(freq * comprimentos[byte] for byte, freq in frequencias.items()) + 8 * len(buffer.getvalue())
+        bits_grupo = sum(freq * tabela.comprimentos[byte] for byte, freq in frequencias.items())
+        if bits_proprios < bits_grupo:
+            usada, propria = -1, comprimentos
+            codificador = CodificadorBits(gerar_codigos_canonicos(comprimentos))
+    if codificador is None:
+        codificador = _codificadores[id_tabela] = CodificadorBits(tabela.codigos)
+
+    dados = codificador.codificar(conteudo) + codificador.finalizar()
+    if len(dados) >= len(conteudo):
+        return conteudo, ARMAZENADA, None, len(conteudo), crc
+    return dados, usada, propria, len(conteudo), crc
+
+
+def _codificar_lote(lote: List[Tuple[str, int]]) -> list:
+    return [_codificar_entrada(caminho, id_tabela) for caminho, id_tabela in lote]
+
+
+def _lotes(tarefas: List[Tuple[str, int]], tamanhos: Dict[str, int]) -> Iterator[List[Tuple[str, int]]]:
+    lote: List[Tuple[str, int]] = []
+    bytes_lote = 0
+    for tarefa in tarefas:
+        lote.append(tarefa)
+        bytes_lote += tamanhos[tarefa[0]]
+        if len(lote) >= ARQUIVOS_POR_LOTE or bytes_lote >= BYTES_POR_LOTE:
+            yield lote
+            lote, bytes_lote = [], 0
+    if lote:
+        yield lote
+
+
+def _treinar_grupo(caminhos: List[str], comprimento_maximo: Optional[int]) -> Dict[int, int]:
+    # Como em treinar_tabela, todo byte recebe uma contagem extra para ter código
+    amostra = []
+    lidos = 0
+    for caminho in caminhos:
+        with open(caminho, 'rb') as f:
+            amostra.append(f.read(AMOSTRA_GRUPO - lidos))
+        lidos += len(amostra[-1])
+        if lidos >= AMOSTRA_GRUPO:
+            break
+    frequencias: Counter = Counter(range(256))
+    frequencias.update(gerar_tabela_frequencias(b"".join(amostra)))
+    return calcular_comprimentos(frequencias, comprimento_maximo=comprimento_maximo)
+
+
+def empacotar(caminho_pacote: str, caminhos: Iterable[str], base: Optional[str] = None, anexar: bool = False,
+              workers: Optional[int] = None, agrupar: Callable[[str], str] = grupo_por_extensao,
+              comprimento_maximo: Optional[int] = None) -> int:
+    """
+    Grava os arquivos em 'caminhos' num pacote. O nome de cada entrada é o
+    caminho relativo a 'base' (ou o próprio caminho, se for relativo).
+
+    Com 'anexar', as entradas são acrescentadas a um pacote existente (ou
+    criado, se não existir), reaproveitando as tabelas dos grupos que ele já
+    tem; uma entrada com o mesmo nome de outra a substitui. Os arquivos são
+    codificados em paralelo por 'workers' processos.
+
+    Returns:
+        A quantidade de entradas gravadas.
+
+    Raises:
+        ValueError: Se um nome de entrada for inválido ou o pacote existente estiver corrompido.
+    """
+    workers = workers or os.cpu_count() or 1
+    caminhos = list(dict.fromkeys(caminhos))
+    prefixo_base = os.path.join(os.path.abspath(base), '') if base is not None else None
+    nomes = [_nome_entrada(caminho, prefixo_base) for caminho in caminhos]
+    tamanhos = {caminho: os.path.getsize(caminho) for caminho in caminhos}
+
+    tabelas: List[TabelaPacote] = []
+    entradas: Dict[str, EntradaPacote] = {}
+    posicao_dados = len(MAGICO_PACOTE) + 1
+    if anexar and os.path.exists(caminho_pacote):
+        with LeitorPacote(caminho_pacote) as leitor:
+            tabelas, entradas, posicao_dados = list(leitor.tabelas), dict(leitor.entradas), leitor.posicao_indice
+    n_tabelas_anteriores, entradas_anteriores = len(tabelas), dict(entradas)
+
+    # Uma tabela por grupo novo, treinada com uma amostra dos seus arquivos
+    por_grupo: Dict[str, List[str]] = {}
+    for caminho, nome in zip(caminhos, nomes):
+        por_grupo.setdefault(agrupar(nome), []).append(caminho)
+    id_grupo = {tabela.grupo: i for i, tabela in enumerate(tabelas) if tabela.tipo == TABELA_GRUPO}
+    for grupo, membros in por_grupo.items():
+        if grupo not in id_grupo:
+            id_grupo[grupo] = len(tabelas)
+            tabelas.append(TabelaPacote(TABELA_GRUPO, grupo,
+                                        TabelaTreinada(_treinar_grupo(membros, comprimento_maximo))))
+
+    tarefas = [(caminho, id_grupo[agrupar(nome)]) for caminho, nome in zip(caminhos, nomes)]
+    iniciais = ([tabela.tabela.comprimentos for tabela in tabelas], comprimento_maximo)
+    modo = 'r+b' if anexar and os.path.exists(caminho_pacote) else 'wb'
+    with open(caminho_pacote, modo) as f:
+        if modo == 'wb':
+            f.write(MAGICO_PACOTE + bytes([VERSAO_PACOTE]))
+        f.seek(posicao_dados)
+        if workers > 1 and len(tarefas) > 1:
+            executor = ProcessPoolExecutor(workers, initializer=_inicializar, initargs=iniciais)
+            resultados = executor.map(_codificar_lote, _lotes(tarefas, tamanhos))
+        else:
+            executor = None
+            _inicializar(*iniciais)
+            resultados = map(_codificar_lote, _lotes(tarefas, tamanhos))
+        anteriores = (list(tabelas[:n_tabelas_anteriores]), list(entradas_anteriores.values()))
+        try:
+            nomes_iter = iter(nomes)
+            for lote in resultados:
+                for dados, usada, propria, tamanho, crc in lote:
+                    if propria is not None:
+                        tabelas.append(TabelaPacote(TABELA_PROPRIA, '', TabelaTreinada(propria)))
+                        usada = len(tabelas)
+                    nome = next(nomes_iter)
+                    entradas[nome] = EntradaPacote(nome, usada, f.tell(), len(dados), tamanho, crc)
+                    f.write(dados)
+        except BaseException:
+            # Os dados novos ocuparam o lugar do índice antigo: ele é regravado
+            # para que o pacote continue com as entradas que já tinha
+            if modo == 'r+b':
+                f.seek(posicao_dados)
+                _escrever_indice(f, *anteriores)
+                f.truncate()
+            raise
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        _escrever_indice(f, tabelas, entradas.values())
+        f.truncate()
+    return len(caminhos)
+
+
+def _escrever_indice(f: BinaryIO, tabelas: List[TabelaPacote], entradas: Iterable[EntradaPacote]):
+    posicao_indice = f.tell()
+    # Na ordem dos dados no arquivo, para que as posições relativas nunca
+    # sejam negativas (uma entrada substituída é regravada no fim)
+    entradas = sorted(entradas, key=lambda entrada: entrada.posicao)
+    indice = io.BytesIO()
+    escrever_varint(indice, len(tabelas))
+    for tabela in tabelas:
+        grupo = tabela.grupo.encode('utf-8')
+        indice.write(bytes([tabela.tipo]))
+        escrever_varint(indice, len(grupo))
+        indice.write(grupo)
+        indice.write(tabela.tabela.serializada)
+    escrever_varint(indice, len(entradas))
+    nomes = [entrada.nome.encode('utf-8') for entrada in entradas]
+    # Posições relativas ao fim da entrada anterior: quase sempre 0
+    fins = [len(MAGICO_PACOTE) + 1] + [entrada.posicao + entrada.bytes_gravados for entrada in entradas[:-1]]
+    colunas = (map(len, nomes), (entrada.tabela for entrada in entradas),
+               (entrada.posicao - fim for entrada, fim in zip(entradas, fins)),
+               (entrada.bytes_gravados for entrada in entradas), (entrada.tamanho for entrada in entradas))
+    for coluna in colunas:
+        for valor in coluna:
+            escrever_varint(indice, valor)
+    indice.write(struct.pack(f'>{len(entradas)}I', *(entrada.crc for entrada in entradas)))
+    indice.write(b"".join(nomes))
+    dados = indice.getvalue()
+    f.write(dados)
+    f.write(zlib.crc32(dados).to_bytes(4, 'big'))
+    f.write(posicao_indice.to_bytes(8, 'big'))
+
+
+# --- Leitura ---
+
+def _ler_varints(dados: bytes, posicao: int, quantidade: int) -> Tuple[List[int], int]:
+    # Como ler_varint, mas direto sobre os bytes: uma chamada para a coluna inteira
+    valores: List[int] = []
+    valor = deslocamento = 0
+    try:
+        while len(valores) < quantidade:
+            byte = dados[posicao]
+            posicao += 1
+            valor |= (byte & 0x7F) << deslocamento
+            if byte & 0x80:
+                deslocamento += 7
+            else:
+                valores.append(valor)
+                valor = deslocamento = 0
+    except IndexError:
+        raise ValueError("Pacote corrompido: índice truncado.") from None
+    return valores, posicao
+
+
+class LeitorPacote:
+    """
+    Pacote aberto para leitura: o índice é lido na abertura, e cada entrada
+    é localizada por nome em O(1) e lida com um único seek.
+
+    Raises:
+        ValueError: Se o arquivo não for um pacote ou o índice estiver corrompido.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.f = open(caminho, 'rb')
+        try:
+            self.tabelas, self.entradas, self.posicao_indice = self._ler_indice()
+        except BaseException:
+            self.f.close()
+            raise
+
+    def _ler_indice(self) -> Tuple[List[TabelaPacote], Dict[str, EntradaPacote], int]:
+        f = self.f
+        if f.read(len(MAGICO_PACOTE) + 1) != MAGICO_PACOTE + bytes([VERSAO_PACOTE]):
+            raise ValueError(f"'{self.caminho}' não é um pacote da versão {VERSAO_PACOTE}.")
+        fim = f.seek(0, os.SEEK_END)
+        if fim < len(MAGICO_PACOTE) + 1 + 12:
+            raise ValueError("Pacote truncado: índice ausente.")
+        f.seek(fim - 12)
+        rodape = f.read(12)
+        posicao_indice = int.from_bytes(rodape[4:], 'big')
+        if not len(MAGICO_PACOTE) + 1 <= posicao_indice <= fim - 12:
+            raise ValueError("Pacote corrompido: posição do índice inválida.")
+        f.seek(posicao_indice)
+        dados = f.read(fim - 12 - posicao_indice)
+        if zlib.crc32(dados) != int.from_bytes(rodape[:4], 'big'):
+            raise ValueError("Pacote corrompido: CRC32 do índice não confere.")
+
+        indice = io.BytesIO(dados)
+        tabelas = []
+        for _ in range(ler_varint(indice)):
+            tipo = indice.read(1)[0]
+            grupo = indice.read(ler_varint(indice)).decode('utf-8')
+            tabelas.append(TabelaPacote(tipo, grupo, TabelaTreinada(ler_tabela_comprimentos(indice, True))))
+        n = ler_varint(indice)
+        valores, posicao = _ler_varints(dados, indice.tell(), 5 * n)
+        tamanhos_nomes, ids_tabelas, deltas, gravados, tamanhos = (valores[i * n:(i + 1) * n] for i in range(5))
+        crcs = struct.unpack_from(f'>{n}I', dados, posicao)
+        posicao += 4 * n
+        if posicao + sum(tamanhos_nomes) != len(dados) or any(t > len(tabelas) for t in ids_tabelas):
+            raise ValueError("Pacote corrompido: índice inconsistente.")
+
+        entradas = {}
+        fim = len(MAGICO_PACOTE) + 1
+        for tamanho_nome, id_tabela, delta, n_gravados, tamanho, crc in zip(tamanhos_nomes, ids_tabelas, deltas,
+                                                                             gravados, tamanhos, crcs):
+            nome = dados[posicao:posicao + tamanho_nome].decode('utf-8')
+            posicao += tamanho_nome
+            inicio = fim + delta
+            entradas[nome] = EntradaPacote(nome, id_tabela, inicio, n_gravados, tamanho, crc)
+            fim = inicio + n_gravados
+        return tabelas, entradas, posicao_indice
+
+    def __contains__(self, nome: str) -> bool:
+        return nome in self.entradas
+
+    def nomes(self) -> List[str]:
+        return list(self.entradas)
+
+    def ler(self, nome: str) -> bytes:
+        """
+        Lê e decodifica uma entrada, conferindo o seu CRC32.
+
+        Raises:
+            KeyError: Se não houver entrada com esse nome.
+            ValueError: Se a entrada estiver corrompida.
+        """
+        entrada = self.entradas[nome]
+        self.f.seek(entrada.posicao)
+        dados = self.f.read(entrada.bytes_gravados)
+        if entrada.tabela == ARMAZENADA:
+            conteudo = dados
+        else:
+            tabela = self.tabelas[entrada.tabela - 1].tabela
+            raiz = tabela.raiz
+            if raiz.char is not None:
+                # Tabela própria de um único byte repetido
+                conteudo = bytes((raiz.char,)) * entrada.tamanho
+            else:
+                conteudo = decodificar_tabela(dados, raiz, entrada.tamanho, tabela=tabela.tabela_decodificacao)
+        if len(conteudo) != entrada.tamanho or zlib.crc32(conteudo) != entrada.crc:
+            raise ValueError(f"Entrada '{nome}' corrompida: CRC32 não confere.")
+        return conteudo
+
+    def fechar(self):
+        self.f.close()
+
+    def __enter__(self) -> 'LeitorPacote':
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+
+# Pacote aberto em cada processo de extração, pelo inicializador
+_leitor_processo: Optional[LeitorPacote] = None
+
+
+def _inicializar_extracao(caminho_pacote: str):
+    global _leitor_processo
+    _leitor_processo = LeitorPacote(caminho_pacote)
+
+
+def _extrair_lote(nomes: List[str], destino: str) -> int:
+    for nome in nomes:
+        saida = os.path.join(destino, *nome.split('/'))
+        os.makedirs(os.path.dirname(saida) or '.', exist_ok=True)
+        with open(saida, 'wb') as f:
+            f.write(_leitor_processo.ler(nome))
+    return len(nomes)
+
+
+def extrair_pacote(caminho_pacote: str, destino: str, nomes: Optional[Iterable[str]] = None,
+                   workers: Optional[int] = None) -> int:
+    """
+    Extrai as entradas 'nomes' (todas, se None) para o diretório 'destino',
+    em paralelo por 'workers' processos, cada um com o pacote aberto uma vez.
+
+    Returns:
+        A quantidade de entradas extraídas.
+
+    Raises:
+        KeyError: Se algum nome não estiver no pacote.
+        ValueError: Se o pacote ou uma entrada estiver corrompido.
+    """
+    workers = workers or os.cpu_count() or 1
+    with LeitorPacote(caminho_pacote) as leitor:
+        nomes = leitor.nomes() if nomes is None else list(nomes)
+        faltando = [nome for nome in nomes if nome not in leitor]
+        if faltando:
+            raise KeyError(f"Entradas ausentes do pacote: {', '.join(faltando[:5])}")
+        for nome in nomes:
+            _validar_nome(nome)
+        tamanhos = {nome: leitor.entradas[nome].tamanho for nome in nomes}
+
+    lotes = [[nome for nome, _ in lote] for lote in _lotes([(nome, 0) for nome in nomes], tamanhos)]
+    if workers == 1 or len(lotes) <= 1:
+        _inicializar_extracao(caminho_pacote)
+        try:
+            return sum(_extrair_lote(lote, destino) for lote in lotes)
+        finally:
+            _leitor_processo.fechar()
+    with ProcessPoolExecutor(workers, initializer=_inicializar_extracao, initargs=(caminho_pacote,)) as executor:
+        return sum(executor.map(_extrair_lote, lotes, [destino] * len(lotes)))
+
+
+def listar_pacote(caminho_pacote: str) -> List[Dict]:
+    """Nome, tamanho original, bytes gravados e grupo de cada entrada do pacote."""
+    with LeitorPacote(caminho_pacote) as leitor:
+        return [{'nome': entrada.nome, 'bytes': entrada.tamanho, 'bytes_gravados': entrada.bytes_gravados,
+                 'tabela': ('armazenada' if entrada.tabela == ARMAZENADA else
+                            'propria' if leitor.tabelas[entrada.tabela - 1].tipo == TABELA_PROPRIA else
+                            f"grupo '{leitor.tabelas[entrada.tabela - 1].grupo}'")}
+                for entrada in leitor.entradas.values()]
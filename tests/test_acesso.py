@@ -0,0 +1,61 @@
+
+import unittest
+import os
+import tempfile
+from src.acesso import extrair_trecho
+from src.compressor import compactar
+
+
+class TestAcessoAleatorio(unittest.TestCase):
+    """Testes para a extração de trechos a partir dos pontos de sincronização."""
+
+    TEXTO = "o algoritmo de huffman é um algoritmo de compressão usado para compactar dados. " * 20
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.original = os.path.join(self.diretorio.name, "original.txt")
+        self.compactado = os.path.join(self.diretorio.name, "compactado.huff")
+        with open(self.original, 'w', encoding='utf-8') as f:
+            f.write(self.TEXTO)
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def _verificar_trechos(self):
+        for inicio, fim in ((0, 1), (0, 50), (13, 14), (333, 1000), (len(self.TEXTO) - 5, len(self.TEXTO))):
+            self.assertEqual(extrair_trecho(self.compactado, inicio, fim), self.TEXTO[inicio:fim])
+        self.assertEqual(extrair_trecho(self.compactado, 1500), self.TEXTO[1500:])
+        self.assertEqual(extrair_trecho(self.compactado, len(self.TEXTO) + 10), "")
+
+    def test_pontos_de_sincronizacao(self):
+        """Intervalos pequenos fazem os pontos caírem no meio de bytes."""
+        compactar(self.original, self.compactado, intervalo_sincronizacao=7)
+        self._verificar_trechos()
+
+    def test_sem_pontos_de_sincronizacao(self):
+        """Sem tabela de sincronização, o trecho é decodificado desde o início."""
+        compactar(self.original, self.compactado, intervalo_sincronizacao=0)
+        self._verificar_trechos()
+
+    def test_conteiner_de_blocos(self):
+        """No contêiner de blocos, apenas os blocos do intervalo são decodificados."""
+        compactar(self.original, self.compactado, tamanho_bloco=100, workers=1)
+        self._verificar_trechos()
+
+    def test_modo_bytes(self):
+        """No modo binário o intervalo é em bytes e o resultado é 'bytes'."""
+        dados = self.TEXTO.encode('utf-8')
+        compactar(self.original, self.compactado, modo='bytes', intervalo_sincronizacao=9)
+        self.assertEqual(extrair_trecho(self.compactado, 100, 250), dados[100:250])
+
+        compactar(self.original, self.compactado, modo='bytes', tamanho_bloco=64, workers=1)
+        self.assertEqual(extrair_trecho(self.compactado, 100, 250), dados[100:250])
+
+    def test_intervalo_invalido(self):
+        compactar(self.original, self.compactado)
+        with self.assertRaises(ValueError):
+            extrair_trecho(self.compactado, 10, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
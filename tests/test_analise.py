@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src.analise import EXTENSAO_CACHE, AnaliseArquivo
+from src.compressor import compactar, descompactar
+
+
+class TestAnalise(unittest.TestCase):
+    """Testes para a análise de arquivos com cache em memória e em disco."""
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.entrada = self._caminho("texto.txt")
+        with open(self.entrada, 'w', encoding='utf-8') as f:
+            f.write("análise sob demanda, com cache\n" * 2000)
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def _caminho(self, nome: str) -> str:
+        return os.path.join(self.diretorio.name, nome)
+
+    def test_compartilhada_com_compactacao(self):
+        analise = AnaliseArquivo(self.entrada)
+        self.assertFalse(analise.disponivel())
+        self.assertEqual(analise.modo_efetivo, 'texto')
+        self.assertEqual(analise.frequencias['a'], 8000)
+
+        # A compactação usa as frequências da análise e gera o mesmo arquivo
+        comum, com_analise = self._caminho("comum.huff"), self._caminho("analise.huff")
+        compactar(self.entrada, comum)
+        with mock.patch('src.analise.gerar_tabela_frequencias_modo') as contagem:
+            compactar(self.entrada, com_analise, analise=analise)
+            contagem.assert_not_called()
+        with open(comum, 'rb') as f_a, open(com_analise, 'rb') as f_b:
+            self.assertEqual(f_a.read(), f_b.read())
+
+        # Um arquivo alterado invalida a análise
+        with open(self.entrada, 'a', encoding='utf-8') as f:
+            f.write("zzz")
+        os.utime(self.entrada, ns=(0, 0))
+        self.assertFalse(analise.disponivel())
+        self.assertEqual(analise.frequencias['z'], 3)
+        with self.assertRaises(ValueError):
+            compactar(comum, com_analise, analise=analise)
+
+    def test_cache_em_disco(self):
+        cache = self._caminho("cache")
+        compactado, saida = self._caminho("texto.huff"), self._caminho("texto.out")
+        compactar(self.entrada, compactado, cache=cache)
+        self.assertEqual(len([n for n in os.listdir(cache) if n.endswith(EXTENSAO_CACHE)]), 1)
+
+        # Outra análise (como a de outro processo) lê as frequências do disco
+        with mock.patch('src.analise.gerar_tabela_frequencias_modo') as contagem:
+            self.assertTrue(AnaliseArquivo(self.entrada, 'auto', cache).disponivel())
+            compactar(self.entrada, compactado, cache=cache)
+            contagem.assert_not_called()
+        descompactar(compactado, saida)
+        with open(self.entrada, 'rb') as f_a, open(saida, 'rb') as f_b:
+            self.assertEqual(f_a.read(), f_b.read())
+
+        # Outro modo não reaproveita o cache; um cache ilegível é ignorado
+        self.assertFalse(AnaliseArquivo(self.entrada, 'bytes', cache).disponivel())
+        for nome in os.listdir(cache):
+            with open(os.path.join(cache, nome), 'w') as f:
+                f.write("{corrompido")
+        analise = AnaliseArquivo(self.entrada, 'auto', cache)
+        self.assertFalse(analise.disponivel())
+        self.assertEqual(analise.frequencias['a'], 8000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import asyncio
+import io
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src.assincrono import ServicoCompactacao
+from src.fluxo import descompactar_fluxo
+
+
+class _Escritor:
+    """Substituto mínimo de asyncio.StreamWriter que acumula os bytes escritos."""
+
+    def __init__(self):
+        self.dados = bytearray()
+
+    def write(self, dados):
+        self.dados += dados
+
+    async def drain(self):
+        await asyncio.sleep(0)
+
+
+def _leitor(dados: bytes) -> asyncio.StreamReader:
+    leitor = asyncio.StreamReader()
+    leitor.feed_data(dados)
+    leitor.feed_eof()
+    return leitor
+
+
+class TestAssincrono(unittest.IsolatedAsyncioTestCase):
+    """Testes para a API assíncrona."""
+
+    async def test_arquivos_em_paralelo(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminhos = []
+            for i in range(4):
+                caminho = os.path.join(diretorio, f"a{i}.txt")
+                with open(caminho, 'w', encoding='utf-8') as f:
+                    f.write(f"arquivo {i} com acentuação\n" * 300)
+                caminhos.append(caminho)
+
+            async with ServicoCompactacao(workers=1, max_pendentes=2) as servico:
+                await asyncio.gather(*(servico.compactar(c, c + ".huff") for c in caminhos))
+                await asyncio.gather(*(servico.descompactar(c + ".huff", c + ".out") for c in caminhos))
+                with self.assertRaises(FileNotFoundError):
+                    await servico.compactar(os.path.join(diretorio, "nao_existe"), caminhos[0] + ".x")
+
+            for caminho in caminhos:
+                with open(caminho, 'rb') as f_a, open(caminho + ".out", 'rb') as f_b:
+                    self.assertEqual(f_a.read(), f_b.read())
+
+    async def test_fluxo(self):
+        conteudo = b"GET /index.html 200\nPOST /api 500\n" * 2000
+        with ThreadPoolExecutor(2) as executor:
+            servico = ServicoCompactacao(executor=executor)
+            compactado = _Escritor()
+            self.assertEqual(await servico.compactar_fluxo(_leitor(conteudo), compactado), len(conteudo))
+            recuperado = _Escritor()
+            await servico.descompactar_fluxo(_leitor(bytes(compactado.dados)), recuperado)
+            self.assertEqual(bytes(recuperado.dados), conteudo)
+
+            # O formato é o mesmo do modo adaptativo síncrono
+            saida = io.BytesIO()
+            descompactar_fluxo(io.BytesIO(bytes(compactado.dados)), saida)
+            self.assertEqual(saida.getvalue(), conteudo)
+
+            with self.assertRaises(ValueError):
+                await servico.descompactar_fluxo(_leitor(bytes(compactado.dados[:-5])), _Escritor())
+
+
+if __name__ == '__main__':
+    unittest.main()
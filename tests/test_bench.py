@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+from benchmarks.suite import CORPORA, comparar, executar, gerar_corpus, interpretar_tamanho
+
+
+class TestSuiteBenchmarks(unittest.TestCase):
+    """Testes para o gerador de corpora e a detecção de regressões."""
+
+    def test_interpretar_tamanho(self):
+        self.assertEqual(interpretar_tamanho("1K"), 1024)
+        self.assertEqual(interpretar_tamanho("10M"), 10 << 20)
+        self.assertEqual(interpretar_tamanho("1gb"), 1 << 30)
+        self.assertEqual(interpretar_tamanho("500"), 500)
+
+    def test_corpora_tem_tamanho_exato(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, "corpus")
+            for nome in CORPORA:
+                gerar_corpus(nome, 3001, caminho)
+                self.assertEqual(os.path.getsize(caminho), 3001, nome)
+
+    def test_relatorio_e_regressoes(self):
+        relatorio = executar(['zipf'], [2048], memoria=False)
+        etapas = [r['etapa'] for r in relatorio['resultados']]
+        self.assertEqual(etapas, ['compactar', 'descompactar', 'construir_arvore', 'gerar_codigos'])
+        self.assertEqual(comparar(relatorio, relatorio), [])
+
+        pior = {'resultados': [dict(r) for r in relatorio['resultados']]}
+        pior['resultados'][0]['segundos'] += 1.0
+        pior['resultados'][0]['razao'] += 0.1
+        regressoes = comparar(pior, relatorio)
+        self.assertEqual(len(regressoes), 2)
+        self.assertTrue(all(r.startswith("zipf/2048/compactar") for r in regressoes))
+
+
+if __name__ == '__main__':
+    unittest.main()
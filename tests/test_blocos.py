@@ -0,0 +1,55 @@
+
+import unittest
+import os
+import tempfile
+from src.blocos import ler_indice
+from src.compressor import compactar, descompactar
+
+
+class TestContainerBlocos(unittest.TestCase):
+    """Testes para a compactação em blocos independentes."""
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.original = os.path.join(self.diretorio.name, "original.txt")
+        self.compactado = os.path.join(self.diretorio.name, "compactado.huff")
+        self.recuperado = os.path.join(self.diretorio.name, "recuperado.txt")
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def _ciclo(self, texto, **opcoes):
+        with open(self.original, 'w', encoding='utf-8') as f:
+            f.write(texto)
+        compactar(self.original, self.compactado, **opcoes)
+        descompactar(self.compactado, self.recuperado, workers=2)
+        with open(self.recuperado, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def test_ciclo_tabela_global_e_por_bloco(self):
+        """Os blocos devem ser reconstruídos na ordem, com tabela global ou própria."""
+        texto = "o algoritmo de huffman é um algoritmo de compressão. " * 40 + "zzzzzzzzzzzzzzzzzzzz"
+        for tabela_por_bloco in (False, True):
+            resultado = self._ciclo(texto, tamanho_bloco=64, workers=2, tabela_por_bloco=tabela_por_bloco)
+            self.assertEqual(resultado, texto)
+
+    def test_indice_de_blocos(self):
+        """O índice deve registrar a posição e a quantidade de caracteres de cada bloco."""
+        texto = "abracadabra" * 30
+        self._ciclo(texto, tamanho_bloco=100, workers=1)
+        with open(self.compactado, 'rb') as f:
+            comprimentos, indice, simbolos_bytes = ler_indice(f)
+
+        self.assertTrue(simbolos_bytes)
+        self.assertEqual(set(comprimentos), set(texto.encode('ascii')))
+        self.assertEqual([n_chars for _, n_chars, _ in indice], [100, 100, 100, 30])
+        for (posicao, _, n_bytes), (proxima, _, _) in zip(indice, indice[1:]):
+            self.assertEqual(posicao + n_bytes, proxima)
+
+    def test_arquivo_vazio(self):
+        """Um arquivo vazio gera um contêiner sem blocos."""
+        self.assertEqual(self._ciclo("", tamanho_bloco=10, workers=1), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
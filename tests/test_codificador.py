@@ -0,0 +1,40 @@
+
+import unittest
+from unittest import mock
+from src.frequencias import gerar_tabela_frequencias
+from src.huffman_tree import construir_arvore, gerar_codigos
+from src.codificador import CodificadorBits
+
+
+def _codificar_referencia(texto, codigos):
+    """Codificação caractere a caractere, equivalente à implementação original."""
+    bits = "".join(codigos[c] for c in texto)
+    bits = bits.ljust((len(bits) + 7) // 8 * 8, '0')
+    return int(bits, 2).to_bytes(len(bits) // 8, 'big') if bits else b''
+
+
+class TestCodificadorBits(unittest.TestCase):
+    """Testes para o empacotamento de bits em lote."""
+
+    def test_saida_identica_a_referencia(self):
+        """Os bytes gerados devem ser idênticos aos da codificação caractere a caractere."""
+        texto = "o algoritmo de huffman é um algoritmo de compressão de dados. " * 50
+        codigos = gerar_codigos(construir_arvore(gerar_tabela_frequencias(texto)))
+
+        # Lotes pequenos forçam bits remanescentes entre lotes
+        with mock.patch('src.codificador.TAMANHO_LOTE', 7):
+            codificador = CodificadorBits(codigos)
+            resultado = codificador.codificar(texto[:1000]) + codificador.codificar(texto[1000:])
+            resultado += codificador.finalizar()
+
+        self.assertEqual(resultado, _codificar_referencia(texto, codigos))
+
+    def test_finalizar_sem_bits_pendentes(self):
+        """Se os bits fecham um byte exato, finalizar não deve gerar padding."""
+        codificador = CodificadorBits({'a': '0', 'b': '1'})
+        self.assertEqual(codificador.codificar("abababab"), bytes([0b01010101]))
+        self.assertEqual(codificador.finalizar(), b'')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+from src.acesso import extrair_trecho
+from src.compressor import compactar, compactar_bytes, descompactar, descompactar_bytes
+from src.contexto import CodificadorContexto, construir_modelo, contar_pares, decodificar_contexto_fluxo
+
+
+def _texto_de_log(n_linhas: int) -> bytes:
+    rnd = random.Random(5)
+    niveis = ["INFO", "WARN", "ERROR", "DEBUG"]
+    caminhos = ["/api/usuarios", "/api/pedidos", "/login", "/static/app.js"]
+    return "".join(f"2024-05-{rnd.randint(1, 28):02d} {rnd.choice(niveis)} GET {rnd.choice(caminhos)} "
+                   f"status={rnd.choice([200, 200, 200, 404, 500])} ms={rnd.randint(1, 999)}\n"
+                   for _ in range(n_linhas)).encode('ascii')
+
+
+class TestContexto(unittest.TestCase):
+    """Testes para o modelo de contexto de ordem 1."""
+
+    def test_ciclo_em_memoria(self):
+        conteudos = [b'x', b'ab', b'a' * 5000, b'qu' * 300 + b'!', bytes(range(256)) * 4,
+                     bytes(random.Random(2).choices(range(256), k=20000)), _texto_de_log(500)]
+        for conteudo in conteudos:
+            modelo = construir_modelo(contar_pares([conteudo[:1000], conteudo[1000:]]))
+            codificador = CodificadorContexto(modelo.codigos)
+            dados = codificador.codificar(conteudo) + codificador.finalizar()
+            # Pedaços pequenos exercitam a troca de pedaço no meio de um código
+            for limiar in (0, len(conteudo) + 1):
+                # Janela longa e curta das tabelas de decodificação
+                pedacos = (dados[i:i + 3] for i in range(0, len(dados), 3))
+                with mock.patch('src.contexto.LIMIAR_JANELA_LONGA', limiar):
+                    self.assertEqual(b"".join(decodificar_contexto_fluxo(pedacos, modelo, len(conteudo))),
+                                     conteudo)
+            self.assertEqual(descompactar_bytes(compactar_bytes(conteudo, contexto=True)), conteudo)
+
+        # Um byte sempre seguido do mesmo usa código de comprimento 0
+        self.assertEqual(len(CodificadorContexto(construir_modelo(contar_pares([b'a' * 5000]))
+                                                 .codigos).codificar(b'a' * 5000)), 0)
+        with self.assertRaises(ValueError):
+            modelo = construir_modelo(contar_pares([conteudos[-1]]))
+            list(decodificar_contexto_fluxo([b'\x00' * 10], modelo, len(conteudos[-1])))
+
+    def test_razao_melhor_que_ordem_0(self):
+        conteudo = _texto_de_log(3000)
+        self.assertLess(len(compactar_bytes(conteudo, contexto=True)), 0.85 * len(compactar_bytes(conteudo)))
+
+    def test_arquivo(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            entrada, compactado, saida = (os.path.join(diretorio, nome) for nome in ("a.log", "a.huff", "a.out"))
+            conteudo = _texto_de_log(2000)
+            with open(entrada, 'wb') as f:
+                f.write(conteudo)
+            compactar(entrada, compactado, contexto=True)
+            descompactar(compactado, saida)
+            with open(saida, 'rb') as f:
+                self.assertEqual(f.read(), conteudo)
+            self.assertEqual(extrair_trecho(compactado, 5000, 5100), conteudo[5000:5100])
+
+            # Arquivo vazio
+            open(entrada, 'wb').close()
+            compactar(entrada, compactado, contexto=True)
+            self.assertEqual(os.path.getsize(compactado), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
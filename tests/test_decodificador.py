@@ -0,0 +1,54 @@
+
+import unittest
+from src.frequencias import gerar_tabela_frequencias
+from src.huffman_tree import construir_arvore, gerar_codigos
+from src.decodificador import decodificar_arvore, decodificar_tabela, decodificar_tabela_fluxo
+
+
+def _codificar(texto, codigos):
+    """Empacota os códigos do texto em bytes, completando o último byte com zeros."""
+    bits = "".join(codigos[c] for c in texto)
+    bits = bits.ljust((len(bits) + 7) // 8 * 8, '0')
+    return int(bits, 2).to_bytes(len(bits) // 8, 'big') if bits else b''
+
+
+class TestDecodificadorTabela(unittest.TestCase):
+    """Testes para o decodificador multi-bit baseado em tabela."""
+
+    def test_mesma_saida_que_percurso_na_arvore(self):
+        """A tabela deve produzir exatamente o mesmo texto que o percurso bit a bit."""
+        texto = "o algoritmo de huffman é um algoritmo de compressão de dados."
+        raiz = construir_arvore(gerar_tabela_frequencias(texto))
+        dados = _codificar(texto, gerar_codigos(raiz))
+
+        for largura in (1, 3, 8, 12):
+            resultado = decodificar_tabela(dados, raiz, len(texto), largura)
+            self.assertEqual(resultado, texto)
+        self.assertEqual(decodificar_arvore(dados, raiz, len(texto)), texto)
+
+    def test_codigos_maiores_que_a_largura(self):
+        """Códigos mais longos que a janela devem ser completados bit a bit."""
+        # Frequências de Fibonacci geram uma árvore degenerada com códigos longos
+        frequencias = {chr(ord('a') + i): f for i, f in enumerate([1, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144])}
+        texto = "".join(char * freq for char, freq in frequencias.items())
+        raiz = construir_arvore(frequencias)
+        codigos = gerar_codigos(raiz)
+        self.assertGreater(max(len(c) for c in codigos.values()), 8)
+
+        dados = _codificar(texto, codigos)
+        self.assertEqual(decodificar_tabela(dados, raiz, len(texto), 4), texto)
+
+    def test_decodificacao_em_pedacos(self):
+        """Dados entregues em pedaços de 1 byte devem gerar o mesmo texto."""
+        frequencias = {chr(ord('a') + i): f for i, f in enumerate([1, 1, 2, 3, 5, 8, 13, 21, 34, 55])}
+        texto = "".join(char * freq for char, freq in frequencias.items())
+        raiz = construir_arvore(frequencias)
+        dados = _codificar(texto, gerar_codigos(raiz))
+
+        pedacos = [dados[i:i + 1] for i in range(len(dados))]
+        resultado = "".join(decodificar_tabela_fluxo(pedacos, raiz, len(texto), 4))
+        self.assertEqual(resultado, texto)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from src import dicionario
+from src.acesso import extrair_trecho
+from src.compressor import compactar, descompactar
+from src.dicionario import buscar_tabela, carregar_tabela, salvar_tabela, treinar_tabela
+
+
+class TestDicionario(unittest.TestCase):
+    """Testes para as tabelas de códigos treinadas."""
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.amostras = []
+        for i in range(5):
+            caminho = self._caminho(f"amostra{i}.json")
+            with open(caminho, 'wb') as f:
+                f.write(b'{"id": %d, "nome": "usuario%d", "ativo": true}\n' % (i, i))
+            self.amostras.append(caminho)
+        self.caminho_tabela = self._caminho("json.hufft")
+        dicionario._cache.clear()
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+        dicionario._cache.clear()
+
+    def _caminho(self, nome):
+        return os.path.join(self.diretorio.name, nome)
+
+    def test_ciclo_com_tabela_treinada(self):
+        salvar_tabela(treinar_tabela(self.amostras), self.caminho_tabela)
+        dicionario._cache.clear()
+
+        # Bytes ausentes da amostra também precisam ser codificáveis
+        conteudos = [b'{"id": 42, "nome": "outro", "ativo": false}\n', bytes(range(256)), b'']
+        for i, conteudo in enumerate(conteudos):
+            entrada, compactado, saida = (self._caminho(f"x{i}{sufixo}") for sufixo in ('', '.huff', '.out'))
+            with open(entrada, 'wb') as f:
+                f.write(conteudo)
+            compactar(entrada, compactado, tabela=self.caminho_tabela)
+            descompactar(compactado, saida, tabelas=[self.caminho_tabela])
+            with open(saida, 'rb') as f:
+                self.assertEqual(f.read(), conteudo)
+
+        # O cabeçalho não traz tabela: o arquivo pequeno fica menor que o original
+        self.assertLess(os.path.getsize(self._caminho("x0.huff")), len(conteudos[0]))
+        self.assertEqual(extrair_trecho(self._caminho("x0.huff"), 1, 5), conteudos[0][1:5])
+
+    def test_tabela_desconhecida(self):
+        tabela = treinar_tabela(self.amostras)
+        compactar(self.amostras[0], self._caminho("a.huff"), tabela=tabela)
+        dicionario._cache.clear()
+        with self.assertRaises(ValueError):
+            descompactar(self._caminho("a.huff"), self._caminho("a.out"))
+
+        # O carregamento reaproveita a tabela em cache enquanto o arquivo não muda
+        salvar_tabela(tabela, self.caminho_tabela)
+        carregada = carregar_tabela(self.caminho_tabela)
+        self.assertIs(carregar_tabela(self.caminho_tabela), carregada)
+        self.assertIs(buscar_tabela(tabela.identificador), carregada)
+        self.assertEqual(carregada.comprimentos, tabela.comprimentos)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import io
+import json
+import unittest
+from src.exibicao import (arvore_para_dict, exportar_arvore, exportar_codigos, formatar_arvore, formatar_codigos,
+                          formatar_frequencias, formatar_simbolo)
+from src.huffman_tree import construir_arvore, gerar_codigos
+
+
+class TestExibicao(unittest.TestCase):
+    """Testes para a exibição limitada e a exportação da tabela, da árvore e dos códigos."""
+
+    def setUp(self):
+        # Alfabeto grande: 3000 símbolos com frequências distintas
+        self.frequencias = {chr(0x4E00 + i): i + 1 for i in range(3000)}
+        self.raiz = construir_arvore(self.frequencias)
+
+    def test_tabelas_paginadas(self):
+        texto = formatar_frequencias(self.frequencias, limite=3)
+        linhas = texto.splitlines()
+        self.assertEqual(linhas[3:6], [f"{chr(0x4E00 + 2999):<9} | 3000", f"{chr(0x4E00 + 2998):<9} | 2999",
+                                       f"{chr(0x4E00 + 2997):<9} | 2998"])
+        self.assertIn("(símbolos 1 a 3 de 3000)", texto)
+        self.assertIn("(símbolos 11 a 15 de 3000)", formatar_frequencias(self.frequencias, 10, 5))
+        # Sem limite, todos os símbolos e nenhum rodapé de página
+        self.assertEqual(len(formatar_codigos(gerar_codigos(self.raiz)).splitlines()), 3000 + 3)
+        self.assertEqual(formatar_codigos({' ': '0', '\n': '1'}).splitlines()[2:4], ["\\n        | 1", "' '       | 0"])
+        self.assertEqual(formatar_simbolo(200), "\\xc8")
+
+    def test_arvore_limitada(self):
+        completa = formatar_arvore(self.raiz)
+        self.assertEqual(completa.count("'"), 2 * 3000)
+        limitada = formatar_arvore(self.raiz, profundidade_maxima=2)
+        linhas = limitada.splitlines()
+        self.assertEqual(len(linhas), 7)
+        # Os nós recolhidos somam todas as folhas
+        self.assertEqual(sum(int(linha.split("[+ ")[1].split()[0]) for linha in linhas if "[+" in linha), 3000)
+        self.assertEqual(formatar_arvore(None), "")
+
+    def test_exportacao(self):
+        saida = io.StringIO()
+        exportar_arvore(self.raiz, saida, 'json')
+        arvore = json.loads(saida.getvalue())
+        self.assertEqual(arvore, arvore_para_dict(self.raiz))
+        self.assertEqual(arvore['freq'], sum(self.frequencias.values()))
+
+        saida = io.StringIO()
+        exportar_arvore(construir_arvore({'"': 2, '\\': 1, 'a': 1}), saida, 'dot')
+        dot = saida.getvalue()
+        self.assertTrue(dot.startswith("digraph huffman {"))
+        self.assertEqual(dot.count(" -> "), 4)
+        self.assertIn('label="\'\\"\' (2)"', dot)
+        with self.assertRaises(ValueError):
+            exportar_arvore(self.raiz, io.StringIO(), 'svg')
+
+        saida = io.StringIO()
+        exportar_codigos({'a': '0', 'b': '10'}, saida, {'a': 5, 'b': 2})
+        self.assertEqual(json.loads(saida.getvalue()), [{'simbolo': 'a', 'codigo': '0', 'bits': 1, 'freq': 5},
+                                                        {'simbolo': 'b', 'codigo': '10', 'bits': 2, 'freq': 2}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import io
+import os
+import random
+import tempfile
+import unittest
+from src.compressor import compactar, descompactar
+from src.fluxo import TAMANHO_QUADRO_INICIAL, Compactador, Descompactador, compactar_fluxo, descompactar_fluxo
+
+
+class TestFluxo(unittest.TestCase):
+    """Testes para o modo adaptativo em uma passada."""
+
+    def test_ciclo_em_memoria(self):
+        rnd = random.Random(3)
+        conteudos = [b'', b'a', bytes(range(256)) * 3,
+                     bytes(rnd.choices(b"ERROR WARN INFO 0123456789\n", k=5 * TAMANHO_QUADRO_INICIAL))]
+        for conteudo in conteudos:
+            saida = io.BytesIO()
+            self.assertEqual(compactar_fluxo(io.BytesIO(conteudo), saida), len(conteudo))
+            recuperado = io.BytesIO()
+            descompactar_fluxo(io.BytesIO(saida.getvalue()), recuperado)
+            self.assertEqual(recuperado.getvalue(), conteudo)
+
+        # O modelo se adapta: o texto repetitivo fica bem menor que o original
+        self.assertLess(len(saida.getvalue()), 0.7 * len(conteudos[-1]))
+        with self.assertRaises(ValueError):
+            descompactar_fluxo(io.BytesIO(saida.getvalue()[:-10]), io.BytesIO())
+
+    def test_compactador_incremental(self):
+        conteudo = b"evento=login usuario=ana\n" * 3000
+        compactador = Compactador()
+        # Pedaços de tamanhos irregulares, com esvaziamentos no meio
+        partes = []
+        for i in range(0, len(conteudo), 777):
+            partes.append(compactador.alimentar(conteudo[i:i + 777]))
+            if i % 7 == 0:
+                partes.append(compactador.esvaziar())
+        compactado = b"".join(partes) + compactador.finalizar() + b"resto"
+
+        descompactador = Descompactador()
+        recuperado = b"".join(descompactador.alimentar(compactado[i:i + 5]) for i in range(0, len(compactado), 5))
+        descompactador.finalizar()
+        self.assertEqual(recuperado, conteudo)
+        self.assertEqual(descompactador.sobra, b"resto")
+
+        with self.assertRaises(ValueError):
+            Descompactador().alimentar(b"HUFF\x02")
+
+    def test_compactar_adaptativo_em_arquivo(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            entrada, compactado, saida = (os.path.join(diretorio, nome) for nome in ("e.log", "e.huff", "e.out"))
+            conteudo = "linha de log número 1\n".encode('utf-8') * 2000
+            with open(entrada, 'wb') as f:
+                f.write(conteudo)
+            compactar(entrada, compactado, adaptativo=True)
+            # descompactar reconhece o formato adaptativo pela versão
+            descompactar(compactado, saida)
+            with open(saida, 'rb') as f:
+                self.assertEqual(f.read(), conteudo)
+
+
+if __name__ == '__main__':
+    unittest.main()
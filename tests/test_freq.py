@@ -1,6 +1,8 @@
 
+import os
+import tempfile
 import unittest
-from src.frequencias import gerar_tabela_frequencias
+from src.frequencias import gerar_tabela_frequencias, gerar_tabela_frequencias_arquivo, gerar_tabela_frequencias_bytes
 
 class TestFrequencias(unittest.TestCase):
 
@@ -28,6 +30,38 @@ class TestFrequencias(unittest.TestCase):
         resultado = gerar_tabela_frequencias(texto)
         self.assertEqual(resultado, esperado)
 
+    def test_tabela_de_arquivo_em_blocos(self):
+        """A contagem em blocos deve coincidir com a contagem do texto inteiro, inclusive na ordem."""
+        texto = "banana bandada ação 中文 " * 20
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8') as f:
+            f.write(texto)
+        try:
+            resultado = gerar_tabela_frequencias_arquivo(f.name, tamanho_bloco=3)
+        finally:
+            os.remove(f.name)
+
+        esperado = gerar_tabela_frequencias(texto)
+        self.assertEqual(resultado, esperado)
+        self.assertEqual(list(resultado), list(esperado))
+
+    def test_contagem_paralela(self):
+        """A contagem em vários processos deve coincidir com a sequencial, inclusive com '\\r\\n' e multibyte."""
+        texto = "linha ação\r\n中文 😀\rfim\n" * 50
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8', newline='') as f:
+            f.write(texto)
+        try:
+            sequencial = gerar_tabela_frequencias_arquivo(f.name, workers=1)
+            paralela = gerar_tabela_frequencias_arquivo(f.name, tamanho_bloco=7, workers=3)
+            bytes_sequencial = gerar_tabela_frequencias_bytes(f.name, workers=1)
+            bytes_paralela = gerar_tabela_frequencias_bytes(f.name, tamanho_bloco=7, workers=3)
+        finally:
+            os.remove(f.name)
+
+        self.assertEqual(paralela, sequencial)
+        self.assertEqual(list(paralela), list(sequencial))
+        self.assertEqual(bytes_paralela, bytes_sequencial)
+        self.assertEqual(bytes_sequencial, gerar_tabela_frequencias(texto.encode('utf-8')))
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -1,10 +1,14 @@
 
 import unittest
+import json
 import os
 import tempfile
+from unittest import mock
 from src.frequencias import gerar_tabela_frequencias
-from src.huffman_tree import construir_arvore, gerar_codigos
-from src.compressor import compactar, descompactar
+from src.huffman_tree import (calcular_comprimentos, construir_arvore, construir_arvore_canonica,
+                              construir_arvore_duas_filas, gerar_codigos, gerar_codigos_canonicos,
+                              gerar_comprimentos, gerar_comprimentos_limitados)
+from src.compressor import compactar, compactar_bytes, descompactar, descompactar_bytes
 
 class TestHuffmanTree(unittest.TestCase):
     """Testes para a lógica de construção da árvore e geração de códigos."""
@@ -35,6 +39,62 @@ class TestHuffmanTree(unittest.TestCase):
         codigos = gerar_codigos(raiz)
         self.assertEqual(codigos['a'], "0")
 
+    def test_codigos_canonicos(self):
+        """Os códigos canônicos preservam os comprimentos e são reconstruídos pela árvore canônica."""
+        frequencias = {'a': 10, 'b': 5, 'c': 2, 'd': 1, 'e': 1}
+        comprimentos = gerar_comprimentos(construir_arvore(frequencias))
+        codigos = gerar_codigos_canonicos(comprimentos)
+
+        self.assertEqual({c: len(codigo) for c, codigo in codigos.items()}, comprimentos)
+        self.assertEqual(codigos['a'], "0")
+        # Mesmo comprimento: códigos consecutivos em ordem alfabética
+        self.assertEqual(int(codigos['e'], 2), int(codigos['d'], 2) + 1)
+
+        # A árvore reconstruída só a partir dos comprimentos gera os mesmos códigos
+        self.assertEqual(gerar_codigos(construir_arvore_canonica(comprimentos)), codigos)
+
+    def test_desempate_deterministico(self):
+        """A árvore depende só das contagens, não da ordem dos símbolos na tabela."""
+        frequencias = {'x': 3, 'a': 1, 'm': 1, 'b': 1, 'z': 3, 'c': 2}
+        invertida = dict(reversed(list(frequencias.items())))
+        self.assertEqual(gerar_codigos(construir_arvore(frequencias)), gerar_codigos(construir_arvore(invertida)))
+
+    def test_duas_filas_igual_ao_heap(self):
+        """O construtor de duas filas produz exatamente a mesma árvore que o heap."""
+        frequencias = gerar_tabela_frequencias("abracadabra, banana bandada e coração " * 3)
+        self.assertEqual(gerar_codigos(construir_arvore_duas_filas(frequencias)),
+                         gerar_codigos(construir_arvore(frequencias)))
+        self.assertEqual(gerar_codigos(construir_arvore_duas_filas({'a': 4})), {'a': "0"})
+        self.assertIsNone(construir_arvore_duas_filas({}))
+
+    def test_comprimentos_limitados(self):
+        """O package-merge respeita o limite, gera um código completo e é ótimo."""
+        # Frequências de Fibonacci: o código de Huffman tem profundidade n - 1
+        frequencias = {chr(ord('a') + i): f for i, f in enumerate([1, 1, 2, 3, 5, 8, 13, 21, 34, 55])}
+        livres = calcular_comprimentos(frequencias)
+        self.assertEqual(max(livres.values()), 9)
+        # Sem restrição efetiva, o resultado tem o mesmo custo do Huffman
+        custo = lambda comprimentos: sum(frequencias[c] * n for c, n in comprimentos.items())
+        self.assertEqual(custo(gerar_comprimentos_limitados(frequencias, 9)), custo(livres))
+
+        limitados = calcular_comprimentos(frequencias, comprimento_maximo=4)
+        self.assertLessEqual(max(limitados.values()), 4)
+        self.assertEqual(sum(2 ** -n for n in limitados.values()), 1.0)
+        # Custo ótimo com limite 4 (verificado por busca exaustiva)
+        self.assertEqual(custo(limitados), 394)
+        self.assertEqual(set(gerar_codigos(construir_arvore_canonica(limitados)).values()),
+                         set(gerar_codigos_canonicos(limitados).values()))
+
+        with self.assertRaises(ValueError):
+            gerar_comprimentos_limitados(frequencias, 3)
+
+    def test_arvore_profunda_sem_recursao(self):
+        """Árvores mais profundas que o limite de recursão são percorridas normalmente."""
+        frequencias = {i: 1 << i for i in range(1500)}
+        comprimentos = gerar_comprimentos(construir_arvore(frequencias))
+        self.assertEqual(max(comprimentos.values()), 1499)
+        self.assertEqual(gerar_codigos(construir_arvore_canonica(comprimentos)), gerar_codigos_canonicos(comprimentos))
+
 
 class TestCompressorIntegration(unittest.TestCase):
     """Teste de integração para o ciclo completo de compactar e descompactar."""
@@ -92,6 +152,112 @@ class TestCompressorIntegration(unittest.TestCase):
 
         self.assertEqual(texto_original, texto_recuperado)
 
+    def test_descompactar_formato_json_antigo(self):
+        """Arquivos no formato antigo (cabeçalho JSON com frequências) continuam legíveis."""
+        texto_original = "banana bandada"
+        frequencias = gerar_tabela_frequencias(texto_original)
+        codigos = gerar_codigos(construir_arvore(frequencias))
+        bits = "".join(codigos[c] for c in texto_original)
+        bits = bits.ljust((len(bits) + 7) // 8 * 8, '0')
+
+        cabecalho = json.dumps({'frequencias': frequencias, 'total_chars': len(texto_original)}).encode('utf-8')
+        self.arquivo_compactado.write(len(cabecalho).to_bytes(4, 'big') + cabecalho)
+        self.arquivo_compactado.write(int(bits, 2).to_bytes(len(bits) // 8, 'big'))
+        self.arquivo_compactado.flush()
+
+        descompactar(self.arquivo_compactado.name, self.arquivo_recuperado.name)
+
+        self.arquivo_recuperado.seek(0)
+        self.assertEqual(self.arquivo_recuperado.read(), texto_original)
+
+    def test_ciclo_um_caractere_e_unicode(self):
+        """Testa o ciclo com um único caractere repetido e com um alfabeto Unicode variado."""
+        for texto_original in ("aaaaaaaaaa", "ação 中文 ünïcødé 😀 " * 30):
+            with open(self.arquivo_original.name, 'w', encoding='utf-8') as f:
+                f.write(texto_original)
+
+            compactar(self.arquivo_original.name, self.arquivo_compactado.name)
+            descompactar(self.arquivo_compactado.name, self.arquivo_recuperado.name)
+
+            with open(self.arquivo_recuperado.name, 'r', encoding='utf-8') as f:
+                self.assertEqual(f.read(), texto_original)
+
+    def test_ciclo_binario(self):
+        """Arquivos binários (UTF-8 inválido) são compactados no modo de bytes, sem perdas."""
+        dados_originais = bytes(range(256)) * 3 + b"\xff\xfe\x00\r\n" * 50
+        for modo in ('auto', 'bytes'):
+            with open(self.arquivo_original.name, 'wb') as f:
+                f.write(dados_originais)
+
+            compactar(self.arquivo_original.name, self.arquivo_compactado.name, modo=modo)
+            descompactar(self.arquivo_compactado.name, self.arquivo_recuperado.name)
+
+            with open(self.arquivo_recuperado.name, 'rb') as f:
+                self.assertEqual(f.read(), dados_originais)
+
+    def test_modos_texto_e_bytes_equivalentes(self):
+        """Um texto UTF-8 é recuperado igual tanto no modo de texto quanto no de bytes."""
+        texto_original = "ação, coração e emoção\n" * 20
+        for modo in ('texto', 'bytes', 'auto'):
+            with open(self.arquivo_original.name, 'w', encoding='utf-8') as f:
+                f.write(texto_original)
+
+            compactar(self.arquivo_original.name, self.arquivo_compactado.name, modo=modo)
+            descompactar(self.arquivo_compactado.name, self.arquivo_recuperado.name)
+
+            with open(self.arquivo_recuperado.name, 'r', encoding='utf-8') as f:
+                self.assertEqual(f.read(), texto_original)
+
+    def test_leitura_mapeada_e_em_pedacos_equivalentes(self):
+        """Com ou sem mmap (ex: sistema sem suporte), o arquivo compactado e o recuperado são os mesmos."""
+        dados_originais = bytes(range(256)) * 40 + b"\x00\x01" * 3000
+        with open(self.arquivo_original.name, 'wb') as f:
+            f.write(dados_originais)
+
+        compactar(self.arquivo_original.name, self.arquivo_compactado.name, modo='bytes')
+        with open(self.arquivo_compactado.name, 'rb') as f:
+            compactado_mapeado = f.read()
+        with mock.patch('src.compressor._mapear', return_value=None):
+            compactar(self.arquivo_original.name, self.arquivo_compactado.name, modo='bytes')
+            descompactar(self.arquivo_compactado.name, self.arquivo_recuperado.name)
+        with open(self.arquivo_compactado.name, 'rb') as f:
+            self.assertEqual(f.read(), compactado_mapeado)
+        with open(self.arquivo_recuperado.name, 'rb') as f:
+            self.assertEqual(f.read(), dados_originais)
+
+        for decodificador in ('tabela', 'arvore'):
+            descompactar(self.arquivo_compactado.name, self.arquivo_recuperado.name, decodificador)
+            with open(self.arquivo_recuperado.name, 'rb') as f:
+                self.assertEqual(f.read(), dados_originais)
+
+    def test_ciclo_comprimento_maximo(self):
+        """Códigos limitados continuam decodificáveis, com qualquer construtor."""
+        # Frequências muito desiguais: sem limite, o código mais longo passa de 4 bits
+        texto_original = "".join(c * (2 ** i) for i, c in enumerate("abcdefghij"))
+        with open(self.arquivo_original.name, 'w', encoding='utf-8') as f:
+            f.write(texto_original)
+        for construtor in ('heap', 'duas_filas'):
+            compactar(self.arquivo_original.name, self.arquivo_compactado.name,
+                      construtor=construtor, comprimento_maximo=4)
+            descompactar(self.arquivo_compactado.name, self.arquivo_recuperado.name)
+
+            with open(self.arquivo_recuperado.name, 'r', encoding='utf-8') as f:
+                self.assertEqual(f.read(), texto_original)
+
+    def test_ciclo_em_memoria(self):
+        """compactar_bytes gera o mesmo .huff que compactar, sem passar pelo disco."""
+        for dados_originais, modo in ((bytes(range(256)) * 5 + b"\x00" * 900, 'bytes'),
+                                      ("memória sem arquivos\n" * 40, 'texto'), ("zzzz", 'texto')):
+            compactado = compactar_bytes(dados_originais)
+            self.assertEqual(descompactar_bytes(compactado), dados_originais)
+
+            with open(self.arquivo_original.name, 'wb') as f:
+                f.write(dados_originais if modo == 'bytes' else dados_originais.encode('utf-8'))
+            compactar(self.arquivo_original.name, self.arquivo_compactado.name, modo=modo)
+            with open(self.arquivo_compactado.name, 'rb') as f:
+                self.assertEqual(f.read(), compactado)
+        self.assertEqual(compactar_bytes(b""), b"")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,105 @@
+import io
+import os
+import random
+import tempfile
+import unittest
+from src.compressor import compactar, compactar_bytes, descompactar, descompactar_bytes
+from src.fluxo import descompactar_fluxo
+from src.integridade import TAMANHO_PEDACO_VERIFICACAO, verificar_arquivo
+
+
+class TestIntegridade(unittest.TestCase):
+    """Testes para os CRC32 de verificação de integridade."""
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        rnd = random.Random(7)
+        # Quase incompressível: mais de um pedaço de verificação depois de compactado
+        self.conteudo = bytes(rnd.choices(range(256), k=TAMANHO_PEDACO_VERIFICACAO + 50000))
+        self.entrada = self._caminho("dados.bin")
+        with open(self.entrada, 'wb') as f:
+            f.write(self.conteudo)
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def _caminho(self, nome: str) -> str:
+        return os.path.join(self.diretorio.name, nome)
+
+    def _corromper(self, caminho: str, posicao: int):
+        with open(caminho, 'r+b') as f:
+            f.seek(posicao)
+            byte = f.read(1)
+            f.seek(posicao)
+            f.write(bytes([byte[0] ^ 0x10]))
+
+    def test_arquivo_corrompido(self):
+        compactado, saida = self._caminho("dados.huff"), self._caminho("dados.out")
+        compactar(self.entrada, compactado, modo='bytes')
+        self.assertEqual(verificar_arquivo(compactado)['verificavel'], True)
+        descompactar(compactado, saida)
+        with open(saida, 'rb') as f:
+            self.assertEqual(f.read(), self.conteudo)
+
+        # Um bit trocado no segundo pedaço é apontado pela verificação e pela descompactação
+        self._corromper(compactado, TAMANHO_PEDACO_VERIFICACAO + 100)
+        with self.assertRaisesRegex(ValueError, "pedaço 1"):
+            verificar_arquivo(compactado)
+        with self.assertRaisesRegex(ValueError, "pedaço 1"):
+            descompactar(compactado, saida)
+
+    def test_arquivo_truncado(self):
+        compactado = self._caminho("dados.huff")
+        compactar(self.entrada, compactado, modo='bytes', intervalo_sincronizacao=0)
+        with open(compactado, 'rb') as f:
+            dados = f.read()
+        with open(compactado, 'wb') as f:
+            f.write(dados[:len(dados) // 2])
+        with self.assertRaises(ValueError):
+            verificar_arquivo(compactado)
+        with self.assertRaises(ValueError):
+            descompactar(compactado, self._caminho("dados.out"))
+        with self.assertRaises(ValueError):
+            descompactar_bytes(dados[:-3])
+
+    def test_outros_formatos(self):
+        texto = self._caminho("texto.txt")
+        with open(texto, 'w', encoding='utf-8') as f:
+            f.write("verificação de integridade\n" * 5000)
+        for nome, opcoes in (("sync", {}), ("blocos", {'tamanho_bloco': 20000, 'workers': 1}),
+                             ("fluxo", {'adaptativo': True})):
+            compactado, saida = self._caminho(nome + ".huff"), self._caminho(nome + ".out")
+            compactar(texto, compactado, **opcoes)
+            self.assertTrue(verificar_arquivo(compactado)['verificavel'])
+            descompactar(compactado, saida)
+            with open(texto, 'rb') as f_a, open(saida, 'rb') as f_b:
+                self.assertEqual(f_a.read(), f_b.read())
+
+            self._corromper(compactado, os.path.getsize(compactado) // 2)
+            with self.assertRaises(ValueError):
+                verificar_arquivo(compactado)
+            with self.assertRaises(ValueError):
+                descompactar(compactado, saida)
+
+    def test_sem_verificacao(self):
+        # Arquivos sem o rodapé continuam legíveis, mas não são verificáveis
+        compactado = compactar_bytes(self.conteudo[:1000], verificacao=False)
+        self.assertEqual(descompactar_bytes(compactado), self.conteudo[:1000])
+        self.assertLess(len(compactado), len(compactar_bytes(self.conteudo[:1000])))
+
+        caminho = self._caminho("sem.huff")
+        compactar(self.entrada, caminho, verificacao=False)
+        self.assertEqual(verificar_arquivo(caminho), {'versao': 5, 'verificavel': False, 'bytes_verificados': 0})
+
+    def test_fluxo_corrompido(self):
+        compactado = self._caminho("fluxo.huff")
+        compactar(self.entrada, compactado, adaptativo=True)
+        with open(compactado, 'rb') as f:
+            dados = bytearray(f.read())
+        dados[len(dados) // 3] ^= 0x01
+        with self.assertRaisesRegex(ValueError, "CRC32"):
+            descompactar_fluxo(io.BytesIO(bytes(dados)), io.BytesIO())
+
+
+if __name__ == '__main__':
+    unittest.main()
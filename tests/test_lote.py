@@ -0,0 +1,62 @@
+
+import unittest
+import io
+import json
+import os
+import tempfile
+from src.lote import SAIDA_FALHA, SAIDA_OK, executar_lote
+
+
+class TestLote(unittest.TestCase):
+    """Testes para o processamento não interativo de vários arquivos."""
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.entrada = os.path.join(self.diretorio.name, "entrada")
+        os.makedirs(self.entrada)
+        self.conteudos = {
+            "a.txt": "banana bandada".encode('utf-8'),
+            "b.txt": "ação e coração\n".encode('utf-8') * 10,
+            "c.bin": bytes(range(256)),
+        }
+        for nome, conteudo in self.conteudos.items():
+            with open(os.path.join(self.entrada, nome), 'wb') as f:
+                f.write(conteudo)
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def _executar(self, comando, padroes, diretorio_saida=None, jobs=1):
+        saida = io.StringIO()
+        codigo = executar_lote(comando, padroes, diretorio_saida, jobs, saida=saida)
+        return codigo, [json.loads(linha) for linha in saida.getvalue().splitlines()]
+
+    def test_compactar_e_descompactar_lote(self):
+        """Os arquivos do glob são compactados e recuperados no diretório de saída."""
+        compactados = os.path.join(self.diretorio.name, "compactados")
+        recuperados = os.path.join(self.diretorio.name, "recuperados")
+
+        codigo, resultados = self._executar('compress', [os.path.join(self.entrada, "*")], compactados, jobs=2)
+        self.assertEqual(codigo, SAIDA_OK)
+        self.assertEqual([os.path.basename(r['saida']) for r in resultados], ["a.txt.huff", "b.txt.huff", "c.bin.huff"])
+        self.assertTrue(all(r['ok'] and 'razao' in r and 'segundos' in r for r in resultados))
+
+        codigo, _ = self._executar('decompress', [os.path.join(compactados, "*.huff")], recuperados)
+        self.assertEqual(codigo, SAIDA_OK)
+        for nome, conteudo in self.conteudos.items():
+            with open(os.path.join(recuperados, nome), 'rb') as f:
+                self.assertEqual(f.read(), conteudo)
+
+    def test_falha_em_um_arquivo(self):
+        """Um arquivo inexistente gera uma linha com erro e código de saída de falha."""
+        inexistente = os.path.join(self.entrada, "nao_existe.txt")
+        codigo, resultados = self._executar('stats', [os.path.join(self.entrada, "a.txt"), inexistente])
+        self.assertEqual(codigo, SAIDA_FALHA)
+        self.assertTrue(resultados[0]['ok'])
+        self.assertEqual(resultados[0]['total_simbolos'], len(self.conteudos["a.txt"]))
+        self.assertFalse(resultados[1]['ok'])
+        self.assertIn('FileNotFoundError', resultados[1]['erro'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from src.compressor import compactar, descompactar
+from src.metricas import EVENTO_FIM, EVENTO_PROGRESSO, Metricas
+
+
+class TestMetricas(unittest.TestCase):
+    """Testes para a coleta de métricas por etapa."""
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.entrada = os.path.join(self.diretorio.name, "entrada.txt")
+        self.compactado = os.path.join(self.diretorio.name, "entrada.huff")
+        self.saida = os.path.join(self.diretorio.name, "saida.txt")
+        with open(self.entrada, 'w', encoding='utf-8') as f:
+            f.write("ação e coração, banana bandada\n" * 500)
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def test_etapas_e_progresso(self):
+        eventos = []
+        metricas = Metricas([lambda evento, m: eventos.append((evento, m.percentual))])
+        compactar(self.entrada, self.compactado, metricas=metricas)
+
+        self.assertEqual(set(metricas.etapas),
+                         {'frequencias', 'arvore', 'codigos', 'codificacao', 'leitura', 'escrita'})
+        # Os tempos das etapas são exclusivos: a soma não passa do total
+        self.assertLessEqual(sum(metricas.etapas.values()), metricas.segundos + 1e-6)
+        self.assertEqual(metricas.bytes_entrada, os.path.getsize(self.entrada))
+        self.assertEqual(metricas.bytes_saida, os.path.getsize(self.compactado))
+        self.assertEqual(metricas.simbolos, 500 * 31)
+
+        progresso = [p for evento, p in eventos if evento == EVENTO_PROGRESSO]
+        self.assertEqual(progresso, sorted(progresso))
+        self.assertEqual(eventos[-1], (EVENTO_FIM, 100.0))
+
+    def test_descompactar_exporta_json(self):
+        compactar(self.entrada, self.compactado)
+        metricas = Metricas()
+        descompactar(self.compactado, self.saida, metricas=metricas)
+
+        dados = metricas.para_dict()
+        self.assertEqual(dados['operacao'], 'descompactar')
+        self.assertIn('decodificacao', dados['etapas'])
+        self.assertEqual(dados['bytes_saida'], os.path.getsize(self.entrada))
+        self.assertEqual(metricas.percentual, 100.0)
+        self.assertIn('"simbolos_por_segundo"', metricas.para_json())
+
+
+if __name__ == '__main__':
+    unittest.main()
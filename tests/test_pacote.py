@@ -0,0 +1,96 @@
+import os
+import random
+import tempfile
+import unittest
+from src.pacote import (ARMAZENADA, LIMIAR_TABELA_PROPRIA, TABELA_PROPRIA, LeitorPacote, empacotar, extrair_pacote,
+                        listar_pacote)
+
+
+class TestPacote(unittest.TestCase):
+    """Testes para o pacote de vários arquivos com tabelas por grupo."""
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.base = self._caminho("base")
+        self.pacote = self._caminho("dados.hufp")
+        gerador = random.Random(23)
+        self.conteudos = {f"json/e{i}.json": f'{{"id": {i}, "nome": "entrada {i}"}}\n'.encode() for i in range(50)}
+        self.conteudos.update({f"log/l{i}.log": f"INFO requisição {i} concluída\n".encode('utf-8') * 3
+                               for i in range(20)})
+        # Uma entrada grande e diferente do seu grupo (tabela própria) e uma incompressível
+        self.conteudos["json/grande.json"] = b"0123" * LIMIAR_TABELA_PROPRIA
+        self.conteudos["aleatorio.bin"] = bytes(gerador.randrange(256) for _ in range(3000))
+        self.conteudos["vazio.txt"] = b""
+        for nome, conteudo in self.conteudos.items():
+            self._gravar(nome, conteudo)
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def _caminho(self, nome: str) -> str:
+        return os.path.join(self.diretorio.name, nome)
+
+    def _gravar(self, nome: str, conteudo: bytes) -> str:
+        caminho = os.path.join(self.base, *nome.split('/'))
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(caminho, 'wb') as f:
+            f.write(conteudo)
+        return caminho
+
+    def _arquivos(self):
+        return [os.path.join(self.base, *nome.split('/')) for nome in self.conteudos]
+
+    def test_ida_e_volta(self):
+        self.assertEqual(empacotar(self.pacote, self._arquivos(), base=self.base, workers=1), len(self.conteudos))
+        with LeitorPacote(self.pacote) as leitor:
+            self.assertEqual(sorted(leitor.nomes()), sorted(self.conteudos))
+            for nome, conteudo in self.conteudos.items():
+                self.assertEqual(leitor.ler(nome), conteudo)
+            tabelas = {nome: entrada.tabela for nome, entrada in leitor.entradas.items()}
+            self.assertEqual(leitor.tabelas[tabelas["json/grande.json"] - 1].tipo, TABELA_PROPRIA)
+            self.assertEqual(tabelas["aleatorio.bin"], ARMAZENADA)
+            # Os arquivos pequenos de um grupo compartilham a mesma tabela
+            self.assertEqual(len({tabelas[f"json/e{i}.json"] for i in range(50)}), 1)
+        self.assertLess(os.path.getsize(self.pacote), sum(map(len, self.conteudos.values())))
+
+        destino = self._caminho("extraido")
+        self.assertEqual(extrair_pacote(self.pacote, destino, workers=2), len(self.conteudos))
+        for nome, conteudo in self.conteudos.items():
+            with open(os.path.join(destino, *nome.split('/')), 'rb') as f:
+                self.assertEqual(f.read(), conteudo)
+
+    def test_anexar_e_substituir(self):
+        arquivos = self._arquivos()
+        empacotar(self.pacote, arquivos[:30], base=self.base, workers=1)
+        novo = self._gravar("json/e0.json", b'{"id": 0, "nome": "substituida"}\n')
+        self.conteudos["json/e0.json"] = b'{"id": 0, "nome": "substituida"}\n'
+        empacotar(self.pacote, arquivos[30:] + [novo], base=self.base, anexar=True, workers=2)
+        with LeitorPacote(self.pacote) as leitor:
+            self.assertEqual(len(leitor.entradas), len(self.conteudos))
+            for nome, conteudo in self.conteudos.items():
+                self.assertEqual(leitor.ler(nome), conteudo)
+            # O grupo .json já existia: a tabela dele foi reaproveitada
+            self.assertEqual(sum(1 for tabela in leitor.tabelas if tabela.grupo == '.json'), 1)
+
+        destino = self._caminho("selecionadas")
+        extrair_pacote(self.pacote, destino, ["log/l3.log"], workers=1)
+        self.assertEqual(os.listdir(destino), ["log"])
+        with self.assertRaises(KeyError):
+            extrair_pacote(self.pacote, destino, ["nao/existe"])
+        self.assertEqual({registro['nome'] for registro in listar_pacote(self.pacote)}, set(self.conteudos))
+
+    def test_nomes_e_corrupcao(self):
+        with self.assertRaises(ValueError):
+            empacotar(self.pacote, [os.path.join(self.base, "vazio.txt")], base=os.path.join(self.base, "json"))
+        empacotar(self.pacote, self._arquivos(), base=self.base, workers=1)
+        with open(self.pacote, 'r+b') as f:
+            f.seek(-20, os.SEEK_END)
+            f.write(b"\xff")
+        with self.assertRaises(ValueError):
+            LeitorPacote(self.pacote)
+        with self.assertRaises(ValueError):
+            LeitorPacote(os.path.join(self.base, "vazio.txt"))
+
+
+if __name__ == '__main__':
+    unittest.main()